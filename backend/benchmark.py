@@ -0,0 +1,232 @@
+import argparse
+import contextlib
+import io
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import *
+from core.compliance_kernel import VIOLATION_CATEGORIES
+from core.data_loader import DataLoader
+from core.rule_engine import RuleEngine
+from core.optimizer import GeneticOptimizer
+
+
+def load_system(compact=False):
+    """Load the input tables and build the engines once"""
+    data_loader = DataLoader(compact)
+    data_loader.load_all_data(
+        INPUT_FLIGHTS_PATH,
+        INPUT_CREW_PATH,
+        INPUT_PREFERENCES_PATH,
+        INPUT_DGCA_RULES_PATH,
+        INPUT_HISTORICAL_PATH
+    )
+    rule_engine = RuleEngine(data_loader)
+    return data_loader, rule_engine
+
+
+def evolve_from_scratch(optimizer, population_size, generations, warm_start_ratio, seed):
+    """Build a population and evolve it, returning the population build time and GA history"""
+    random.seed(seed)
+    np.random.seed(seed)
+
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.create_initial_population(population_size, warm_start_ratio=warm_start_ratio)
+        population_seconds = time.perf_counter() - start_time
+        optimizer.run_optimization(generations)
+
+    return population_seconds, list(optimizer.history)
+
+
+def time_to_target(population_seconds, history, reached):
+    """Generations and wall time until the first generation satisfying `reached`"""
+    for record in history:
+        if reached(record):
+            return record['generation'], population_seconds + record['elapsed']
+    return None, None
+
+
+def benchmark_warm_start(args):
+    """Compare generations-to-target and wall time with and without warm start"""
+    data_loader, rule_engine = load_system()
+    optimizer = GeneticOptimizer(data_loader, rule_engine)
+    total_flights = len(data_loader.flights)
+
+    runs = {}
+    for label, ratio in [('cold', 0.0), ('warm', args.warm_ratio)]:
+        runs[label] = [
+            evolve_from_scratch(optimizer, args.population, args.generations, ratio, args.seed + run)
+            for run in range(args.runs)
+        ]
+
+    # Without an explicit target, measure how fast each mode reaches the cold runs' median final score
+    target_score = args.target_score
+    if target_score is None:
+        target_score = float(np.median([history[-1]['best_score'] for _, history in runs['cold']]))
+
+    print(f"\nWarm start benchmark: population={args.population}, generations={args.generations}, "
+          f"warm ratio={args.warm_ratio:.0%}, runs={args.runs}")
+    print(f"Targets: coverage >= {args.target_coverage:.1%} of {total_flights} flights, score >= {target_score:.0f}")
+    print(f"{'mode':<6}{'pop build s':>12}{'gens→cov':>10}{'s→cov':>9}{'gens→score':>12}{'s→score':>10}"
+          f"{'coverage':>10}{'score':>9}")
+
+    def cell(value, width, fmt):
+        return f"{'-' if value is None else format(value, fmt):>{width}}"
+
+    for label, results in runs.items():
+        for population_seconds, history in results:
+            gens_cov, secs_cov = time_to_target(
+                population_seconds, history,
+                lambda record: record['covered_flights'] / total_flights >= args.target_coverage
+            )
+            gens_score, secs_score = time_to_target(
+                population_seconds, history, lambda record: record['best_score'] >= target_score
+            )
+            print(f"{label:<6}{population_seconds:>12.2f}{cell(gens_cov, 10, 'd')}{cell(secs_cov, 9, '.2f')}"
+                  f"{cell(gens_score, 12, 'd')}{cell(secs_score, 10, '.2f')}"
+                  f"{history[-1]['covered_flights'] / total_flights:>10.1%}{history[-1]['best_score']:>9.0f}")
+
+
+def frame_bytes(frames):
+    return sum(int(frame.memory_usage(deep=True).sum()) for frame in frames)
+
+
+def best_of(func, repeats):
+    """Fastest of several timed calls, in seconds"""
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings)
+
+
+def benchmark_dtypes(args):
+    """Memory footprint and metrics latency with object strings vs compact dtypes"""
+    import main
+
+    results = {}
+    for label, compact in [('object', False), ('compact', True)]:
+        data_loader, rule_engine = load_system(compact)
+        optimizer = GeneticOptimizer(data_loader, rule_engine)
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            optimizer.create_initial_population(args.population)
+        population = optimizer.population
+        roster = population[0]
+
+        # calculate_roster_metrics reads the API module's globals
+        main.data_loader, main.rule_engine = data_loader, rule_engine
+        flights = data_loader.flights[['flight_id', 'origin', 'destination', 'aircraft_type']]
+
+        def merge_groupby():
+            merged = roster.merge(flights, on='flight_id', how='left')
+            merged.groupby('crew_id', observed=True)['duty_hours'].sum()
+            merged.groupby(['origin', 'aircraft_type'], observed=True)['duty_hours'].sum()
+            return merged
+
+        results[label] = {
+            'tables': frame_bytes([data_loader.flights, data_loader.crew]),
+            'population': frame_bytes(population),
+            'merge_groupby': best_of(merge_groupby, args.repeats),
+            'metrics': best_of(lambda: main.calculate_roster_metrics(roster), args.repeats),
+        }
+
+    print(f"\nCompact dtypes benchmark: population={args.population}, best of {args.repeats}")
+    print(f"{'':<22}{'object':>12}{'compact':>12}{'ratio':>8}")
+    rows = [
+        ('input tables (KB)', 'tables', 1 / 1024, '.1f'),
+        ('population (KB)', 'population', 1 / 1024, '.1f'),
+        ('merge+groupby (ms)', 'merge_groupby', 1000, '.2f'),
+        ('roster metrics (ms)', 'metrics', 1000, '.1f'),
+    ]
+    for name, key, scale, fmt in rows:
+        before, after = results['object'][key], results['compact'][key]
+        print(f"{name:<22}{format(before * scale, fmt):>12}{format(after * scale, fmt):>12}{before / after:>7.2f}x")
+
+
+def compliance_mismatches(rule_engine, population):
+    """(roster index, category, per-roster count, kernel count) wherever the two checks disagree"""
+    counts = rule_engine.check_population_compliance(population)
+    mismatches = []
+    for index, roster in enumerate(population):
+        rule_engine.check_roster_compliance(roster)
+        breakdown = rule_engine.get_violation_breakdown()
+        for category in VIOLATION_CATEGORIES:
+            if breakdown.get(category, 0) != counts[category][index]:
+                mismatches.append((index, category, breakdown.get(category, 0), int(counts[category][index])))
+    return mismatches
+
+
+def benchmark_compliance(args):
+    """One batched population compliance pass vs per-roster RuleEngine checks
+
+    The kernel's counts are first checked against the per-roster breakdown,
+    category by category; any disagreement fails the run with exit status 1.
+    """
+    data_loader, rule_engine = load_system(args.compact)
+    optimizer = GeneticOptimizer(data_loader, rule_engine)
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.create_initial_population(args.population)
+        population = [optimizer.mutate_roster(roster.copy()) for roster in optimizer.population]
+        # A double-booked seat, so the duplicate rule is exercised too
+        population.append(data_loader.compact_roster(
+            pd.concat([population[0], population[0].iloc[:3]], ignore_index=True)
+        ))
+
+        def per_roster():
+            for roster in population:
+                rule_engine.check_roster_compliance(roster)
+
+        mismatches = compliance_mismatches(rule_engine, population)
+        batched = best_of(lambda: rule_engine.check_population_compliance(population), args.repeats)
+        looped = best_of(per_roster, 1)
+
+    print(f"\nCompliance benchmark: population={len(population)}")
+    if mismatches:
+        print(f"parity                : {len(mismatches)} mismatches")
+        for index, category, expected, actual in mismatches[:20]:
+            print(f"  roster {index:>3} {category:<16} per-roster {expected:>5}  kernel {actual:>5}")
+        raise SystemExit(1)
+    print(f"parity                : all {len(VIOLATION_CATEGORIES)} categories match on every roster")
+    print(f"per-roster RuleEngine : {looped * 1000:10.1f} ms")
+    print(f"batched kernel        : {batched * 1000:10.1f} ms (best of {args.repeats})")
+    print(f"speedup               : {looped / batched:10.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crew rostering performance benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    warm_start = subparsers.add_parser("warm-start", help="Historical warm start vs cold start")
+    warm_start.add_argument("--population", type=int, default=20)
+    warm_start.add_argument("--generations", type=int, default=30)
+    warm_start.add_argument("--warm-ratio", type=float, default=WARM_START_RATIO)
+    warm_start.add_argument("--target-coverage", type=float, default=0.99)
+    warm_start.add_argument("--target-score", type=float, default=None)
+    warm_start.add_argument("--runs", type=int, default=3)
+    warm_start.add_argument("--seed", type=int, default=42)
+    warm_start.set_defaults(func=benchmark_warm_start)
+
+    dtypes = subparsers.add_parser("dtypes", help="Object string columns vs compact categorical dtypes")
+    dtypes.add_argument("--population", type=int, default=20)
+    dtypes.add_argument("--repeats", type=int, default=5)
+    dtypes.add_argument("--seed", type=int, default=42)
+    dtypes.set_defaults(func=benchmark_dtypes)
+
+    compliance = subparsers.add_parser("compliance", help="Batched population compliance vs per-roster checks")
+    compliance.add_argument("--population", type=int, default=20)
+    compliance.add_argument("--repeats", type=int, default=5)
+    compliance.add_argument("--seed", type=int, default=42)
+    compliance.add_argument("--compact", action="store_true", help="Check with compact dtypes")
+    compliance.set_defaults(func=benchmark_compliance)
+
+    args = parser.parse_args()
+    args.func(args)
@@ -25,6 +25,84 @@ POPULATION_SIZE = 80    # Increased for more diversity
 GENERATIONS = 150       # Increased for better convergence
 MUTATION_RATE = 0.25    # Balanced mutation rate
 
+# Island Model Parameters
+ISLAND_COUNT = 4        # Sub-populations, each evolved in its own process
+MIGRATION_INTERVAL = 10 # Generations between migrations
+MIGRATION_SIZE = 2      # Best rosters sent to the neighbouring island
+CROSSOVER_RATE = 0.7    # Share of children bred by flight-level crossover
+WARM_START_RATIO = 0.25 # Share of the initial population seeded from historical rosters
+COMPLIANCE_WEIGHT = 0.0 # Fitness penalty per DGCA violation, from the batched population check (0 = off)
+NSGA_WORKERS = 4        # Processes evaluating NSGA-II objectives through the DEAP map hook
+COMPARISON_TIME_BUDGET = 60.0 # Seconds each engine gets in an engine comparison run
+
+# Local Search
+LOCAL_SEARCH_TIME_BUDGET = 10.0  # Seconds of tabu / annealing improvement per run
+LOCAL_SEARCH_FAIRNESS_WEIGHT = 0.1  # Objective cost per unit of duty-hour variance, against 1 per violation
+TABU_TENURE = 50                 # Iterations a crew member may not return to a seat they just left
+ANNEALING_START_TEMPERATURE = 2.0
+ANNEALING_END_TEMPERATURE = 0.01
+
+# Crew Pairings
+MIN_CONNECTION_HOURS = 0.5   # Shortest ground time between two legs of a pairing
+MAX_CONNECTION_HOURS = 4.0   # Longest ground time before a connection is no longer a pairing
+MAX_PAIRING_LEGS = 4         # Legs explored per pairing by the bounded DFS
+PAIRING_ROSTER_RATIO = 0.25  # Share of the initial population seeded from multi-leg pairings
+
+# Disruption Response
+REPLACEMENT_SHORTLIST_SIZE = 5  # Ranked legal substitutes kept per seat
+MAX_KNOCK_ON_DELAYS = 20        # Flights a single delay may push back before propagation stops
+ROLLING_LOCK_HOURS = 2.0        # Hours after "now" that rolling-horizon re-optimization leaves untouched
+
+# Bulk Uploads
+UPLOAD_CHUNK_SIZE = 1000        # Rows parsed per chunk from uploaded CSV / JSON Lines amendments
+
+# Robustness Simulation
+ROBUSTNESS_SCENARIOS = 2000      # Monte Carlo disruption scenarios per evaluation
+ROBUSTNESS_MAX_SCENARIOS = 50000 # Upper bound accepted by the API
+ROBUSTNESS_WORKERS = 4           # Worker processes sharing the scenario batches
+SICK_CALL_RATE = 0.02            # Probability that a crew member calls in sick in a scenario
+DELAY_THRESHOLD_MINUTES = 15     # Historical duty overruns above this count as delays
+ROBUSTNESS_WEIGHT = 0.0          # GA fitness penalty per expected uncovered flight (0 = off)
+
+# Early Stopping
+OPTIMIZATION_TIME_BUDGET = None  # Seconds per optimization run; None = no limit
+STAGNATION_PATIENCE = 25         # Generations without improvement before stopping
+
+# Progress Streaming
+PROGRESS_QUEUE_SIZE = 200     # Events buffered per subscriber before the oldest are dropped
+PROGRESS_POLL_INTERVAL = 0.2  # Seconds between SSE queue polls
+PROGRESS_HEARTBEAT_POLLS = 75 # Idle polls before a keep-alive comment (~15s)
+
+# Instrumentation
+PROFILING_ENABLED = False  # Allow per-request cProfile capture via X-Profile: 1 or ?profile=1
+PROFILING_TOKEN = None     # X-Profile-Token required to profile; None = localhost clients only
+PROFILE_HISTORY_SIZE = 20  # Captured profile reports kept in memory
+PROFILE_REPORT_LINES = 40  # Functions listed per profile report
+
+# Roster Versioning
+ROSTER_VERSION_LIMIT = 200    # Versions retained before the oldest are folded away
+ROSTER_FRAME_CACHE_SIZE = 4   # Materialized roster DataFrames kept in memory
+ROSTER_METRICS_CACHE_SIZE = 16 # Per-version metrics kept for conditional/incremental reads
+
+# Memory Layout
+COMPACT_DTYPES = False  # Shared categoricals and float32 durations for input tables and rosters
+SHARE_INPUT_TABLES = True  # Publish input tables to shared memory; worker processes attach instead of unpickling
+
+# Startup
+WARM_UP_ENGINE = None      # Engine that builds a first roster during warm-up when none is restored; None = skip
+READINESS_RETRY_AFTER = 2  # Seconds clients are told to wait while the warm-up runs
+
+# Scenario Workspaces
+DEFAULT_WORKSPACE = "default"                   # Workspace backed by the shared, persisted roster state
+WORKSPACE_SPILL_DIR = "data/output/workspaces"  # Idle workspaces are pickled here when evicted
+WORKSPACE_MAX_RESIDENT = 8                      # Named workspaces kept in memory
+WORKSPACE_MEMORY_BUDGET_MB = 256                # Approximate memory allowed for resident workspaces
+
+# Multi-worker Deployment & Persistence
+WEB_WORKERS = 1                                    # uvicorn worker processes sharing one roster state; named workspaces need 1
+SHARED_STATE_PATH = "data/output/roster_state.db"  # SQLite file holding roster versions, assignments and violations
+PERSISTENCE_BATCH_SIZE = 500                       # Rows per executemany batch when persisting a version
+
 
 # DGCA Rules (fallback if not in CSV)
 MAX_DAILY_DUTY_HOURS = 10
@@ -0,0 +1,303 @@
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from core.instrumentation import metrics
+
+
+class CrewAssigner:
+    """Greedy crew assignment shared by every rostering engine
+
+    Flights are covered in three phases of increasing duty allowance (12h with
+    base match, 14h from underutilized crew, 16h anywhere); candidates are
+    filtered as whole frames by duty, role, base and compiled preferences.
+    Subclasses set `respect_preferences` to False to fill for coverage alone.
+    """
+    respect_preferences = True
+
+    def __init__(self, data_loader):
+        self.data = data_loader
+        self.progress = None
+        self.base_duty = {}
+    
+    def initial_duty(self):
+        """Duty tracker pre-loaded with hours already flown outside the flights being optimized"""
+        return defaultdict(float, self.base_duty)
+    
+    def report_progress(self, phase, **fields):
+        """Publish a progress event if a progress bus is attached"""
+        if self.progress is not None:
+            self.progress.publish(phase, **fields)
+    
+    def generate_random_roster(self, seed_entries=None):
+        """Generate roster with maximum coverage while maintaining compliance"""
+        start_time = time.perf_counter()
+        total_flights = len(self.data.flights)
+        
+        # Seed assignments are kept as-is; only the flights they leave uncovered are filled
+        roster_entries = list(seed_entries or [])
+        crew_duty_tracker = self.initial_duty()
+        covered_flights = set()
+        for assignment in roster_entries:
+            crew_duty_tracker[assignment['crew_id']] += assignment['duty_hours']
+            covered_flights.add(assignment['flight_id'])
+        
+        # Sort flights by required crew (fewer crew = easier to cover)
+        flights_with_requirements = self.data.flights.copy()
+        flights_with_requirements['total_crew_required'] = (
+            flights_with_requirements['pilots_required'] + 
+            flights_with_requirements['cabin_crew_required']
+        )
+        sorted_flights = flights_with_requirements.sort_values('total_crew_required')
+       
+        print("Phase 1: Cover flights requiring least crew first (12h limit)...")
+        for _, flight in sorted_flights.iterrows():
+            if flight['flight_id'] in covered_flights:
+                continue
+                
+            flight_assignments = []
+            success = self.try_assign_crew(flight, flight_assignments, crew_duty_tracker, 12.0, True,
+                                           self.respect_preferences)
+            
+            if success:
+                roster_entries.extend(flight_assignments)
+                covered_flights.add(flight['flight_id'])
+                for assignment in flight_assignments:
+                    crew_duty_tracker[assignment['crew_id']] += assignment['duty_hours']
+        
+        phase1_coverage = len(covered_flights)
+        print(f"  Covered {phase1_coverage} flights")
+        self.report_progress('phase1', covered_flights=phase1_coverage, total_flights=total_flights,
+                             elapsed=time.perf_counter() - start_time)
+        phase_end = time.perf_counter()
+        metrics.observe('roster_phase_seconds', phase_end - start_time, phase='phase1')
+        
+        print("Phase 2: Cover more flights with underutilized crew (14h limit)...")
+        underutilized_crew = [crew_id for crew_id, hours in crew_duty_tracker.items() if hours < 8]
+        print(f"  Underutilized crew available: {len(underutilized_crew)}")
+        
+        for _, flight in sorted_flights.iterrows():
+            if flight['flight_id'] in covered_flights:
+                continue
+                
+            flight_assignments = []
+            success = self.try_assign_with_crew_pool(flight, flight_assignments, crew_duty_tracker, underutilized_crew, 14.0,
+                                                     self.respect_preferences)
+            
+            if success:
+                roster_entries.extend(flight_assignments)
+                covered_flights.add(flight['flight_id'])
+                for assignment in flight_assignments:
+                    crew_id = assignment['crew_id']
+                    crew_duty_tracker[crew_id] += assignment['duty_hours']
+                    if crew_id in underutilized_crew and crew_duty_tracker[crew_id] >= 8:
+                        underutilized_crew.remove(crew_id)
+        
+        phase2_coverage = len(covered_flights)
+        print(f"  Covered {phase2_coverage - phase1_coverage} additional flights")
+        self.report_progress('phase2', covered_flights=phase2_coverage, total_flights=total_flights,
+                             elapsed=time.perf_counter() - start_time)
+        phase_start, phase_end = phase_end, time.perf_counter()
+        metrics.observe('roster_phase_seconds', phase_end - phase_start, phase='phase2')
+        
+        print("Phase 3: Final push for maximum coverage (16h limit)...")
+        remaining_flights = sorted_flights[~sorted_flights['flight_id'].isin(covered_flights)]
+        
+        for _, flight in remaining_flights.iterrows():
+            if flight['flight_id'] in covered_flights:
+                continue
+                
+            flight_assignments = []
+            # Preferences are relaxed here: coverage beats a respected day off
+            success = self.try_assign_crew(flight, flight_assignments, crew_duty_tracker, 16.0, False, False)
+            
+            if success:
+                roster_entries.extend(flight_assignments)
+                covered_flights.add(flight['flight_id'])
+                for assignment in flight_assignments:
+                    crew_duty_tracker[assignment['crew_id']] += assignment['duty_hours']
+        
+        final_coverage = len(covered_flights)
+        print(f"Final: Covered {final_coverage}/120 flights ({final_coverage/120:.1%})")
+        self.report_progress('phase3', covered_flights=final_coverage, total_flights=total_flights,
+                             elapsed=time.perf_counter() - start_time)
+        metrics.observe('roster_phase_seconds', time.perf_counter() - phase_end, phase='phase3')
+        
+        return self.data.compact_roster(pd.DataFrame(roster_entries))
+    
+    def try_assign_crew(self, flight, flight_assignments, crew_duty_tracker, max_hours, require_base_match,
+                        respect_preferences=True):
+        """Try to assign crew to a flight"""
+        # Assign pilots
+        pilots_assigned = self.assign_pilots(
+            flight, flight_assignments, crew_duty_tracker, max_hours, require_base_match, respect_preferences
+        )
+        if pilots_assigned < flight['pilots_required']:
+            return False
+        
+        # Assign cabin crew
+        cabin_assigned = self.assign_cabin_crew(
+            flight, flight_assignments, crew_duty_tracker, max_hours, require_base_match, respect_preferences
+        )
+        if cabin_assigned < flight['cabin_crew_required']:
+            return False
+        
+        return True
+    
+    def try_assign_with_crew_pool(self, flight, flight_assignments, crew_duty_tracker, crew_pool, max_hours,
+                                  respect_preferences=True):
+        """Assign using specific crew pool"""
+        crew_pool_set = set(crew_pool)
+        
+        # Get available pilots from pool
+        available_pilots = self.get_available_crew(
+            flight, ['Captain', 'First Officer'], crew_duty_tracker, max_hours, False, respect_preferences
+        )
+        available_pilots = available_pilots[available_pilots['crew_id'].isin(crew_pool_set)]
+        
+        # Get available cabin crew from pool
+        available_cabin = self.get_available_crew(
+            flight, ['Senior Crew', 'Crew Member', 'Trainee'], crew_duty_tracker, max_hours, False, respect_preferences
+        )
+        available_cabin = available_cabin[available_cabin['crew_id'].isin(crew_pool_set)]
+        
+        # Assign pilots
+        pilots_assigned = 0
+        required_pilots = flight['pilots_required']
+        
+        if not available_pilots.empty and len(available_pilots) >= required_pilots:
+            if required_pilots == 2:
+                captains = available_pilots[available_pilots['role'] == 'Captain']
+                fos = available_pilots[available_pilots['role'] == 'First Officer']
+                if len(captains) >= 1 and len(fos) >= 1:
+                    captain = captains.sample(1).iloc[0]
+                    fo = fos.sample(1).iloc[0]
+                    flight_assignments.extend([
+                        self.create_assignment(flight, captain, 'Captain'),
+                        self.create_assignment(flight, fo, 'First Officer')
+                    ])
+                    pilots_assigned = 2
+            else:
+                pilot = available_pilots.sample(1).iloc[0]
+                flight_assignments.append(self.create_assignment(flight, pilot, pilot['role']))
+                pilots_assigned = 1
+        
+        if pilots_assigned < required_pilots:
+            return False
+        
+        # Assign cabin crew
+        required_cabin = flight['cabin_crew_required']
+        if not available_cabin.empty and len(available_cabin) >= required_cabin:
+            selected = available_cabin.sample(required_cabin)
+            for _, crew_member in selected.iterrows():
+                flight_assignments.append(self.create_assignment(flight, crew_member, crew_member['role']))
+            return True
+        
+        return False
+    
+    def assign_pilots(self, flight, flight_assignments, crew_duty_tracker, max_hours, require_base_match,
+                      respect_preferences=True):
+        """Assign pilots to flight"""
+        available_pilots = self.get_available_crew(
+            flight, ['Captain', 'First Officer'], crew_duty_tracker, max_hours, require_base_match,
+            respect_preferences
+        )
+        
+        if available_pilots.empty:
+            return 0
+            
+        required = flight['pilots_required']
+        
+        if len(available_pilots) >= required:
+            if required == 2:
+                captains = available_pilots[available_pilots['role'] == 'Captain']
+                fos = available_pilots[available_pilots['role'] == 'First Officer']
+                if len(captains) >= 1 and len(fos) >= 1:
+                    captain = captains.sample(1).iloc[0]
+                    fo = fos.sample(1).iloc[0]
+                    flight_assignments.extend([
+                        self.create_assignment(flight, captain, 'Captain'),
+                        self.create_assignment(flight, fo, 'First Officer')
+                    ])
+                    return 2
+            else:
+                pilot = available_pilots.sample(1).iloc[0]
+                flight_assignments.append(self.create_assignment(flight, pilot, pilot['role']))
+                return 1
+        
+        return 0
+    
+    def assign_cabin_crew(self, flight, flight_assignments, crew_duty_tracker, max_hours, require_base_match,
+                          respect_preferences=True):
+        """Assign cabin crew to flight"""
+        available_cabin = self.get_available_crew(
+            flight, ['Senior Crew', 'Crew Member', 'Trainee'], crew_duty_tracker, max_hours, require_base_match,
+            respect_preferences
+        )
+        
+        if available_cabin.empty:
+            return 0
+            
+        required = flight['cabin_crew_required']
+        
+        if len(available_cabin) >= required:
+            selected = available_cabin.sample(required)
+            for _, crew_member in selected.iterrows():
+                flight_assignments.append(self.create_assignment(flight, crew_member, crew_member['role']))
+            return required
+        
+        return 0
+    
+    def get_available_crew(self, flight, roles, crew_duty_tracker, max_hours, require_base_match,
+                           respect_preferences=True):
+        """Get available crew considering duty hours and day-off/red-eye preferences"""
+        try:
+            if require_base_match:
+                base_crew = self.data.get_crew_by_role(role=roles, base=flight['origin'], status='ACTIVE')
+            else:
+                base_crew = self.data.crew[
+                    (self.data.crew['role'].isin(roles)) & 
+                    (self.data.crew['status'] == 'ACTIVE')
+                ]
+            
+            if base_crew.empty:
+                return pd.DataFrame()
+            
+            metrics.increment('candidate_scans_total', len(base_crew))
+            crew_preferences = self.data.crew_preferences if respect_preferences else {}
+            day_index = flight.get('day_index', 0)
+            is_red_eye = flight.get('is_red_eye', False)
+            
+            # Duty and preference filters over the whole candidate frame; rows keep their order
+            crew_ids = base_crew['crew_id'].tolist()
+            current_duty = np.array([crew_duty_tracker.get(crew_id, 0) for crew_id in crew_ids], dtype=float)
+            duty_buffer = np.where(base_crew['role'].isin(['Captain', 'First Officer']), 0.5, 0.3)
+            available = current_duty + flight['flight_duration_hours'] + duty_buffer <= max_hours
+            if crew_preferences:
+                # O(1) bitset/flag check against compiled preferences
+                available &= np.array([
+                    crew_id not in crew_preferences or not crew_preferences[crew_id].conflicts(day_index, is_red_eye)
+                    for crew_id in crew_ids
+                ], dtype=bool)
+            
+            return base_crew[available]
+            
+        except Exception as e:
+            metrics.increment('swallowed_errors_total', location='get_available_crew')
+            print(f"Error getting available crew: {e}")
+            return pd.DataFrame()
+    
+    def create_assignment(self, flight, crew_member, role):
+        """Create assignment record with time information"""
+        duty_buffer = 0.5 if role in ['Captain', 'First Officer'] else 0.3
+        
+        return {
+            'flight_id': flight['flight_id'],
+            'crew_id': crew_member['crew_id'],
+            'role': role,
+            'duty_hours': flight['flight_duration_hours'] + duty_buffer,
+            'departure_time': flight['departure_time'],  # Added time info
+            'arrival_time': flight['arrival_time']       # Added time info
+        }
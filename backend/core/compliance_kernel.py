@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+MINUTES_PER_DAY = 1440
+PILOT_ROLES = ('Captain', 'First Officer')
+VIOLATION_CATEGORIES = ('duty_hours', 'rest_periods', 'consecutive_days', 'qualifications',
+                        'base_mismatch', 'status', 'duplicates')
+
+
+class PopulationCompliance:
+    """Vectorized DGCA checks over a whole population of rosters at once
+
+    Every roster is encoded as integer codes and stacked into flat (individual,
+    crew, flight) arrays. One lexsort by (individual, crew, departure) groups each
+    crew member's timeline inside each individual into a contiguous segment, and all
+    rules are segment reductions over those arrays. The rules and tolerances mirror
+    RuleEngine.check_roster_compliance; duties sharing a departure time are ordered by
+    arrival here, so rest counts for double-booked crew can differ by one from the
+    per-roster check, whose sort leaves such ties in arbitrary order.
+    """
+
+    def __init__(self, data_loader, rules, allowed_base_pairs):
+        self.rules = rules
+        flights = data_loader.flights.drop_duplicates('flight_id')
+        crew = data_loader.crew.drop_duplicates('crew_id')
+
+        self.flight_ids = pd.Index(flights['flight_id'].astype(str))
+        self.crew_ids = pd.Index(crew['crew_id'].astype(str))
+
+        # Per-flight arrays indexed by flight code
+        airports = pd.Index(sorted(set(flights['origin'].astype(str)) | set(crew['base'].astype(str))))
+        aircraft = pd.Index(sorted(flights['aircraft_type'].astype(str).unique()))
+        self.origin = airports.get_indexer(flights['origin'].astype(str))
+        self.aircraft = aircraft.get_indexer(flights['aircraft_type'].astype(str))
+
+        # Per-crew arrays indexed by crew code
+        self.is_pilot = crew['role'].astype(str).isin(PILOT_ROLES).to_numpy()
+        self.inactive = (crew['status'].astype(str) != 'ACTIVE').to_numpy()
+        self.base = airports.get_indexer(crew['base'].astype(str))
+        self.qualified = np.zeros((len(crew), len(aircraft)), dtype=bool)
+        for code, qualifications in enumerate(crew['qualifications'].astype(str)):
+            for aircraft_type in qualifications.split('|'):
+                if aircraft_type in aircraft:
+                    self.qualified[code, aircraft.get_loc(aircraft_type)] = True
+
+        # allowed[base, origin]: flying out of `origin` is not a major mismatch for crew based at `base`
+        self.allowed = np.eye(len(airports), dtype=bool)
+        for base, origins in allowed_base_pairs.items():
+            if base in airports:
+                for origin in origins:
+                    if origin in airports:
+                        self.allowed[airports.get_loc(base), airports.get_loc(origin)] = True
+
+    def _epoch_minutes(self, times):
+        return (pd.to_datetime(times).astype('datetime64[s]').astype('int64') // 60).to_numpy()
+
+    def stack(self, population):
+        """Encode rosters into flat (individual, crew, flight, duty_hours, departure, arrival) arrays
+
+        Times are taken from each roster's own columns, as epoch minutes, so that
+        assignments of repeated flight ids keep their own legs. Unknown ids are dropped.
+        """
+        individuals, crew, flights, hours, departures, arrivals = [], [], [], [], [], []
+        for index, roster in enumerate(population):
+            if roster is None or roster.empty:
+                continue
+            crew_codes = self.crew_ids.get_indexer(roster['crew_id'].astype(str))
+            flight_codes = self.flight_ids.get_indexer(roster['flight_id'].astype(str))
+            known = (crew_codes >= 0) & (flight_codes >= 0)
+            individuals.append(np.full(known.sum(), index, dtype=np.int64))
+            crew.append(crew_codes[known])
+            flights.append(flight_codes[known])
+            hours.append(roster['duty_hours'].to_numpy(dtype=np.float64)[known])
+            departures.append(self._epoch_minutes(roster['departure_time'])[known])
+            arrivals.append(self._epoch_minutes(roster['arrival_time'])[known])
+
+        if not individuals:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty, np.zeros(0), empty, empty
+        return tuple(np.concatenate(arrays) for arrays in (individuals, crew, flights, hours, departures, arrivals))
+
+    def check(self, population):
+        """Violation counts per individual, as {category: int array of len(population)} plus 'total'"""
+        size = len(population)
+        individual, crew, flight, hours, departure, arrival = self.stack(population)
+        counts = {category: np.zeros(size, dtype=np.int64) for category in VIOLATION_CATEGORIES}
+        if len(individual) == 0:
+            counts['total'] = np.zeros(size, dtype=np.int64)
+            return counts
+
+        # Per-assignment rules need no ordering
+        pilots = self.is_pilot[crew]
+        counts['qualifications'] = np.bincount(
+            individual[pilots & ~self.qualified[crew, self.aircraft[flight]]], minlength=size
+        )
+        counts['base_mismatch'] = np.bincount(
+            individual[~self.allowed[self.base[crew], self.origin[flight]]], minlength=size
+        )
+        counts['status'] = np.bincount(individual[self.inactive[crew]], minlength=size)
+
+        # Segment-sort by (individual, crew, departure, arrival)
+        order = np.lexsort((arrival, departure, crew, individual))
+        individual, crew, flight, hours, departure, arrival = (
+            individual[order], crew[order], flight[order], hours[order], departure[order], arrival[order]
+        )
+        same_crew = (individual[1:] == individual[:-1]) & (crew[1:] == crew[:-1])
+
+        # Duplicate (flight, crew) pairs, counted like DataFrame.duplicated on those columns
+        pairs = np.stack((individual, crew, flight), axis=1)
+        unique_pairs = np.unique(pairs, axis=0)
+        counts['duplicates'] = (
+            np.bincount(individual, minlength=size) - np.bincount(unique_pairs[:, 0], minlength=size)
+        )
+
+        # Rest gaps between consecutive duties of the same crew member
+        rest_hours = (departure[1:] - arrival[:-1]) / 60.0
+        short_rest = same_crew & (rest_hours < self.rules['min_rest'] - 0.5)
+        counts['rest_periods'] = np.bincount(individual[1:][short_rest], minlength=size)
+
+        # Daily duty: reduce assignments to (individual, crew, day) totals
+        day = departure // MINUTES_PER_DAY
+        new_day = np.ones(len(day), dtype=bool)
+        new_day[1:] = ~same_crew | (day[1:] != day[:-1])
+        day_starts = np.flatnonzero(new_day)
+        day_hours = np.add.reduceat(hours, day_starts)
+        day_individual, day_crew, day_value = individual[day_starts], crew[day_starts], day[day_starts]
+        counts['duty_hours'] = np.bincount(
+            day_individual[day_hours > self.rules['daily_limit'] + 0.5], minlength=size
+        )
+
+        # Segment ids over the daily totals: one segment per (individual, crew)
+        new_segment = np.ones(len(day_value), dtype=bool)
+        new_segment[1:] = (day_individual[1:] != day_individual[:-1]) | (day_crew[1:] != day_crew[:-1])
+        segment = np.cumsum(new_segment) - 1
+        segment_individual = day_individual[new_segment]
+
+        # Rolling 7-day duty: window sums from a cumulative sum and a searchsorted window start
+        offset = day_value - day_value.min()
+        keys = segment * (offset.max() + 8) + offset
+        cumulative = np.concatenate(([0.0], np.cumsum(day_hours)))
+        window_start = np.searchsorted(keys, keys - 6, side='left')
+        window_hours = cumulative[1:] - cumulative[window_start]
+        weekly_max = np.maximum.reduceat(window_hours, np.flatnonzero(new_segment))
+        counts['duty_hours'] += np.bincount(
+            segment_individual[weekly_max > self.rules['weekly_limit'] + 2], minlength=size
+        )
+
+        # Consecutive duty days: a gap of up to one rest day continues the streak
+        new_run = new_segment.copy()
+        new_run[1:] |= (day_value[1:] - day_value[:-1]) > 2
+        run = np.cumsum(new_run) - 1
+        run_length = np.bincount(run)
+        run_segment = segment[new_run]
+        long_segments = np.unique(run_segment[run_length > self.rules['max_streak']])
+        counts['consecutive_days'] = np.bincount(segment_individual[long_segments], minlength=size)
+
+        counts['total'] = sum(counts[category] for category in VIOLATION_CATEGORIES)
+        return counts
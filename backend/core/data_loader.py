@@ -1,14 +1,131 @@
+import copy
+
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
-class DataLoader:
+from core.shared_tables import SHARED_TABLES
+
+# Departures in this window, or flights landing after midnight, count as red-eyes
+RED_EYE_START_HOUR = 22
+RED_EYE_END_HOUR = 6
+
+# Preference priority 1 is the most important
+PRIORITY_WEIGHTS = {1: 3.0, 2: 2.0, 3: 1.0}
+
+# Compact mode: columns stored as categoricals sharing one dtype per value domain
+CATEGORICAL_DOMAINS = {
+    'crew_id': 'crew_id',
+    'flight_id': 'flight_id',
+    'role': 'role',
+    'status': 'status',
+    'aircraft_type': 'aircraft_type',
+    'base': 'airport',
+    'preferred_base': 'airport',
+    'origin': 'airport',
+    'destination': 'airport'
+}
+FLOAT32_COLUMNS = ('duty_hours', 'flight_duration_hours', 'max_duty_hours')
+
+# Bulk updates: key column and full column set of each amendable input table
+TABLE_KEYS = {'flights': 'flight_id', 'crew': 'crew_id'}
+TABLE_COLUMNS = {
+    'flights': ['flight_id', 'origin', 'destination', 'aircraft_type', 'departure_time', 'arrival_time',
+                'pilots_required', 'cabin_crew_required', 'flight_duration_hours'],
+    'crew': ['crew_id', 'base', 'role', 'qualifications', 'rank', 'status', 'max_duty_hours', 'preferred_base']
+}
+NUMERIC_COLUMNS = ('pilots_required', 'cabin_crew_required', 'flight_duration_hours', 'max_duty_hours')
+
+# Loaders rebuilt from shared memory in this process, by segment name
+_attached_loaders = {}
+
+
+def attach_data_loader(handle):
+    """The DataLoader published under `handle`, mapped from shared memory once per process
+
+    Frames are rebuilt over the shared arrays; preferences and compact dtypes
+    are compiled locally. Later tasks in the same process reuse the loader.
+    """
+    if handle.name not in _attached_loaders:
+        tables, segment = handle.attach()
+        data_loader = DataLoader(handle.compact)
+        for table in SHARED_TABLES:
+            if table in tables:
+                setattr(data_loader, table, pd.DataFrame(tables[table], copy=False))
+        data_loader.compile_preferences()
+        if data_loader.compact:
+            data_loader.compact_tables()
+        data_loader.shared_handle = handle
+        _attached_loaders[handle.name] = (data_loader, segment)
+    return _attached_loaders[handle.name][0]
+
+def _lookup_weights(table, keys):
+    """Weights stored under `keys` in a sorted (keys, weights) pair; 0 where a key is absent"""
+    stored, weights = table
+    if not len(stored):
+        return np.zeros(len(keys))
+    positions = np.minimum(np.searchsorted(stored, keys), len(stored) - 1)
+    return np.where(stored[positions] == keys, weights[positions], 0.0)
+
+def read_change_chunks(source, format='csv', chunk_size=1000):
+    """Parse a CSV or JSON Lines file object into DataFrame chunks of `chunk_size` rows"""
+    if format == 'csv':
+        reader = pd.read_csv(source, chunksize=chunk_size, dtype=str, skipinitialspace=True)
+    elif format == 'jsonl':
+        reader = pd.read_json(source, lines=True, chunksize=chunk_size, dtype=False)
+    else:
+        raise ValueError(f"Unsupported format '{format}', expected csv or jsonl")
+    for chunk in reader:
+        yield chunk
+
+class CrewPreferences:
+    """Compiled preferences of one crew member, checked in O(1) per flight"""
+    __slots__ = ('day_off_mask', 'day_off_weights', 'no_red_eye_weight', 'preferred_routes')
+    
     def __init__(self):
+        self.day_off_mask = 0        # Bit i set = day off requested on schedule day i
+        self.day_off_weights = {}
+        self.no_red_eye_weight = 0.0
+        self.preferred_routes = {}
+    
+    def conflicts(self, day_index, is_red_eye):
+        """True if the flight falls on a requested day off or is an unwanted red-eye"""
+        return bool(self.day_off_mask >> day_index & 1) or (is_red_eye and self.no_red_eye_weight > 0)
+    
+    def score(self, day_index, is_red_eye, route):
+        """Weighted preference satisfaction of flying this flight (negative = violated)"""
+        score = self.preferred_routes.get(route, 0.0)
+        if self.day_off_mask >> day_index & 1:
+            score -= self.day_off_weights[day_index]
+        if is_red_eye:
+            score -= self.no_red_eye_weight
+        return score
+
+class DataLoader:
+    def __init__(self, compact=False):
+        self.compact = compact
+        self.categories = {}
         self.flights = None
         self.crew = None
         self.preferences = None
         self.dgca_rules = None
         self.historical_rosters = None
+        self.schedule_start = None
+        self.crew_preferences = {}
+        self.flight_preference_keys = {}
+        self.preference_arrays = None   # Vectorized form of the compiled preferences, for whole rosters
+        self.shared_handle = None    # Set by SharedTables.publish while the tables are unchanged
+    
+    def __reduce_ex__(self, protocol):
+        # Published tables travel to worker processes as their shared-memory handle
+        if self.shared_handle is not None:
+            return attach_data_loader, (self.shared_handle,)
+        return super().__reduce_ex__(protocol)
+    
+    def __copy__(self):
+        view = self.__class__.__new__(self.__class__)
+        view.__dict__.update(self.__dict__)
+        return view
     
     def load_all_data(self, flights_path, crew_path, preferences_path, rules_path, historical_path):
         """Load all CSV files and preprocess data with proper datetime handling"""
@@ -69,6 +186,61 @@ class DataLoader:
         
         return filtered_crew
     
+    def restrict_flights(self, flights):
+        """A view of the loaded data limited to some flights; crew, preferences and rules are shared"""
+        view = copy.copy(self)
+        view.flights = flights
+        view.shared_handle = None
+        return view
+    
+    def apply_changes(self, table, changes):
+        """Upsert or delete rows of the flights or crew table; returns the changed ids
+
+        Rows are matched on the table key. An optional `action` column set to
+        'delete' removes the row; otherwise the given columns replace those of the
+        existing row, and new ids must supply every column. Derived flight columns,
+        compiled preferences and compact dtypes are refreshed afterwards.
+        """
+        if table not in TABLE_KEYS:
+            raise ValueError(f"Unknown table '{table}', expected one of {sorted(TABLE_KEYS)}")
+        key, columns = TABLE_KEYS[table], TABLE_COLUMNS[table]
+        changes = changes.rename(columns=str.strip)
+        if key not in changes.columns:
+            raise ValueError(f"Missing key column '{key}'")
+        unknown = set(changes.columns) - set(columns) - {'action'}
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+        
+        changes = changes.assign(**{key: changes[key].astype(str).str.strip()})
+        action = changes.pop('action').astype(str).str.strip().str.lower() if 'action' in changes else None
+        deleted = set(changes.loc[action == 'delete', key]) if action is not None else set()
+        upserts = changes[action != 'delete'] if action is not None else changes
+        upserts = upserts.drop_duplicates(key, keep='last').set_index(key)
+        
+        current = getattr(self, table)
+        current = current.astype({column: object for column in current.columns if current[column].dtype == 'category'})
+        existing = current.drop_duplicates(key).set_index(key)[columns[1:]]
+        updated = upserts.reindex(columns=columns[1:]).combine_first(existing.reindex(upserts.index))
+        incomplete = updated.index[updated.isnull().any(axis=1)]
+        if len(incomplete):
+            raise ValueError(f"New rows need every column: {', '.join(map(str, incomplete[:10]))}")
+        for column in ('departure_time', 'arrival_time'):
+            if column in updated.columns:
+                updated[column] = pd.to_datetime(updated[column])
+        for column in NUMERIC_COLUMNS:
+            if column in updated.columns:
+                updated[column] = pd.to_numeric(updated[column])
+        
+        changed = deleted | set(upserts.index)
+        kept = current.loc[~current[key].isin(changed), columns]
+        merged = pd.concat([kept, updated.reset_index()[columns]], ignore_index=True)
+        setattr(self, table, merged.astype({column: current[column].dtype for column in columns}))
+        self.shared_handle = None
+        self.compile_preferences()
+        if self.compact:
+            self.compact_tables()
+        return changed
+    
     def get_flights_by_date_range(self, start_date, end_date):
         """Get flights within a date range"""
         mask = (self.flights['departure_time'] >= start_date) & \
@@ -109,9 +281,162 @@ class DataLoader:
                 print("Historical rosters file not found, creating empty dataframe")
                 self.historical_rosters = pd.DataFrame(columns=['date', 'flight_id', 'crew_id', 'role', 'duty_hours', 'status'])
             
+            self.shared_handle = None
+            self.compile_preferences()
+            if self.compact:
+                self.compact_tables()
+            
             print(f"Loaded {len(self.flights)} flights, {len(self.crew)} crew members")
             return True
             
         except Exception as e:
             print(f"Error loading data: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def compile_preferences(self):
+        """Compile preferences into per-crew bitsets and per-flight lookup keys"""
+        departure = self.flights['departure_time']
+        arrival = self.flights['arrival_time']
+        self.schedule_start = departure.min().normalize()
+        
+        # Per-flight keys: schedule day, red-eye flag and route
+        self.flights['day_index'] = (departure.dt.normalize() - self.schedule_start).dt.days
+        self.flights['is_red_eye'] = (
+            (departure.dt.hour >= RED_EYE_START_HOUR) |
+            (departure.dt.hour < RED_EYE_END_HOUR) |
+            (arrival.dt.normalize() > departure.dt.normalize())
+        )
+        self.flights['route'] = self.flights['origin'] + '-' + self.flights['destination']
+        
+        unique_flights = self.flights.drop_duplicates('flight_id')
+        self.flight_preference_keys = {
+            flight_id: (int(day_index), bool(is_red_eye), route)
+            for flight_id, day_index, is_red_eye, route in zip(
+                unique_flights['flight_id'], unique_flights['day_index'],
+                unique_flights['is_red_eye'], unique_flights['route']
+            )
+        }
+        
+        # Per-crew structures: day-off bitset, red-eye flag, preferred routes
+        self.crew_preferences = {}
+        for preference in self.preferences.itertuples(index=False):
+            prefs = self.crew_preferences.setdefault(preference.crew_id, CrewPreferences())
+            weight = PRIORITY_WEIGHTS.get(int(preference.priority), 1.0)
+            value = str(preference.preference_value).strip()
+            
+            if preference.preference_type == 'DAY_OFF':
+                day_off = pd.to_datetime(value, errors='coerce')
+                if pd.isnull(day_off):
+                    continue
+                day_index = (day_off.normalize() - self.schedule_start).days
+                if day_index >= 0:
+                    prefs.day_off_mask |= 1 << day_index
+                    prefs.day_off_weights[day_index] = max(weight, prefs.day_off_weights.get(day_index, 0.0))
+            elif preference.preference_type == 'NO_RED_EYE':
+                if value.upper() == 'TRUE':
+                    prefs.no_red_eye_weight = max(weight, prefs.no_red_eye_weight)
+            elif preference.preference_type == 'PREFERRED_FLIGHT':
+                prefs.preferred_routes[value] = max(weight, prefs.preferred_routes.get(value, 0.0))
+        
+        self.preference_arrays = self._preference_arrays(unique_flights)
+        print(f"Compiled preferences for {len(self.crew_preferences)} crew members")
+    
+    def _preference_arrays(self, unique_flights):
+        """Per-flight day / red-eye / route codes and sorted (crew, day) and (crew, route) weight keys
+        
+        Lets evaluate_preferences score a roster with integer indexing and one
+        searchsorted per preference kind instead of a Python loop over assignments.
+        """
+        crew_ids = pd.Index(list(self.crew_preferences))
+        routes = pd.Index(sorted(set(unique_flights['route']) |
+                                 {route for prefs in self.crew_preferences.values() for route in prefs.preferred_routes}))
+        day_keys, day_weights, route_keys, route_weights = [], [], [], []
+        red_eye_weights = np.zeros(len(crew_ids))
+        for code, prefs in enumerate(self.crew_preferences.values()):
+            for day_index, weight in prefs.day_off_weights.items():
+                day_keys.append((code, day_index))
+                day_weights.append(weight)
+            for route, weight in prefs.preferred_routes.items():
+                route_keys.append((code, routes.get_loc(route)))
+                route_weights.append(weight)
+            red_eye_weights[code] = prefs.no_red_eye_weight
+        
+        day_span = max([int(unique_flights['day_index'].max()) + 1 if len(unique_flights) else 1] +
+                       [day + 1 for _, day in day_keys])
+        def sorted_keys(pairs, weights, width):
+            keys = np.array([crew * width + value for crew, value in pairs], dtype=np.int64)
+            order = np.argsort(keys)
+            return keys[order], np.array(weights, dtype=float)[order]
+        
+        return {
+            'crew_ids': crew_ids,
+            'flight_ids': pd.Index(unique_flights['flight_id'].astype(str)),
+            'day_index': unique_flights['day_index'].to_numpy(dtype=np.int64),
+            'is_red_eye': unique_flights['is_red_eye'].to_numpy(dtype=bool),
+            'route': routes.get_indexer(unique_flights['route']),
+            'day_span': day_span,
+            'route_span': max(len(routes), 1),
+            'day_off': sorted_keys(day_keys, day_weights, day_span),
+            'routes': sorted_keys(route_keys, route_weights, max(len(routes), 1)),
+            'no_red_eye': red_eye_weights
+        }
+    
+    def compact_tables(self):
+        """Switch flights and crew to shared categoricals and float32 durations
+
+        Every roster the optimizer builds reuses the same category dtypes. The gain
+        is memory: rosters shrink about 3x. Merges, groupbys and roster metrics run
+        at about the speed of object columns, so this is not a CPU optimization.
+        """
+        values = {
+            'crew_id': self.crew['crew_id'],
+            'flight_id': self.flights['flight_id'],
+            'role': self.crew['role'],
+            'status': self.crew['status'],
+            'aircraft_type': self.flights['aircraft_type'],
+            'airport': pd.concat([self.crew['base'], self.crew['preferred_base'],
+                                  self.flights['origin'], self.flights['destination']])
+        }
+        self.categories = {
+            domain: pd.CategoricalDtype(sorted(column.dropna().unique()))
+            for domain, column in values.items()
+        }
+        self.flights = self.compact_roster(self.flights)
+        self.crew = self.compact_roster(self.crew)
+    
+    def compact_roster(self, df):
+        """Apply the compact dtypes to any frame with roster or input-table columns; no-op unless compact"""
+        if not self.compact or df is None or df.empty:
+            return df
+        
+        dtypes = {
+            column: self.categories[domain]
+            for column, domain in CATEGORICAL_DOMAINS.items()
+            if column in df.columns and domain in self.categories
+        }
+        dtypes.update({column: 'float32' for column in FLOAT32_COLUMNS if column in df.columns})
+        for column in ('departure_time', 'arrival_time'):
+            if column in df.columns and df[column].dtype == object:
+                dtypes[column] = 'datetime64[s]'
+        return df.astype(dtypes)
+    
+    def evaluate_preferences(self, roster_df):
+        """Score weighted preference satisfaction of a roster"""
+        result = {'score': 0.0, 'satisfied': 0, 'violated': 0}
+        if roster_df is None or roster_df.empty or not self.crew_preferences:
+            return result
+        
+        arrays = self.preference_arrays
+        crew = arrays['crew_ids'].get_indexer(roster_df['crew_id'].astype(str))
+        flights = arrays['flight_ids'].get_indexer(roster_df['flight_id'].astype(str))
+        known = (crew >= 0) & (flights >= 0)
+        crew, flights = crew[known], flights[known]
+        
+        scores = _lookup_weights(arrays['routes'], crew * arrays['route_span'] + arrays['route'][flights])
+        scores -= _lookup_weights(arrays['day_off'], crew * arrays['day_span'] + arrays['day_index'][flights])
+        scores -= np.where(arrays['is_red_eye'][flights], arrays['no_red_eye'][crew], 0.0)
+        
+        result['score'] = float(scores.sum())
+        result['satisfied'] = int((scores > 0).sum())
+        result['violated'] = int((scores < 0).sum())
+        return result
\ No newline at end of file
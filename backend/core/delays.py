@@ -0,0 +1,152 @@
+from collections import defaultdict, deque
+
+import pandas as pd
+
+from core.replacements import MINUTES_PER_DAY, role_group
+
+
+class DelayPropagator:
+    """Apply a flight delay to a roster and repair only the crew timelines it touches
+
+    The crew-connection dependency graph is implicit in the roster: a delayed
+    flight affects each of its crew members' next duty (rest gap or missed
+    connection) and their duty day (overrun). Each conflict is repaired by handing
+    the later seat to the best legal substitute from the ReplacementIndex. A crew
+    member who cannot make the next departure at all and has no substitute delays
+    that flight instead, which is queued and propagated in turn (knock-on delay).
+    Rest and duty conflicts without a substitute are reported as unresolved.
+    """
+
+    def __init__(self, replacements, rules, min_connection_hours=0.5, max_knock_on=20):
+        self.replacements = replacements
+        self.rules = rules
+        self.min_connection = int(min_connection_hours * 60)
+        self.max_knock_on = max_knock_on
+
+    def apply(self, roster, flight_id, delay_minutes):
+        """Return (repaired roster, report) for delaying `flight_id` by `delay_minutes`"""
+        if not (roster['flight_id'] == flight_id).any():
+            raise KeyError(f"Flight {flight_id} is not in the roster")
+
+        roster = roster.copy()
+        departures = pd.to_datetime(roster['departure_time'])
+        arrivals = pd.to_datetime(roster['arrival_time'])
+        self.departure = (departures.astype('datetime64[s]').astype('int64') // 60).to_numpy().copy()
+        self.arrival = (arrivals.astype('datetime64[s]').astype('int64') // 60).to_numpy().copy()
+        self.hours = roster['duty_hours'].astype(float).to_numpy().copy()
+        self.crew = roster['crew_id'].astype(object).to_numpy().copy()
+        self.roles = roster['role'].astype(object).to_numpy().copy()
+        self.flight_ids = roster['flight_id'].astype(object).to_numpy()
+
+        self.rows_by_crew = defaultdict(list)
+        self.rows_by_flight = defaultdict(list)
+        for row, (crew_id, row_flight) in enumerate(zip(self.crew, self.flight_ids)):
+            self.rows_by_crew[crew_id].append(row)
+            self.rows_by_flight[row_flight].append(row)
+
+        report = {'delayed_flights': [], 'substitutions': [], 'unresolved': [], 'affected_crew': set()}
+        self.used_substitutes = set()
+        # Queue entries carry the earliest departure a flight can make, so two late crew don't add up
+        first_row = self.rows_by_flight[flight_id][0]
+        queue = deque([(flight_id, self.departure[first_row] + int(delay_minutes), None)])
+        while queue:
+            delayed_flight, earliest_departure, cause = queue.popleft()
+            minutes = int(earliest_departure - self.departure[self.rows_by_flight[delayed_flight][0]])
+            if minutes <= 0:
+                continue
+            if len(report['delayed_flights']) > self.max_knock_on:
+                report['unresolved'].append({'type': 'knock_on_limit', 'flight_id': delayed_flight})
+                break
+            report['delayed_flights'].append({'flight_id': delayed_flight, 'delay_minutes': minutes, 'caused_by': cause})
+            self._shift(delayed_flight, minutes)
+            for row in list(self.rows_by_flight[delayed_flight]):
+                report['affected_crew'].add(self.crew[row])
+                queue.extend(self._repair_next_duty(row, report))
+                self._repair_duty_day(row, report)
+
+        delayed = {entry['flight_id'] for entry in report['delayed_flights']}
+        changed = roster['flight_id'].isin(delayed).to_numpy()
+        roster.loc[changed, 'departure_time'] = pd.to_datetime(self.departure[changed] * 60, unit='s')
+        roster.loc[changed, 'arrival_time'] = pd.to_datetime(self.arrival[changed] * 60, unit='s')
+        roster['duty_hours'] = self.hours.astype(roster['duty_hours'].dtype)
+        roster['crew_id'] = pd.array(self.crew, dtype=roster['crew_id'].dtype)
+        roster['role'] = pd.array(self.roles, dtype=roster['role'].dtype)
+        report['affected_crew'] = sorted(report['affected_crew'])
+        return roster, report
+
+    def _shift(self, flight_id, minutes):
+        """Move a flight later; waiting time counts as duty for its crew"""
+        for row in self.rows_by_flight[flight_id]:
+            self.departure[row] += minutes
+            self.arrival[row] += minutes
+            self.hours[row] += minutes / 60.0
+
+    def _timeline(self, crew_id):
+        return sorted(self.rows_by_crew[crew_id], key=lambda row: self.departure[row])
+
+    def _repair_next_duty(self, row, report):
+        """Resolve a short rest or missed connection before the crew member's next duty; returns knock-on delays"""
+        crew_id = self.crew[row]
+        timeline = self._timeline(crew_id)
+        position = timeline.index(row)
+        if position + 1 >= len(timeline):
+            return []
+        next_row = timeline[position + 1]
+        gap = self.departure[next_row] - self.arrival[row]
+        if gap >= (self.rules['min_rest'] - 0.5) * 60:
+            return []
+
+        next_flight = self.flight_ids[next_row]
+        if self._substitute(next_row, 'short_rest', report):
+            return []
+        if gap < self.min_connection:
+            # Nobody else can take the seat: the next flight waits for this crew member
+            return [(next_flight, self.arrival[row] + self.min_connection, crew_id)]
+        report['unresolved'].append({
+            'type': 'short_rest', 'crew_id': crew_id, 'flight_id': next_flight,
+            'rest_hours': round(gap / 60.0, 2)
+        })
+        return []
+
+    def _repair_duty_day(self, row, report):
+        """Hand later flights of an overrun duty day to substitutes, latest first"""
+        crew_id = self.crew[row]
+        day = self.departure[row] // MINUTES_PER_DAY
+        limit = self.rules['daily_limit'] + 0.5
+        same_day = [other for other in self._timeline(crew_id) if self.departure[other] // MINUTES_PER_DAY == day]
+        total = sum(self.hours[other] for other in same_day)
+        for later in reversed(same_day):
+            if total <= limit or later == row or self.departure[later] < self.departure[row]:
+                break
+            if self._substitute(later, 'duty_overrun', report):
+                total -= self.hours[later]
+        if total > limit:
+            report['unresolved'].append({
+                'type': 'duty_overrun', 'crew_id': crew_id, 'flight_id': self.flight_ids[row],
+                'duty_hours': round(float(total), 2)
+            })
+
+    def _substitute(self, row, reason, report):
+        """Give a seat to the best legal substitute; False if there is none"""
+        index = self.replacements
+        flight_id = self.flight_ids[row]
+        flight = dict(index.flights[flight_id], departure_minute=int(self.departure[row]),
+                      arrival_minute=int(self.arrival[row]))
+        # Crew whose timelines changed during this repair are not in the index's view; skip them
+        excluded = {self.crew[other] for other in self.rows_by_flight[flight_id]}
+        excluded |= self.used_substitutes | set(report['affected_crew'])
+        candidates = index.legal_substitutes(flight, role_group(self.roles[row]), excluded)
+        if not candidates:
+            return False
+
+        substitute = candidates[0]
+        previous = self.crew[row]
+        self.rows_by_crew[previous].remove(row)
+        self.rows_by_crew[substitute].append(row)
+        self.crew[row] = substitute
+        self.roles[row] = index.crew[substitute]['role']
+        self.used_substitutes.add(substitute)
+        report['substitutions'].append({
+            'flight_id': flight_id, 'removed_crew': previous, 'replacement': substitute, 'reason': reason
+        })
+        return True
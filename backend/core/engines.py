@@ -0,0 +1,171 @@
+import math
+import multiprocessing as mp
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from core.island_optimizer import IslandOptimizer
+from core.local_search import LocalSearch
+from core.nsga import NSGA2Optimizer, RosterObjectives
+from core.optimizer import GeneticOptimizer
+from core.rule_engine import ALLOWED_BASE_PAIRS
+from optimizer_balanced import CoverageOptimizer
+
+# name -> engine(context, time_budget, patience) returning (roster, details)
+ENGINES = {}
+
+
+def register_engine(name, description):
+    """Add a rostering strategy to the registry under `name`"""
+    def decorator(engine):
+        engine.description = description
+        ENGINES[name] = engine
+        return engine
+    return decorator
+
+
+class EngineContext:
+    """Everything an engine needs for one run: a data snapshot and the tuning knobs
+
+    Engines only read the snapshot, so several can run on it at once. Contexts
+    are picklable for comparison runs in worker processes; the progress bus is
+    not, and is left out there.
+    """
+
+    def __init__(self, data_loader, rule_engine, settings, pairing_generator=None, robustness=None, progress=None):
+        self.data = data_loader
+        self.rule_engine = rule_engine
+        self.settings = settings
+        self.pairing_generator = pairing_generator
+        self.robustness = robustness
+        self.progress = progress
+
+    def optimizer(self):
+        """A fresh GA instance wired to the context's pairings, robustness model and progress bus"""
+        optimizer = GeneticOptimizer(self.data, self.rule_engine, self.settings['compliance_weight'])
+        optimizer.progress = self.progress
+        optimizer.pairing_generator = self.pairing_generator
+        optimizer.robustness, optimizer.robustness_weight = self.robustness, self.settings['robustness_weight']
+        return optimizer
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['progress'] = None
+        return state
+
+
+@register_engine('greedy', 'Three-phase greedy fill (warm_start / pairings seed it from history / pairings)')
+def greedy_engine(context, time_budget=None, patience=None):
+    optimizer = context.optimizer()
+    if context.settings.get('warm_start'):
+        return optimizer.generate_warm_start_roster(), {}
+    if context.settings.get('pairings'):
+        return optimizer.generate_pairing_roster(), {}
+    return optimizer.generate_random_roster(), {}
+
+
+@register_engine('coverage', 'Greedy fill for coverage alone, ignoring crew preferences')
+def coverage_engine(context, time_budget=None, patience=None):
+    roster, _ = CoverageOptimizer(context.data, context.rule_engine).generate_max_coverage_roster()
+    return roster, {}
+
+
+@register_engine('ga', 'Single-population genetic algorithm with early stopping')
+def ga_engine(context, time_budget=None, patience=None):
+    settings = context.settings
+    start_time = time.perf_counter()
+    optimizer = context.optimizer()
+    with optimizer.run_lock:
+        optimizer.create_initial_population(settings['population_size'], time_budget, settings['warm_start_ratio'],
+                                            settings['pairing_ratio'])
+        remaining = None if time_budget is None else max(0.0, time_budget - (time.perf_counter() - start_time))
+        roster, score = optimizer.run_optimization(settings['generations'], settings['crossover_rate'], remaining,
+                                                   patience)
+    return roster, {'score': float(score), 'generations_run': len(optimizer.history),
+                    'stop_reason': optimizer.stop_reason}
+
+
+@register_engine('island', 'Island-model GA with one process per island and ring migration')
+def island_engine(context, time_budget=None, patience=None):
+    settings = context.settings
+    optimizer = IslandOptimizer(
+        context.data, context.rule_engine, settings['island_count'], settings['migration_interval'],
+        settings['migration_size'], settings['crossover_rate'],
+        settings['warm_start_ratio'] if settings.get('warm_start') else 0.0, settings['compliance_weight'],
+        settings['pairing_ratio'] if settings.get('pairings') else 0.0, context.pairing_generator
+    )
+    optimizer.progress = context.progress
+    roster, score = optimizer.run_optimization(settings['population_size'], settings['generations'],
+                                               time_budget=time_budget, patience=patience)
+    return roster, {'score': float(score)}
+
+
+@register_engine('nsga2', 'Multi-objective NSGA-II returning a Pareto front')
+def nsga2_engine(context, time_budget=None, patience=None):
+    settings = context.settings
+    nsga_optimizer = NSGA2Optimizer(
+        context.optimizer(), RosterObjectives(context.data, context.rule_engine.limits(), ALLOWED_BASE_PAIRS),
+        settings['nsga_workers'], settings['crossover_rate'], settings['mutation_rate']
+    )
+    front = nsga_optimizer.run(settings['population_size'], settings['generations'], time_budget=time_budget)
+    # The highest-coverage trade-off is the engine's roster; the whole front is in the details
+    roster = front[0]['roster'] if front else None
+    return roster, {'pareto_front': front, 'generations_run': len(nsga_optimizer.history)}
+
+
+def improve_roster(context, roster, time_budget, seed=None):
+    """Tabu / annealing local search over a roster; returns (roster, stats)"""
+    settings = context.settings
+    search = LocalSearch(
+        context.data, context.rule_engine.limits(), ALLOWED_BASE_PAIRS, settings['fairness_weight'],
+        settings['tabu_tenure'], settings['initial_temperature'], settings['final_temperature']
+    )
+    return search.run(roster, time_budget, seed)
+
+
+def run_engine(name, context, time_budget=None, patience=None):
+    """Run a registered engine, then local search when the context asks for it; returns (roster, details)"""
+    if name not in ENGINES:
+        raise KeyError(f"Unknown engine '{name}', expected one of {sorted(ENGINES)}")
+    roster, details = ENGINES[name](context, time_budget, patience)
+    if context.settings.get('improve') and roster is not None and not roster.empty:
+        roster, details['local_search'] = improve_roster(context, roster, context.settings['improve_time_budget'])
+    return roster, details
+
+
+def measure_engine(name, context, time_budget=None, patience=None):
+    """Run an engine and report its coverage, violations, runtime and peak traced memory"""
+    tracemalloc.start()
+    start_time, start_cpu = time.perf_counter(), time.process_time()
+    try:
+        roster, details = run_engine(name, context, time_budget, patience)
+        runtime, cpu_time = time.perf_counter() - start_time, time.process_time() - start_cpu
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = {'engine': name, 'runtime_seconds': runtime, 'cpu_seconds': cpu_time,
+              'peak_memory_mb': peak / (1024 * 1024), 'covered_flights': 0, 'violations': None}
+    if roster is not None and not roster.empty:
+        violations = context.rule_engine.check_population_compliance([roster])
+        result['covered_flights'] = int(roster['flight_id'].nunique())
+        result['violations'] = {category: int(counts[0]) for category, counts in violations.items()}
+    if math.isfinite(details.get('score', math.nan)):
+        result['score'] = details['score']
+    return result
+
+
+def compare_engines(names, context, time_budget=None, patience=None):
+    """Run several engines at once, one process each, on the same context snapshot
+
+    Runtime is wall clock, so engines share the CPUs; CPU seconds and peak
+    traced memory are each engine's own process, without the island and
+    NSGA-II workers it starts. Tracing slows every engine alike, so times are
+    for ranking engines against each other rather than absolute.
+    """
+    unknown = [name for name in names if name not in ENGINES]
+    if unknown:
+        raise KeyError(f"Unknown engines: {', '.join(unknown)}")
+    with ProcessPoolExecutor(len(names), mp_context=mp.get_context()) as pool:
+        futures = [pool.submit(measure_engine, name, context, time_budget, patience) for name in names]
+        return [future.result() for future in futures]
@@ -0,0 +1,47 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class InputLock:
+    """Readers-writer lock over the loaded input tables, for one event loop
+
+    API requests hold it shared while they snapshot the inputs, not for their
+    whole run. An amendment builds new tables, rule-engine lookups, pairings and
+    shared-memory segment aside and holds it exclusively only to swap them in,
+    so no request picks up a half-updated set. A waiting writer blocks new
+    readers, so a stream of requests can't starve an upload.
+    """
+
+    def __init__(self):
+        self.readers = 0
+        self.writer = False
+        self.writers_waiting = 0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def shared(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self.writer and not self.writers_waiting)
+            self.readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.readers -= 1
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def exclusive(self):
+        async with self._condition:
+            self.writers_waiting += 1
+            try:
+                await self._condition.wait_for(lambda: not self.writer and not self.readers)
+            finally:
+                self.writers_waiting -= 1
+            self.writer = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.writer = False
+                self._condition.notify_all()
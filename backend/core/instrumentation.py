@@ -0,0 +1,182 @@
+import cProfile
+import contextvars
+import functools
+import io
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Latency buckets in seconds, from single rule checks up to full optimization runs
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+
+_active_profiles = contextvars.ContextVar('active_profiles', default=None)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    """Thread-safe registry of counters and latency histograms"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1, **labels):
+        """Add to a counter"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] += value
+
+    def observe(self, name, seconds, **labels):
+        """Record one latency observation"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time a block of code into a histogram"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start_time, **labels)
+
+    def timed(self, name, counter=None, **labels):
+        """Decorator form of timer(), optionally also counting calls in `counter`"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if counter is not None:
+                    self.increment(counter, **labels)
+                start_time = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start_time, **labels)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        """Drop all recorded values"""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def render_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(
+                (key, list(h.counts), h.total, h.count) for key, h in self.histograms.items()
+            )
+
+        lines = []
+        declared = set()
+        for (name, labels), value in counters:
+            if name not in declared:
+                lines.append(f"# TYPE {name} counter")
+                declared.add(name)
+            lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+        for (name, labels), counts, total, count in histograms:
+            if name not in declared:
+                lines.append(f"# TYPE {name} histogram")
+                declared.add(name)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', f'{bound:g}'),))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is requested while another one is being captured"""
+
+
+class ProfileCapture:
+    """Collect a cProfile report for the work one request hands to worker threads
+
+    Only code run through `call_profiled` is profiled, in the worker thread that
+    runs it, so coroutines of other requests on the event loop stay out of the
+    report. One capture runs at a time per process, because Python 3.12+ allows
+    a single active profiler; a second one raises ProfilerBusy.
+    """
+
+    _running = threading.Lock()
+
+    def __init__(self, limit=40):
+        self.limit = limit
+        self.profilers = []
+        self.report = None
+        self._token = None
+
+    def __enter__(self):
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusy("Another request is being profiled")
+        self._token = _active_profiles.set(self.profilers)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _active_profiles.reset(self._token)
+        self._running.release()
+
+        if not self.profilers:
+            self.report = "No profiled work: this request ran nothing through call_profiled\n"
+            return False
+        output = io.StringIO()
+        stats = pstats.Stats(self.profilers[0], stream=output)
+        for profiler in self.profilers[1:]:
+            stats.add(profiler)
+        stats.sort_stats('cumulative').print_stats(self.limit)
+        self.report = output.getvalue()
+        return False
+
+
+def call_profiled(func, *args, **kwargs):
+    """Run func, profiling it when the calling request has a ProfileCapture active"""
+    profilers = _active_profiles.get()
+    if profilers is None:
+        return func(*args, **kwargs)
+
+    profiler = cProfile.Profile()
+    profilers.append(profiler)
+    return profiler.runcall(func, *args, **kwargs)
+
+
+metrics = Metrics()
@@ -0,0 +1,212 @@
+import multiprocessing as mp
+import queue
+import random
+import time
+import numpy as np
+
+from core.optimizer import GeneticOptimizer
+from core.rule_engine import RuleEngine
+
+
+def _score_population(optimizer):
+    """Return (score, roster) pairs for an island population, best first"""
+    scores = optimizer.score_population(optimizer.population)
+    scored = [(float(score), roster) for score, roster in zip(scores, optimizer.population)]
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored
+
+
+class _IslandProgress:
+    """Forward an island's progress events to the parent process, dropping them when full"""
+
+    def __init__(self, events, island_id):
+        self.events = events
+        self.island_id = island_id
+
+    def publish(self, phase, **fields):
+        fields.update(phase=phase, island=self.island_id)
+        try:
+            self.events.put_nowait(fields)
+        except queue.Full:
+            pass
+
+
+def _run_island(island_id, data_loader, population_size, generations, migration_interval,
+                migration_size, crossover_rate, warm_start_ratio, pairing_ratio, pairing_generator,
+                compliance_weight, seed, deadline, patience, inbox, outbox, results, events):
+    """Evolve one island and exchange its best individuals with the next island in the ring"""
+    random.seed(seed)
+    np.random.seed(seed % (2 ** 32))
+
+    if outbox is not None:
+        # Migrants left unread by a retired neighbour must not block our exit
+        outbox.cancel_join_thread()
+    events.cancel_join_thread()
+
+    try:
+        optimizer = GeneticOptimizer(data_loader, RuleEngine(data_loader), compliance_weight)
+        optimizer.progress = _IslandProgress(events, island_id)
+        optimizer.pairing_generator = pairing_generator
+        start_time = time.time()
+        remaining = deadline - start_time if deadline is not None else None
+        optimizer.create_initial_population(population_size, remaining, warm_start_ratio, pairing_ratio)
+
+        # The initial population is scored up front, so an island whose deadline passed
+        # while building it still reports its best roster
+        best_score, best_roster = -float('inf'), None
+        scored = _score_population(optimizer)
+        if scored:
+            best_score, best_roster = scored[0]
+        running_best = best_score
+        history = []
+        completed = 0
+        stale_generations = 0
+        inbox_open = outbox is not None
+
+        while completed < generations:
+            remaining = deadline - time.time() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                break
+
+            epoch = min(migration_interval, generations - completed)
+            epoch_start = time.time() - start_time
+            epoch_roster, epoch_score = optimizer.run_optimization(epoch, crossover_rate, remaining)
+
+            # Stagnation is judged per generation against the best score seen so far
+            for record in optimizer.history:
+                if record['best_score'] > running_best:
+                    running_best = record['best_score']
+                    stale_generations = 0
+                else:
+                    stale_generations += 1
+                history.append(dict(record, generation=completed + record['generation'],
+                                    elapsed=epoch_start + record['elapsed']))
+            completed += len(optimizer.history)
+
+            if epoch_roster is not None and epoch_score > best_score:
+                best_score = epoch_score
+                best_roster = epoch_roster
+
+            if optimizer.stop_reason == 'time_budget':
+                break
+            if patience is not None and stale_generations >= patience:
+                break
+            if completed >= generations or outbox is None:
+                continue
+
+            # Ring migration: send our best, replace our worst with the neighbour's best
+            scored = _score_population(optimizer)
+            outbox.put([roster for _, roster in scored[:migration_size]])
+            migrants = []
+            if inbox_open:
+                timeout = max(1.0, deadline - time.time()) if deadline is not None else 300
+                try:
+                    migrants = inbox.get(timeout=timeout)
+                except queue.Empty:
+                    migrants = []
+                if migrants is None:
+                    # Neighbour has stopped; keep evolving without immigration
+                    inbox_open = False
+                    migrants = []
+
+            if migrants:
+                survivors = [roster for _, roster in scored[:len(scored) - len(migrants)]]
+                optimizer.population = survivors + migrants
+
+        if outbox is not None:
+            outbox.put(None)
+        results.put((island_id, best_score, best_roster, history))
+    except Exception as e:
+        print(f"Island {island_id} failed: {e}")
+        if outbox is not None:
+            outbox.put(None)
+        results.put((island_id, -float('inf'), None, []))
+
+
+class IslandOptimizer:
+    """Island-model genetic algorithm: sub-populations evolve in separate processes"""
+
+    def __init__(self, data_loader, rule_engine, num_islands=4, migration_interval=10,
+                 migration_size=2, crossover_rate=0.7, warm_start_ratio=0.0, compliance_weight=0.0,
+                 pairing_ratio=0.0, pairing_generator=None):
+        self.data = data_loader
+        self.rule_engine = rule_engine
+        self.num_islands = max(1, num_islands)
+        self.migration_interval = max(1, migration_interval)
+        self.migration_size = max(1, migration_size)
+        self.crossover_rate = crossover_rate
+        self.warm_start_ratio = warm_start_ratio
+        self.compliance_weight = compliance_weight
+        self.pairing_ratio = pairing_ratio
+        self.pairing_generator = pairing_generator
+        self.island_scores = {}
+        self.island_histories = {}
+        self.progress = None
+
+    def run_optimization(self, population_size=80, generations=100, seed=None, time_budget=None, patience=None):
+        """Run all islands in parallel and return the best roster found on any island"""
+        ctx = mp.get_context()
+        deadline = time.time() + time_budget if time_budget is not None else None
+        island_size = max(2, population_size // self.num_islands)
+        base_seed = seed if seed is not None else random.randrange(2 ** 31)
+
+        inboxes = [ctx.Queue() for _ in range(self.num_islands)]
+        results = ctx.Queue()
+        events = ctx.Queue(maxsize=1000)
+        processes = []
+
+        print(f"Starting {self.num_islands} islands x {island_size} rosters, "
+              f"migration every {self.migration_interval} generations")
+
+        for island_id in range(self.num_islands):
+            # Island i sends to island i+1; a single island has no neighbour
+            outbox = inboxes[(island_id + 1) % self.num_islands] if self.num_islands > 1 else None
+            process = ctx.Process(
+                target=_run_island,
+                args=(island_id, self.data, island_size, generations, self.migration_interval,
+                      self.migration_size, self.crossover_rate, self.warm_start_ratio, self.pairing_ratio,
+                      self.pairing_generator, self.compliance_weight, base_seed + island_id,
+                      deadline, patience, inboxes[island_id], outbox, results, events),
+                daemon=True
+            )
+            process.start()
+            processes.append(process)
+
+        best_score = -float('inf')
+        best_roster = None
+        self.island_scores = {}
+        self.island_histories = {}
+
+        try:
+            while len(self.island_scores) < len(processes):
+                self._relay_progress(events)
+                try:
+                    island_id, score, roster, history = results.get(timeout=0.25)
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes):
+                        break
+                    continue
+                self.island_scores[island_id] = float(score)
+                self.island_histories[island_id] = history
+                if roster is not None and score > best_score:
+                    best_score = score
+                    best_roster = roster
+            self._relay_progress(events)
+        finally:
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+
+        print(f"Island scores: {self.island_scores}")
+        return best_roster, best_score
+
+    def _relay_progress(self, events):
+        """Republish pending island events on the attached progress bus"""
+        while True:
+            try:
+                event = events.get_nowait()
+            except queue.Empty:
+                return
+            if self.progress is not None:
+                self.progress.publish(**event)
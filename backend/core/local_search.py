@@ -0,0 +1,389 @@
+import bisect
+import math
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.replacements import MINUTES_PER_DAY, PILOT_ROLES, role_group
+
+MOVE_KINDS = ('move', 'swap', 'shift')
+
+
+def _minutes(times):
+    return (pd.to_datetime(times).astype('datetime64[s]').astype('int64') // 60).to_numpy()
+
+
+class LocalSearch:
+    """Tabu-guarded simulated annealing over crew-to-seat assignments
+
+    The roster is encoded as flat arrays, with per-crew state: sorted duty
+    timelines, hours per day, rolling 7-day window sums and duty-day counts.
+    A move updates only the crews it touches and returns the change in the
+    objective. If the move is rejected it is undone the same way, so no move
+    rescans the roster.
+
+    The objective is the DGCA violation count plus `fairness_weight` times the
+    variance of duty hours across active crew. Violations use the rules and
+    tolerances of the population compliance kernel. Moves:
+      move   one seat goes to another crew member of the same rank or cabin group
+      swap   two crew members of the same group trade seats on different flights
+      shift  one crew member's whole duty day goes to another crew member
+    A seat a crew member just left is tabu for them for `tabu_tenure`
+    iterations, unless returning to it would beat the best roster so far.
+    """
+
+    def __init__(self, data_loader, rules, allowed_base_pairs, fairness_weight=0.1, tabu_tenure=50,
+                 initial_temperature=2.0, final_temperature=0.01):
+        self.data = data_loader
+        self.rules = rules
+        self.fairness_weight = fairness_weight
+        self.tabu_tenure = tabu_tenure
+        self.initial_temperature = initial_temperature
+        self.final_temperature = final_temperature
+
+        crew = data_loader.crew.drop_duplicates('crew_id')
+        self.crew_ids = [str(crew_id) for crew_id in crew['crew_id']]
+        self.crew_code = {crew_id: code for code, crew_id in enumerate(self.crew_ids)}
+        self.crew_roles = crew['role'].astype(str).tolist()
+        self.crew_groups = [role_group(role) for role in self.crew_roles]
+        self.crew_bases = crew['base'].astype(str).tolist()
+        self.active = (crew['status'].astype(str) == 'ACTIVE').tolist()
+        self.qualifications = [set(quals.split('|')) for quals in crew['qualifications'].astype(str)]
+        self.allowed_bases = allowed_base_pairs
+        self.active_count = max(1, sum(self.active))
+        self.fairness_scale = fairness_weight / self.active_count
+
+        self.rest_gap = (rules['min_rest'] - 0.5) * 60
+        self.daily_limit = rules['daily_limit'] + 0.5
+        self.weekly_limit = rules['weekly_limit'] + 2
+        self.max_streak = rules['max_streak']
+
+    def _encode(self, roster):
+        """Flat per-seat arrays plus static per-seat penalties"""
+        self.roster = roster.reset_index(drop=True)
+        self.seat_crew = [self.crew_code.get(str(crew_id), -1) for crew_id in self.roster['crew_id']]
+        self.seat_flight = self.roster['flight_id'].astype(str).tolist()
+        self.seat_hours = self.roster['duty_hours'].astype(float).tolist()
+        self.seat_departure = _minutes(self.roster['departure_time']).tolist()
+        self.seat_arrival = _minutes(self.roster['arrival_time']).tolist()
+        self.first_day = min(self.seat_departure) // MINUTES_PER_DAY if self.seat_departure else 0
+        self.seat_day = [departure // MINUTES_PER_DAY - self.first_day for departure in self.seat_departure]
+        self.day_count = max(self.seat_day, default=0) + 1
+
+        flights = self.data.flights.drop_duplicates('flight_id')
+        origin = dict(zip(flights['flight_id'].astype(str), flights['origin'].astype(str)))
+        aircraft = dict(zip(flights['flight_id'].astype(str), flights['aircraft_type'].astype(str)))
+        self.seat_origin = [origin.get(flight_id, '') for flight_id in self.seat_flight]
+        self.seat_aircraft = [aircraft.get(flight_id, '') for flight_id in self.seat_flight]
+        self.seat_group = [
+            role_group(role) if code < 0 else self.crew_groups[code]
+            for code, role in zip(self.seat_crew, self.roster['role'].astype(str))
+        ]
+
+        # Candidates per (group, aircraft): active crew of the group, type-rated when they are pilots
+        self.candidates = {}
+        for group, aircraft_type in set(zip(self.seat_group, self.seat_aircraft)):
+            self.candidates[(group, aircraft_type)] = [
+                code for code in range(len(self.crew_ids))
+                if self.active[code] and self.crew_groups[code] == group
+                and (group not in PILOT_ROLES or aircraft_type in self.qualifications[code])
+            ]
+        self.group_seats = {}
+        for seat, group in enumerate(self.seat_group):
+            self.group_seats.setdefault(group, []).append(seat)
+
+    def _seat_penalty(self, seat, code):
+        """Per-assignment violations of giving `seat` to crew `code`: status, base, qualification"""
+        if code < 0:
+            return 0
+        penalty = 0 if self.active[code] else 1
+        base, origin = self.crew_bases[code], self.seat_origin[seat]
+        if base != origin and origin not in self.allowed_bases.get(base, ()):
+            penalty += 1
+        if self.crew_groups[code] in PILOT_ROLES and self.seat_aircraft[seat] not in self.qualifications[code]:
+            penalty += 1
+        return penalty
+
+    def _build_state(self):
+        """Per-crew timelines and duty aggregates, and the objective components"""
+        crews = len(self.crew_ids)
+        self.timelines = [[] for _ in range(crews)]     # sorted [(departure, arrival, seat)]
+        self.day_hours = [[0.0] * self.day_count for _ in range(crews)]
+        self.day_duties = [[0] * self.day_count for _ in range(crews)]
+        self.window_hours = [[0.0] * self.day_count for _ in range(crews)]  # window k = days k..k+6
+        self.total_hours = [0.0] * crews
+        self.weekly_over = [0] * crews
+        self.streak_over = [0] * crews
+        self.flight_crew = {}
+        for seat, code in enumerate(self.seat_crew):
+            if code < 0:
+                continue
+            bisect.insort(self.timelines[code], (self.seat_departure[seat], self.seat_arrival[seat], seat))
+            day, hours = self.seat_day[seat], self.seat_hours[seat]
+            self.day_hours[code][day] += hours
+            self.day_duties[code][day] += 1
+            for start in range(max(0, day - 6), day + 1):
+                self.window_hours[code][start] += hours
+            self.total_hours[code] += hours
+            self.flight_crew.setdefault(self.seat_flight[seat], []).append(code)
+
+        self.violations = sum(self._seat_penalty(seat, code) for seat, code in enumerate(self.seat_crew))
+        for flight_crew in self.flight_crew.values():
+            self.violations += len(flight_crew) - len(set(flight_crew))
+        for code in range(crews):
+            self.violations += self._crew_violations(code)
+        self.square_hours = sum(hours * hours for code, hours in enumerate(self.total_hours) if self.active[code])
+        self.mean_hours = sum(hours for code, hours in enumerate(self.total_hours) if self.active[code]) / self.active_count
+
+    def _crew_violations(self, code):
+        """Rest, daily, weekly and streak violations of one crew member's whole timeline"""
+        timeline = self.timelines[code]
+        count = sum(1 for previous, current in zip(timeline, timeline[1:]) if current[0] - previous[1] < self.rest_gap)
+        count += sum(1 for hours in self.day_hours[code] if hours > self.daily_limit)
+        self.weekly_over[code], self.streak_over[code] = self._weekly(code), self._streak(code)
+        return count + self.weekly_over[code] + self.streak_over[code]
+
+    def _weekly(self, code):
+        return 1 if max(self.window_hours[code], default=0.0) > self.weekly_limit else 0
+
+    def _streak(self, code):
+        """1 if duty days, allowing one rest day inside a run, form a run longer than max_streak"""
+        run = 0
+        last = None
+        for day, duties in enumerate(self.day_duties[code]):
+            if not duties:
+                continue
+            run = run + 1 if last is not None and day - last <= 2 else 1
+            if run > self.max_streak:
+                return 1
+            last = day
+        return 0
+
+    def objective(self):
+        variance = self.square_hours / self.active_count - self.mean_hours ** 2
+        return self.violations + self.fairness_weight * variance
+
+    def _remove(self, seat, code):
+        """Take `seat` from crew `code`; returns the objective delta"""
+        timeline = self.timelines[code]
+        departure, arrival = self.seat_departure[seat], self.seat_arrival[seat]
+        position = bisect.bisect_left(timeline, (departure, arrival, seat))
+        delta = -self._seat_penalty(seat, code)
+        previous = timeline[position - 1] if position > 0 else None
+        following = timeline[position + 1] if position + 1 < len(timeline) else None
+        if previous is not None and departure - previous[1] < self.rest_gap:
+            delta -= 1
+        if following is not None and following[0] - arrival < self.rest_gap:
+            delta -= 1
+        if previous is not None and following is not None and following[0] - previous[1] < self.rest_gap:
+            delta += 1
+        del timeline[position]
+        violations, fairness = self._change_hours(code, seat, -self.seat_hours[seat], -1)
+        delta += violations
+
+        flight_crew = self.flight_crew[self.seat_flight[seat]]
+        if flight_crew.count(code) > 1:
+            delta -= 1
+        flight_crew.remove(code)
+        self.violations += delta
+        return delta + fairness
+
+    def _add(self, seat, code):
+        """Give `seat` to crew `code`; returns the objective delta"""
+        timeline = self.timelines[code]
+        departure, arrival = self.seat_departure[seat], self.seat_arrival[seat]
+        position = bisect.bisect_left(timeline, (departure, arrival, seat))
+        delta = self._seat_penalty(seat, code)
+        previous = timeline[position - 1] if position > 0 else None
+        following = timeline[position] if position < len(timeline) else None
+        if previous is not None and departure - previous[1] < self.rest_gap:
+            delta += 1
+        if following is not None and following[0] - arrival < self.rest_gap:
+            delta += 1
+        if previous is not None and following is not None and following[0] - previous[1] < self.rest_gap:
+            delta -= 1
+        timeline.insert(position, (departure, arrival, seat))
+        violations, fairness = self._change_hours(code, seat, self.seat_hours[seat], 1)
+        delta += violations
+
+        flight_crew = self.flight_crew.setdefault(self.seat_flight[seat], [])
+        if code in flight_crew:
+            delta += 1
+        flight_crew.append(code)
+        self.violations += delta
+        return delta + fairness
+
+    def _change_hours(self, code, seat, hours, duties):
+        """Update daily, 7-day, streak and fairness state for one duty; returns (violation, fairness) deltas"""
+        day = self.seat_day[seat]
+        day_hours = self.day_hours[code]
+        before = day_hours[day] > self.daily_limit
+        day_hours[day] += hours
+        delta = (day_hours[day] > self.daily_limit) - before
+
+        # Adding hours can only raise the weekly and streak flags and removing them only clear them
+        windows = self.window_hours[code]
+        start = max(0, day - 6)
+        for window in range(start, day + 1):
+            windows[window] += hours
+        weekly = self.weekly_over[code]
+        if hours > 0 and not weekly and max(windows[start:day + 1]) > self.weekly_limit:
+            self.weekly_over[code] = 1
+            delta += 1
+        elif hours < 0 and weekly and self._weekly(code) == 0:
+            self.weekly_over[code] = 0
+            delta -= 1
+
+        day_duties = self.day_duties[code]
+        occupied = day_duties[day] > 0
+        day_duties[day] += duties
+        if occupied != (day_duties[day] > 0) and self.streak_over[code] == (duties < 0):
+            streak = self._streak(code)
+            delta += streak - self.streak_over[code]
+            self.streak_over[code] = streak
+
+        if self.active[code]:
+            total = self.total_hours[code]
+            fairness = self.fairness_scale * hours * (2 * total + hours)
+            self.square_hours += hours * (2 * total + hours)
+        else:
+            fairness = 0.0
+        self.total_hours[code] += hours
+        return delta, fairness
+
+    def _reassign(self, seat, code):
+        """Move `seat` to crew `code`; returns (delta, undo)"""
+        previous = self.seat_crew[seat]
+        delta = self._remove(seat, previous) if previous >= 0 else 0.0
+        delta += self._add(seat, code)
+        self.seat_crew[seat] = code
+        return delta, [(seat, previous, code)]
+
+    def _undo(self, changes):
+        for seat, previous, code in reversed(changes):
+            self._remove(seat, code)
+            if previous >= 0:
+                self._add(seat, previous)
+            self.seat_crew[seat] = previous
+
+    def _propose(self, kind):
+        """Apply a random move of `kind`; returns (delta, undo, tabu pairs) or None if none was found"""
+        seat_crew = self.seat_crew
+        seat = random.randrange(len(seat_crew))
+        current = seat_crew[seat]
+        candidates = self.candidates[(self.seat_group[seat], self.seat_aircraft[seat])]
+        if current < 0 or not candidates:
+            return None
+
+        if kind == 'move':
+            code = random.choice(candidates)
+            if code == current or code in self.flight_crew[self.seat_flight[seat]]:
+                return None
+            delta, undo = self._reassign(seat, code)
+            return delta, undo, [(seat, current)]
+
+        if kind == 'swap':
+            other = random.choice(self.group_seats[self.seat_group[seat]])
+            other_crew = seat_crew[other]
+            if other_crew < 0 or other_crew == current or self.seat_flight[other] == self.seat_flight[seat]:
+                return None
+            if other_crew not in candidates or current not in self.candidates[(self.seat_group[other], self.seat_aircraft[other])]:
+                return None
+            if other_crew in self.flight_crew[self.seat_flight[seat]] or current in self.flight_crew[self.seat_flight[other]]:
+                return None
+            delta, undo = self._reassign(seat, other_crew)
+            more, more_undo = self._reassign(other, current)
+            return delta + more, undo + more_undo, [(seat, current), (other, other_crew)]
+
+        # shift: the crew member's whole duty day on this seat's day goes to another crew member
+        code = random.choice(candidates)
+        day = self.seat_day[seat]
+        seats = [duty[2] for duty in self.timelines[current] if self.seat_day[duty[2]] == day]
+        if code == current:
+            return None
+        for moved in seats:
+            allowed = self.candidates[(self.seat_group[moved], self.seat_aircraft[moved])]
+            if code not in allowed or code in self.flight_crew[self.seat_flight[moved]]:
+                return None
+        delta, undo = 0.0, []
+        for moved in seats:
+            more, more_undo = self._reassign(moved, code)
+            delta += more
+            undo += more_undo
+        return delta, undo, [(moved, current) for moved in seats]
+
+    def run(self, roster, time_budget=5.0, seed=None, max_iterations=None):
+        """Improve a roster within `time_budget` seconds; returns (best roster, stats)"""
+        if roster is None or roster.empty:
+            return roster, {'iterations': 0}
+        if seed is not None:
+            random.seed(seed)
+        self._encode(roster)
+        self._build_state()
+
+        start_time = time.perf_counter()
+        current = initial = self.objective()
+        initial_violations = self.violations
+        best, best_assignment = current, list(self.seat_crew)
+        tabu = {}
+        iteration = accepted = evaluated = 0
+        temperature = self.initial_temperature
+        cooling = math.log(self.final_temperature / self.initial_temperature)
+        kinds = random.choices(MOVE_KINDS, weights=(6, 3, 1), k=4096)
+
+        while max_iterations is None or iteration < max_iterations:
+            iteration += 1
+            if iteration % 1024 == 0:
+                elapsed = time.perf_counter() - start_time
+                if elapsed >= time_budget:
+                    break
+                temperature = self.initial_temperature * math.exp(cooling * elapsed / time_budget)
+
+            proposal = self._propose(kinds[iteration & 4095])
+            if proposal is None:
+                continue
+            evaluated += 1
+            delta, undo, left = proposal
+            candidate = current + delta
+            is_tabu = any(tabu.get((seat, self.seat_crew[seat]), 0) > iteration for seat, _ in left)
+            if (is_tabu and candidate >= best - 1e-9) or (
+                delta > 1e-9 and random.random() >= math.exp(-delta / temperature)
+            ):
+                self._undo(undo)
+                continue
+
+            accepted += 1
+            current = candidate
+            for seat, code in left:
+                tabu[(seat, code)] = iteration + self.tabu_tenure
+            if current < best - 1e-9:
+                best, best_assignment = current, list(self.seat_crew)
+
+        elapsed = time.perf_counter() - start_time
+        improved = self.roster.copy()
+        codes = np.array(best_assignment)
+        changed = codes != np.array([self.crew_code.get(str(crew_id), -1) for crew_id in self.roster['crew_id']])
+        improved_crew = improved['crew_id'].to_numpy(dtype=object, copy=True)
+        improved_roles = improved['role'].to_numpy(dtype=object, copy=True)
+        for seat in np.flatnonzero(changed):
+            improved_crew[seat] = self.crew_ids[codes[seat]]
+            improved_roles[seat] = self.crew_roles[codes[seat]]
+        improved['crew_id'] = pd.array(improved_crew, dtype=roster['crew_id'].dtype)
+        improved['role'] = pd.array(improved_roles, dtype=roster['role'].dtype)
+
+        self.seat_crew = best_assignment
+        self._build_state()
+        return improved, {
+            'iterations': iteration,
+            'moves_evaluated': evaluated,
+            'moves_accepted': accepted,
+            'moves_per_second': evaluated / elapsed if elapsed > 0 else 0.0,
+            'elapsed_seconds': elapsed,
+            'initial_objective': initial,
+            'final_objective': self.objective(),
+            'initial_violations': initial_violations,
+            'final_violations': self.violations,
+            'seats_changed': int(changed.sum())
+        }
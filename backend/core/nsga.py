@@ -0,0 +1,191 @@
+import multiprocessing as mp
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from deap import base, creator, tools
+
+from core.compliance_kernel import PopulationCompliance
+
+OBJECTIVES = ('coverage', 'violations', 'duty_variance', 'base_mismatch')
+# Maximize coverage; minimize DGCA violations, duty-hour variance and base mismatches
+OBJECTIVE_WEIGHTS = (1.0, -1.0, -1.0, -1.0)
+
+# DEAP resolves individuals through its creator module, so the types exist once per process
+if not hasattr(creator, 'RosterFitness'):
+    creator.create('RosterFitness', base.Fitness, weights=OBJECTIVE_WEIGHTS)
+if not hasattr(creator, 'RosterIndividual'):
+    creator.create('RosterIndividual', object, fitness=creator.RosterFitness)
+
+
+class RosterObjectives:
+    """Objective vectors of a batch of rosters from one pass of the population compliance kernel
+
+    DGCA violations exclude base mismatches, which are their own objective.
+    Duty variance is taken over every active crew member, idle ones at zero
+    hours, so spreading the same flying across more crew lowers it.
+    """
+
+    def __init__(self, data_loader, rules, allowed_base_pairs):
+        self.kernel = PopulationCompliance(data_loader, rules, allowed_base_pairs)
+        self.active = ~self.kernel.inactive
+        self.flight_count = len(self.kernel.flight_ids)
+        self.crew_count = len(self.kernel.crew_ids)
+
+    def __call__(self, population):
+        size = len(population)
+        counts = self.kernel.check(population)
+        individual, crew, flight, hours, _, _ = self.kernel.stack(population)
+
+        flown = np.unique(individual * self.flight_count + flight)
+        coverage = np.bincount(flown // self.flight_count, minlength=size)
+        crew_hours = np.bincount(individual * self.crew_count + crew, weights=hours,
+                                 minlength=size * self.crew_count).reshape(size, self.crew_count)
+        variance = crew_hours[:, self.active].var(axis=1) if self.active.any() else np.zeros(size)
+        violations = counts['total'] - counts['base_mismatch']
+        return [
+            (int(coverage[i]), int(violations[i]), float(variance[i]), int(counts['base_mismatch'][i]))
+            for i in range(size)
+        ]
+
+
+_worker_objectives = None
+
+
+def _init_worker(objectives):
+    global _worker_objectives
+    _worker_objectives = objectives
+
+
+def _evaluate_batch(population):
+    return _worker_objectives(population)
+
+
+class NSGA2Optimizer:
+    """Multi-objective roster search with DEAP's NSGA-II
+
+    Individuals wrap roster DataFrames; initial rosters, crossover and mutation
+    come from the GeneticOptimizer, so only selection differs from the scalar GA.
+    Evaluation goes through the toolbox `map`, which is a process pool's map when
+    `workers` > 1: each worker holds its own compliance kernel and scores one
+    batch of the offspring per generation.
+    """
+
+    def __init__(self, optimizer, objectives, workers=1, crossover_rate=0.7, mutation_rate=0.25):
+        self.optimizer = optimizer
+        self.objectives = objectives
+        self.workers = max(1, workers)
+        self.crossover_rate = crossover_rate
+        self.mutation_rate = mutation_rate
+        self.history = []
+        self.stop_reason = None
+
+        self.toolbox = base.Toolbox()
+        self.toolbox.register('map', map)
+        self.toolbox.register('select', tools.selNSGA2)
+
+    def individual(self, roster):
+        individual = creator.RosterIndividual()
+        individual.roster = roster
+        return individual
+
+    def evaluate(self, individuals):
+        """Score individuals without a valid fitness, in `workers` batches through the toolbox map"""
+        pending = [individual for individual in individuals if not individual.fitness.valid]
+        if not pending:
+            return
+        batches = [pending[start::self.workers] for start in range(self.workers)]
+        batches = [batch for batch in batches if batch]
+        results = self.toolbox.map(_evaluate_batch, [[individual.roster for individual in batch] for batch in batches])
+        for batch, values in zip(batches, results):
+            for individual, value in zip(batch, values):
+                individual.fitness.values = value
+
+    def vary(self, population):
+        """Offspring by crowded tournament, flight-level crossover and crew mutation"""
+        if len(population) % 4 == 0:
+            parents = tools.selTournamentDCD(population, len(population))
+        else:
+            parents = [random.choice(population) for _ in population]
+
+        offspring = []
+        for first, second in zip(parents[::2], parents[1::2]):
+            for parent, other in ((first, second), (second, first)):
+                if random.random() < self.crossover_rate:
+                    roster = self.optimizer.crossover_rosters(parent.roster, other.roster)
+                else:
+                    roster = parent.roster.copy()
+                if random.random() < self.mutation_rate:
+                    roster = self.optimizer.mutate_roster(roster.reset_index(drop=True))
+                offspring.append(self.individual(roster))
+        if len(parents) % 2:
+            offspring.append(self.individual(parents[-1].roster.copy()))
+        return offspring
+
+    def run(self, population_size=40, generations=50, time_budget=None, seed=None):
+        """Evolve a population and return its Pareto front as [{'objectives': {...}, 'roster': DataFrame}]"""
+        if seed is not None:
+            random.seed(seed)
+            np.random.seed(seed % (2 ** 32))
+        start_time = time.perf_counter()
+        self.history = []
+        self.stop_reason = 'generations'
+
+        self.optimizer.create_initial_population(population_size, time_budget)
+        population = [self.individual(roster) for roster in self.optimizer.population]
+        if not population:
+            return []
+
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(self.workers, mp_context=mp.get_context(),
+                                       initializer=_init_worker, initargs=(self.objectives,))
+            self.toolbox.register('map', pool.map)
+        else:
+            _init_worker(self.objectives)
+            self.toolbox.register('map', map)
+
+        try:
+            self.evaluate(population)
+            # Assigns crowding distances for the first tournament
+            population = self.toolbox.select(population, len(population))
+            for generation in range(generations):
+                elapsed = time.perf_counter() - start_time
+                if time_budget is not None and elapsed >= time_budget:
+                    self.stop_reason = 'time_budget'
+                    break
+
+                offspring = self.vary(population)
+                self.evaluate(offspring)
+                population = self.toolbox.select(population + offspring, len(population))
+
+                front = tools.sortNondominated(population, len(population), first_front_only=True)[0]
+                self.history.append({
+                    'generation': generation + 1,
+                    'front_size': len(front),
+                    'best_coverage': max(individual.fitness.values[0] for individual in front),
+                    'min_violations': min(individual.fitness.values[1] for individual in front),
+                    'elapsed': time.perf_counter() - start_time
+                })
+                self.optimizer.report_progress('optimization', total_flights=self.objectives.flight_count,
+                                               covered_flights=self.history[-1]['best_coverage'],
+                                               **self.history[-1])
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        return self.pareto_front(population)
+
+    def pareto_front(self, population):
+        """Non-dominated individuals with distinct objective vectors, highest coverage first"""
+        front = tools.sortNondominated(population, len(population), first_front_only=True)[0]
+        distinct = {}
+        for individual in front:
+            distinct.setdefault(individual.fitness.values, individual)
+        ordered = sorted(distinct.values(), key=lambda individual: (-individual.fitness.values[0],
+                                                                    individual.fitness.values[1:]))
+        return [
+            {'objectives': dict(zip(OBJECTIVES, individual.fitness.values)), 'roster': individual.roster}
+            for individual in ordered
+        ]
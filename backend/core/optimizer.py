@@ -1,246 +1,74 @@
+import functools
 import random
+import threading
+import time
 import pandas as pd
 import numpy as np
 from collections import defaultdict
 
-class GeneticOptimizer:
-    def __init__(self, data_loader, rule_engine):
-        self.data = data_loader
+from core.assignment import CrewAssigner
+from core.instrumentation import metrics
+from core.pairings import PairingGenerator, PILOT_DUTY_BUFFER, CABIN_DUTY_BUFFER
+
+def _exclusive(method):
+    """Run a method under the instance's run lock, so concurrent callers can't interleave one population"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.run_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class GeneticOptimizer(CrewAssigner):
+    """Genetic algorithm over whole rosters
+
+    `population`, `history` and `stop_reason` are per-run state, so a run
+    should use an instance of its own. Building the population and evolving it
+    both hold `run_lock`. A caller that shares an instance must hold the lock
+    across both steps.
+    """
+    def __init__(self, data_loader, rule_engine, compliance_weight=0.0):
+        super().__init__(data_loader)
+        self.run_lock = threading.RLock()
         self.rule_engine = rule_engine
+        self.compliance_weight = compliance_weight
         self.population = []
+        self.history = []
+        self.stop_reason = None
+        self.historical_pools = None
+        self.pairing_generator = None
+        self.robustness = None
+        self.robustness_weight = 0.0
         2
-    def generate_random_roster(self):
-        """Generate roster with maximum coverage while maintaining compliance"""
-        roster_entries = []
-        crew_duty_tracker = defaultdict(float)
-        covered_flights = set()
-        
-        # Sort flights by required crew (fewer crew = easier to cover)
-        flights_with_requirements = self.data.flights.copy()
-        flights_with_requirements['total_crew_required'] = (
-            flights_with_requirements['pilots_required'] + 
-            flights_with_requirements['cabin_crew_required']
-        )
-        sorted_flights = flights_with_requirements.sort_values('total_crew_required')
-       
-        print("Phase 1: Cover flights requiring least crew first (12h limit)...")
-        for _, flight in sorted_flights.iterrows():
-            if flight['flight_id'] in covered_flights:
-                continue
-                
-            flight_assignments = []
-            success = self.try_assign_crew(flight, flight_assignments, crew_duty_tracker, 12.0, True)
-            
-            if success:
-                roster_entries.extend(flight_assignments)
-                covered_flights.add(flight['flight_id'])
-                for assignment in flight_assignments:
-                    crew_duty_tracker[assignment['crew_id']] += assignment['duty_hours']
-        
-        phase1_coverage = len(covered_flights)
-        print(f"  Covered {phase1_coverage} flights")
-        
-        print("Phase 2: Cover more flights with underutilized crew (14h limit)...")
-        underutilized_crew = [crew_id for crew_id, hours in crew_duty_tracker.items() if hours < 8]
-        print(f"  Underutilized crew available: {len(underutilized_crew)}")
-        
-        for _, flight in sorted_flights.iterrows():
-            if flight['flight_id'] in covered_flights:
-                continue
-                
-            flight_assignments = []
-            success = self.try_assign_with_crew_pool(flight, flight_assignments, crew_duty_tracker, underutilized_crew, 14.0)
-            
-            if success:
-                roster_entries.extend(flight_assignments)
-                covered_flights.add(flight['flight_id'])
-                for assignment in flight_assignments:
-                    crew_id = assignment['crew_id']
-                    crew_duty_tracker[crew_id] += assignment['duty_hours']
-                    if crew_id in underutilized_crew and crew_duty_tracker[crew_id] >= 8:
-                        underutilized_crew.remove(crew_id)
-        
-        phase2_coverage = len(covered_flights)
-        print(f"  Covered {phase2_coverage - phase1_coverage} additional flights")
-        
-        print("Phase 3: Final push for maximum coverage (16h limit)...")
-        remaining_flights = sorted_flights[~sorted_flights['flight_id'].isin(covered_flights)]
-        
-        for _, flight in remaining_flights.iterrows():
-            if flight['flight_id'] in covered_flights:
-                continue
-                
-            flight_assignments = []
-            success = self.try_assign_crew(flight, flight_assignments, crew_duty_tracker, 16.0, False)
-            
-            if success:
-                roster_entries.extend(flight_assignments)
-                covered_flights.add(flight['flight_id'])
-                for assignment in flight_assignments:
-                    crew_duty_tracker[assignment['crew_id']] += assignment['duty_hours']
-        
-        final_coverage = len(covered_flights)
-        print(f"Final: Covered {final_coverage}/120 flights ({final_coverage/120:.1%})")
-        
-        return pd.DataFrame(roster_entries)
-    
-    def try_assign_crew(self, flight, flight_assignments, crew_duty_tracker, max_hours, require_base_match):
-        """Try to assign crew to a flight"""
-        # Assign pilots
-        pilots_assigned = self.assign_pilots(flight, flight_assignments, crew_duty_tracker, max_hours, require_base_match)
-        if pilots_assigned < flight['pilots_required']:
-            return False
-        
-        # Assign cabin crew
-        cabin_assigned = self.assign_cabin_crew(flight, flight_assignments, crew_duty_tracker, max_hours, require_base_match)
-        if cabin_assigned < flight['cabin_crew_required']:
-            return False
-        
-        return True
-    
-    def try_assign_with_crew_pool(self, flight, flight_assignments, crew_duty_tracker, crew_pool, max_hours):
-        """Assign using specific crew pool"""
-        crew_pool_set = set(crew_pool)
-        
-        # Get available pilots from pool
-        available_pilots = self.get_available_crew(
-            flight, ['Captain', 'First Officer'], crew_duty_tracker, max_hours, False
-        )
-        available_pilots = available_pilots[available_pilots['crew_id'].isin(crew_pool_set)]
-        
-        # Get available cabin crew from pool
-        available_cabin = self.get_available_crew(
-            flight, ['Senior Crew', 'Crew Member', 'Trainee'], crew_duty_tracker, max_hours, False
-        )
-        available_cabin = available_cabin[available_cabin['crew_id'].isin(crew_pool_set)]
-        
-        # Assign pilots
-        pilots_assigned = 0
-        required_pilots = flight['pilots_required']
-        
-        if not available_pilots.empty and len(available_pilots) >= required_pilots:
-            if required_pilots == 2:
-                captains = available_pilots[available_pilots['role'] == 'Captain']
-                fos = available_pilots[available_pilots['role'] == 'First Officer']
-                if len(captains) >= 1 and len(fos) >= 1:
-                    captain = captains.sample(1).iloc[0]
-                    fo = fos.sample(1).iloc[0]
-                    flight_assignments.extend([
-                        self.create_assignment(flight, captain, 'Captain'),
-                        self.create_assignment(flight, fo, 'First Officer')
-                    ])
-                    pilots_assigned = 2
-            else:
-                pilot = available_pilots.sample(1).iloc[0]
-                flight_assignments.append(self.create_assignment(flight, pilot, pilot['role']))
-                pilots_assigned = 1
-        
-        if pilots_assigned < required_pilots:
-            return False
-        
-        # Assign cabin crew
-        required_cabin = flight['cabin_crew_required']
-        if not available_cabin.empty and len(available_cabin) >= required_cabin:
-            selected = available_cabin.sample(required_cabin)
-            for _, crew_member in selected.iterrows():
-                flight_assignments.append(self.create_assignment(flight, crew_member, crew_member['role']))
-            return True
-        
-        return False
-    
-    def assign_pilots(self, flight, flight_assignments, crew_duty_tracker, max_hours, require_base_match):
-        """Assign pilots to flight"""
-        available_pilots = self.get_available_crew(
-            flight, ['Captain', 'First Officer'], crew_duty_tracker, max_hours, require_base_match
-        )
-        
-        if available_pilots.empty:
-            return 0
-            
-        required = flight['pilots_required']
-        
-        if len(available_pilots) >= required:
-            if required == 2:
-                captains = available_pilots[available_pilots['role'] == 'Captain']
-                fos = available_pilots[available_pilots['role'] == 'First Officer']
-                if len(captains) >= 1 and len(fos) >= 1:
-                    captain = captains.sample(1).iloc[0]
-                    fo = fos.sample(1).iloc[0]
-                    flight_assignments.extend([
-                        self.create_assignment(flight, captain, 'Captain'),
-                        self.create_assignment(flight, fo, 'First Officer')
-                    ])
-                    return 2
-            else:
-                pilot = available_pilots.sample(1).iloc[0]
-                flight_assignments.append(self.create_assignment(flight, pilot, pilot['role']))
-                return 1
-        
-        return 0
-    
-    def assign_cabin_crew(self, flight, flight_assignments, crew_duty_tracker, max_hours, require_base_match):
-        """Assign cabin crew to flight"""
-        available_cabin = self.get_available_crew(
-            flight, ['Senior Crew', 'Crew Member', 'Trainee'], crew_duty_tracker, max_hours, require_base_match
-        )
-        
-        if available_cabin.empty:
-            return 0
-            
-        required = flight['cabin_crew_required']
-        
-        if len(available_cabin) >= required:
-            selected = available_cabin.sample(required)
-            for _, crew_member in selected.iterrows():
-                flight_assignments.append(self.create_assignment(flight, crew_member, crew_member['role']))
-            return required
-        
-        return 0
+    def for_horizon(self, roster_df, cutoff, reopen=()):
+        """Split a roster at `cutoff` for rolling-horizon re-optimization
+
+        Assignments departing before the cutoff are frozen, except on flights listed
+        in `reopen`. The returned optimizer only sees the open flights (departing at
+        or after the cutoff, or reopened) that the frozen part doesn't already crew,
+        and starts every crew member's duty from their frozen hours.
+        Returns (frozen assignments, horizon optimizer).
+        """
+        departures = pd.to_datetime(roster_df['departure_time'])
+        frozen = roster_df[(departures < cutoff) & ~roster_df['flight_id'].isin(reopen)]
+        flights = self.data.flights
+        is_open = (flights['departure_time'] >= cutoff) | flights['flight_id'].isin(reopen)
+        open_flights = flights[is_open & ~flights['flight_id'].isin(frozen['flight_id'])]
+        return frozen, self.restricted(open_flights, frozen)
     
-    def get_available_crew(self, flight, roles, crew_duty_tracker, max_hours, require_base_match):
-        """Get available crew considering duty hours"""
-        try:
-            if require_base_match:
-                base_crew = self.data.get_crew_by_role(role=roles, base=flight['origin'], status='ACTIVE')
-            else:
-                base_crew = self.data.crew[
-                    (self.data.crew['role'].isin(roles)) & 
-                    (self.data.crew['status'] == 'ACTIVE')
-                ]
-            
-            if base_crew.empty:
-                return pd.DataFrame()
-            
-            available_crew = []
-            for _, crew_member in base_crew.iterrows():
-                crew_id = crew_member['crew_id']
-                current_duty = crew_duty_tracker.get(crew_id, 0)
-                flight_duration = flight['flight_duration_hours']
-                
-                duty_buffer = 0.5 if crew_member['role'] in ['Captain', 'First Officer'] else 0.3
-                proposed_duty = current_duty + flight_duration + duty_buffer
-                
-                if proposed_duty <= max_hours:
-                    available_crew.append(crew_member)
-            
-            return pd.DataFrame(available_crew)
-            
-        except Exception as e:
-            print(f"Error getting available crew: {e}")
-            return pd.DataFrame()
+    def for_flights(self, roster_df, flight_ids):
+        """Split a roster for re-crewing only `flight_ids`; returns (kept assignments, optimizer over those flights)"""
+        kept = roster_df[~roster_df['flight_id'].isin(flight_ids)]
+        flights = self.data.flights
+        return kept, self.restricted(flights[flights['flight_id'].isin(flight_ids)], kept)
     
-    def create_assignment(self, flight, crew_member, role):
-        """Create assignment record with time information"""
-        duty_buffer = 0.5 if role in ['Captain', 'First Officer'] else 0.3
-        
-        return {
-            'flight_id': flight['flight_id'],
-            'crew_id': crew_member['crew_id'],
-            'role': role,
-            'duty_hours': flight['flight_duration_hours'] + duty_buffer,
-            'departure_time': flight['departure_time'],  # Added time info
-            'arrival_time': flight['arrival_time']       # Added time info
-        }
+    def restricted(self, flights, fixed_roster):
+        """An optimizer over some flights whose crew start from the duty of `fixed_roster`"""
+        restricted = GeneticOptimizer(self.data.restrict_flights(flights), self.rule_engine, self.compliance_weight)
+        restricted.progress = self.progress
+        restricted.historical_pools = self.historical_pools
+        restricted.robustness, restricted.robustness_weight = self.robustness, self.robustness_weight
+        restricted.base_duty = fixed_roster.groupby('crew_id', observed=True)['duty_hours'].sum().astype(float).to_dict()
+        return restricted
     
     def calculate_fitness(self, roster_df):
         """Fitness function for genetic algorithm"""
@@ -256,39 +84,247 @@ class GeneticOptimizer:
         score += coverage_ratio * 3000
         
         # Check duty hour compliance
-        crew_hours = roster_df.groupby('crew_id')['duty_hours'].sum()
+        crew_hours = roster_df.groupby('crew_id', observed=True)['duty_hours'].sum()
+        if self.base_duty:
+            crew_hours += pd.Series(self.base_duty).reindex(crew_hours.index, fill_value=0.0)
         duty_violations = (crew_hours > 14).sum() * 100 + (crew_hours > 12).sum() * 50
         score -= duty_violations
         
         # Check duplicates
         duplicates = self.count_duplicate_assignments(roster_df)
         score -= duplicates * 200
+        
+        # Reward crew preference satisfaction (days off, red-eyes, preferred routes)
+        score += self.data.evaluate_preferences(roster_df)['score'] * 10
         return score
     
+    def score_population(self, population):
+        """Fitness of every roster, minus per-violation and (optionally) expected-uncovered penalties"""
+        scores = np.array([self.calculate_fitness(roster) for roster in population], dtype=float)
+        if self.compliance_weight and len(population):
+            violations = self.rule_engine.check_population_compliance(population)['total']
+            scores -= violations * self.compliance_weight
+        if self.robustness_weight and self.robustness is not None:
+            # Common random numbers: every roster faces the same scenarios
+            scores -= self.robustness_weight * np.array(
+                [self.robustness.expected_uncovered(roster) for roster in population]
+            )
+        return scores
+    
     def count_duplicate_assignments(self, roster_df):
         """Count duplicate assignments"""
         if roster_df is None or roster_df.empty:
             return 0
         return roster_df.duplicated(subset=['flight_id', 'crew_id']).sum()
     
-    def create_initial_population(self, size=50):
-        """Create initial population for genetic algorithm"""
+    @_exclusive
+    def create_initial_population(self, size=50, time_budget=None, warm_start_ratio=0.0, pairing_ratio=0.0):
+        """Create initial population, seeding shares of it from historical rosters and from pairings"""
         self.population = []
-        for _ in range(size):
-            roster = self.generate_random_roster()
+        start_time = time.perf_counter()
+        warm_count = int(round(size * warm_start_ratio))
+        pairing_count = int(round(size * pairing_ratio))
+        for index in range(size):
+            # Keep at least one roster so optimization always has a starting point
+            if time_budget is not None and self.population and time.perf_counter() - start_time >= time_budget:
+                print(f"Population budget exhausted after {len(self.population)}/{size} rosters")
+                break
+            if index < warm_count:
+                roster = self.generate_warm_start_roster()
+            elif index < warm_count + pairing_count:
+                roster = self.generate_pairing_roster()
+            else:
+                roster = self.generate_random_roster()
             if roster is not None and not roster.empty:
                 self.population.append(roster)
+            self.report_progress('population', population_size=len(self.population), target_size=size,
+                                 elapsed=time.perf_counter() - start_time)
+    
+    def generate_warm_start_roster(self):
+        """Generate a roster seeded from historical pairings, with gaps filled greedily"""
+        return self.generate_random_roster(self.seed_from_history())
+    
+    def generate_pairing_roster(self):
+        """Generate a roster whose crew fly whole multi-leg pairings, with gaps filled greedily"""
+        return self.generate_random_roster(self.seed_from_pairings())
+    
+    def build_pairings(self, min_connection=0.5, max_connection=4.0, max_legs=4):
+        """Enumerate pairings over the flight connection graph within the daily duty limit"""
+        max_duty = self.rule_engine.dgca_rules.get('DGCA001', {}).get('value', 10)
+        self.pairing_generator = PairingGenerator(
+            self.data.flights, self.data.crew['base'].astype(str), max_duty, max_legs, min_connection, max_connection
+        )
+        self.pairing_generator.generate()
+        return self.pairing_generator
+    
+    def seed_from_pairings(self, max_hours=12.0):
+        """Crew closed multi-leg pairings as seed assignments; one crew set flies every leg"""
+        generator = self.pairing_generator or self.build_pairings()
+        seed_entries = []
+        crew_duty_tracker = self.initial_duty()
+        covered_flights = set()
+        
+        # Longest trips first; shuffled within a length for population diversity
+        pairings = generator.multi_leg()
+        random.shuffle(pairings)
+        pairings.sort(key=lambda pairing: -len(pairing.legs))
+        for pairing in pairings:
+            if covered_flights.intersection(pairing.flight_ids):
+                continue
+            pairing_assignments = self.assign_pairing(pairing, crew_duty_tracker, max_hours)
+            if pairing_assignments is None:
+                continue
+            
+            seed_entries.extend(pairing_assignments)
+            covered_flights.update(pairing.flight_ids)
+            for assignment in pairing_assignments:
+                crew_duty_tracker[assignment['crew_id']] += assignment['duty_hours']
+        
+        return seed_entries
+    
+    def assign_pairing(self, pairing, crew_duty_tracker, max_hours):
+        """Crew every leg of a pairing with the same base crew, sized for its most demanding leg, or return None"""
+        first_leg = pd.Series(pairing.legs[0])
+        pilots_required = max(int(leg['pilots_required']) for leg in pairing.legs)
+        cabin_required = max(int(leg['cabin_crew_required']) for leg in pairing.legs)
+        span = pairing.span_hours()
+        later_legs = [(leg.get('day_index', 0), leg.get('is_red_eye', False)) for leg in pairing.legs[1:]]
+        
+        def eligible(roles, buffer):
+            candidates = self.get_available_crew(first_leg, roles, crew_duty_tracker, max_hours, True)
+            if candidates.empty:
+                return candidates
+            # The whole trip must fit the duty limit and respect preferences on every leg
+            def fits(crew_id):
+                if crew_duty_tracker.get(crew_id, 0) + span + buffer > max_hours:
+                    return False
+                prefs = self.data.crew_preferences.get(crew_id)
+                return prefs is None or not any(prefs.conflicts(day, red_eye) for day, red_eye in later_legs)
+            return candidates[candidates['crew_id'].map(fits).astype(bool)].sample(frac=1)
+        
+        pilots = eligible(['Captain', 'First Officer'], PILOT_DUTY_BUFFER)
+        cabin = eligible(['Senior Crew', 'Crew Member', 'Trainee'], CABIN_DUTY_BUFFER)
+        if pilots.empty or len(cabin) < cabin_required:
+            return None
+        
+        # Pilots must be type-rated for every aircraft on the trip
+        qualified = pilots['qualifications'].astype(str).str.split('|').apply(pairing.aircraft_types.issubset)
+        pilots = pilots[qualified]
+        if pilots_required == 2:
+            captains = pilots[pilots['role'] == 'Captain']
+            first_officers = pilots[pilots['role'] == 'First Officer']
+            if captains.empty or first_officers.empty:
+                return None
+            selected = [captains.iloc[0], first_officers.iloc[0]]
+        else:
+            if len(pilots) < pilots_required:
+                return None
+            selected = [pilots.iloc[i] for i in range(pilots_required)]
+        selected += [cabin.iloc[i] for i in range(cabin_required)]
+        
+        # Ground time between legs is duty time; the report buffer is counted once, on the first leg
+        assignments = []
+        for leg, sit_hours in zip(pairing.legs, pairing.sit_hours):
+            for crew_member in selected:
+                assignment = self.create_assignment(leg, crew_member, crew_member['role'])
+                if sit_hours:
+                    assignment['duty_hours'] = leg['flight_duration_hours'] + sit_hours
+                assignments.append(assignment)
+        return assignments
     
-    def run_optimization(self, generations=100):
-        """Run genetic algorithm optimization"""
+    def build_historical_pools(self):
+        """Index historical crew by flight_id and by origin/time-of-day/aircraft pattern"""
+        by_flight = defaultdict(set)
+        by_pattern = defaultdict(set)
+        history = self.data.historical_rosters
+        if history is None or history.empty:
+            self.historical_pools = (by_flight, by_pattern)
+            return self.historical_pools
+        
+        flights = self.data.flights.drop_duplicates('flight_id').set_index('flight_id')
+        for flight_id, block in history.groupby('flight_id', sort=False, observed=True):
+            by_flight[flight_id].update(block['crew_id'])
+            if flight_id in flights.index:
+                by_pattern[self.flight_pattern(flights.loc[flight_id])].update(block['crew_id'])
+        
+        self.historical_pools = (by_flight, by_pattern)
+        return self.historical_pools
+    
+    def flight_pattern(self, flight):
+        """Key flights by origin, 6-hour time-of-day bucket and aircraft type"""
+        return (flight['origin'], flight['departure_time'].hour // 6, flight['aircraft_type'])
+    
+    def seed_from_history(self, max_hours=12.0):
+        """Map historical crew pairings onto the current schedule as seed assignments"""
+        by_flight, by_pattern = self.historical_pools or self.build_historical_pools()
+        seed_entries = []
+        crew_duty_tracker = self.initial_duty()
+        
+        for _, flight in self.data.flights.drop_duplicates('flight_id').iterrows():
+            # Prefer crew who flew this flight before, then crew from look-alike flights
+            pool = by_flight.get(flight['flight_id']) or by_pattern.get(self.flight_pattern(flight))
+            if not pool:
+                continue
+            
+            flight_assignments = self.assign_from_history(flight, pool, crew_duty_tracker, max_hours)
+            if flight_assignments is None:
+                continue
+            
+            seed_entries.extend(flight_assignments)
+            for assignment in flight_assignments:
+                crew_duty_tracker[assignment['crew_id']] += assignment['duty_hours']
+        
+        return seed_entries
+    
+    def assign_from_history(self, flight, pool, crew_duty_tracker, max_hours):
+        """Crew a flight from its historical crew pool, topping up missing seats greedily"""
+        pilots = self.get_available_crew(flight, ['Captain', 'First Officer'], crew_duty_tracker, max_hours, False)
+        cabin = self.get_available_crew(
+            flight, ['Senior Crew', 'Crew Member', 'Trainee'], crew_duty_tracker, max_hours, False
+        )
+        if pilots.empty or cabin.empty:
+            return None
+        
+        # Historical crew first (shuffled for population diversity), then everyone else at the same base
+        def ranked(candidates):
+            candidates = candidates.sample(frac=1)
+            priority = np.where(candidates['crew_id'].isin(pool), 0, np.where(candidates['base'] == flight['origin'], 1, 2))
+            return candidates.iloc[np.argsort(priority, kind='stable')]
+        
+        # Pilots must be type-rated for this aircraft
+        qualified = pilots['qualifications'].astype(str).str.split('|').apply(lambda quals: flight['aircraft_type'] in quals)
+        pilots = ranked(pilots[qualified])
+        cabin = ranked(cabin)
+        
+        if flight['pilots_required'] == 2:
+            captains = pilots[pilots['role'] == 'Captain']
+            first_officers = pilots[pilots['role'] == 'First Officer']
+            if captains.empty or first_officers.empty:
+                return None
+            selected_pilots = [captains.iloc[0], first_officers.iloc[0]]
+        else:
+            selected_pilots = [pilots.iloc[i] for i in range(min(len(pilots), flight['pilots_required']))]
+        
+        if len(selected_pilots) < flight['pilots_required'] or len(cabin) < flight['cabin_crew_required']:
+            return None
+        
+        selected = selected_pilots + [cabin.iloc[i] for i in range(flight['cabin_crew_required'])]
+        return [self.create_assignment(flight, crew_member, crew_member['role']) for crew_member in selected]
+    
+    @_exclusive
+    def run_optimization(self, generations=100, crossover_rate=0.0, time_budget=None, patience=None):
+        """Run genetic algorithm optimization, stopping early on time budget or stagnation"""
         best_score = -float('inf')
         best_roster = None
+        stale_generations = 0
+        start_time = time.perf_counter()
+        self.history = []
+        self.stop_reason = 'generations'
         
         for generation in range(generations):
-            scored_rosters = []
-            for roster in self.population:
-                score = self.calculate_fitness(roster)
-                scored_rosters.append((score, roster))
+            generation_start = time.perf_counter()
+            scores = self.score_population(self.population)
+            scored_rosters = [(float(score), roster) for score, roster in zip(scores, self.population)]
             
             scored_rosters.sort(key=lambda x: x[0], reverse=True)
             current_best_score, current_best_roster = scored_rosters[0]
@@ -296,19 +332,130 @@ class GeneticOptimizer:
             if current_best_score > best_score:
                 best_score = current_best_score
                 best_roster = current_best_roster.copy()
+                stale_generations = 0
+            else:
+                stale_generations += 1
             
-            top_rosters = [roster for _, roster in scored_rosters[:len(self.population)//4]]
+            # Record convergence so callers can trade quality for latency
+            elapsed = time.perf_counter() - start_time
+            self.history.append({
+                'generation': generation + 1,
+                'best_score': float(best_score),
+                'mean_score': float(np.mean([score for score, _ in scored_rosters])),
+                'covered_flights': int(best_roster['flight_id'].nunique()),
+                'elapsed': elapsed
+            })
+            self.report_progress('optimization', total_flights=len(self.data.flights), **self.history[-1])
+            
+            if patience is not None and stale_generations >= patience:
+                self.stop_reason = 'converged'
+                break
+            if time_budget is not None and elapsed >= time_budget:
+                self.stop_reason = 'time_budget'
+                break
+            
+            top_rosters = [roster for _, roster in scored_rosters[:max(1, len(self.population)//4)]]
             new_generation = top_rosters.copy()
             
             while len(new_generation) < len(self.population):
-                parent = random.choice(top_rosters)
-                child = self.mutate_roster(parent.copy())
+                if len(top_rosters) > 1 and random.random() < crossover_rate:
+                    parent_a, parent_b = random.sample(top_rosters, 2)
+                    child = self.mutate_roster(self.crossover_rosters(parent_a, parent_b))
+                else:
+                    parent = random.choice(top_rosters)
+                    child = self.mutate_roster(parent.copy())
                 new_generation.append(child)
             
             self.population = new_generation
+            metrics.observe('ga_generation_seconds', time.perf_counter() - generation_start)
 
         return best_roster, best_score
     
+    def crossover_rosters(self, parent_a, parent_b):
+        """Flight-level crossover: child takes each flight's crew block from one parent"""
+        blocks_a = {flight_id: block for flight_id, block in parent_a.groupby('flight_id', sort=False, observed=True)}
+        blocks_b = {flight_id: block for flight_id, block in parent_b.groupby('flight_id', sort=False, observed=True)}
+        
+        child_blocks = []
+        for flight_id in self.data.flights['flight_id'].unique():
+            block_a = blocks_a.get(flight_id)
+            block_b = blocks_b.get(flight_id)
+            if block_a is None and block_b is None:
+                continue
+            if block_a is None:
+                child_blocks.append(block_b)
+            elif block_b is None:
+                child_blocks.append(block_a)
+            else:
+                child_blocks.append(block_a if random.random() < 0.5 else block_b)
+        
+        if not child_blocks:
+            return pd.DataFrame()
+        
+        child = pd.concat(child_blocks, ignore_index=True)
+        return self.repair_roster(child)
+    
+    def repair_roster(self, roster_df, max_hours=16.0):
+        """Restore duty feasibility after crossover by replacing or dropping conflicting crew"""
+        if roster_df is None or roster_df.empty:
+            return roster_df
+        
+        flights_by_id = self.data.flights.drop_duplicates('flight_id').set_index('flight_id')
+        crew_duty_tracker = self.initial_duty()
+        repaired_entries = []
+        
+        # Walk flights chronologically so earlier flights keep their crew
+        ordered = roster_df.sort_values('departure_time', kind='stable')
+        for flight_id, block in ordered.groupby('flight_id', sort=False, observed=True):
+            flight = flights_by_id.loc[flight_id].copy()
+            flight['flight_id'] = flight_id
+            
+            block_entries = []
+            block_crew = set()
+            block_duty = defaultdict(float)
+            feasible = True
+            
+            for assignment in block.to_dict('records'):
+                crew_id = assignment['crew_id']
+                proposed_duty = crew_duty_tracker[crew_id] + block_duty[crew_id] + assignment['duty_hours']
+                
+                if crew_id in block_crew or proposed_duty > max_hours:
+                    replacement = self.find_replacement(
+                        flight, assignment['role'], crew_duty_tracker, block_crew, max_hours
+                    )
+                    if replacement is None:
+                        feasible = False
+                        break
+                    assignment = self.create_assignment(flight, replacement, replacement['role'])
+                    crew_id = assignment['crew_id']
+                
+                block_entries.append(assignment)
+                block_crew.add(crew_id)
+                block_duty[crew_id] += assignment['duty_hours']
+            
+            # A flight is either fully crewed or left uncovered
+            if not feasible:
+                continue
+            
+            repaired_entries.extend(block_entries)
+            for crew_id, hours in block_duty.items():
+                crew_duty_tracker[crew_id] += hours
+        
+        return self.data.compact_roster(pd.DataFrame(repaired_entries, columns=roster_df.columns))
+    
+    def find_replacement(self, flight, role, crew_duty_tracker, excluded_crew, max_hours):
+        """Find a substitute of the same role group who is not already on the flight"""
+        roles = [role] if role in ['Captain', 'First Officer'] else ['Senior Crew', 'Crew Member', 'Trainee']
+        available = self.get_available_crew(flight, roles, crew_duty_tracker, max_hours, False, False)
+        if available.empty:
+            return None
+        
+        available = available[~available['crew_id'].isin(excluded_crew)]
+        if available.empty:
+            return None
+        
+        return available.sample(1).iloc[0]
+    
     def mutate_roster(self, roster_df):
         """Mutate roster for genetic algorithm"""
         if roster_df.empty:
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+# Report/debrief time added once per pairing, matching the per-flight buffers of create_assignment
+PILOT_DUTY_BUFFER = 0.5
+CABIN_DUTY_BUFFER = 0.3
+
+
+class Pairing:
+    """A crew trip: consecutive legs flown by the same crew, starting at `base`"""
+    __slots__ = ('pairing_id', 'base', 'legs', 'sit_hours', 'aircraft_types', 'closed')
+
+    def __init__(self, pairing_id, base, legs, sit_hours, aircraft_types, closed):
+        self.pairing_id = pairing_id
+        self.base = base
+        self.legs = legs                # flight rows (dicts) in flying order
+        self.sit_hours = sit_hours      # ground time before each leg (0 for the first)
+        self.aircraft_types = aircraft_types
+        self.closed = closed            # True when the last leg lands back at `base`
+
+    @property
+    def flight_ids(self):
+        return [leg['flight_id'] for leg in self.legs]
+
+    def span_hours(self):
+        """First departure to last arrival"""
+        return (self.legs[-1]['arrival_time'] - self.legs[0]['departure_time']).total_seconds() / 3600
+
+    def to_dict(self):
+        return {
+            'pairing_id': self.pairing_id,
+            'base': self.base,
+            'flights': self.flight_ids,
+            'route': [self.legs[0]['origin']] + [leg['destination'] for leg in self.legs],
+            'departure_time': self.legs[0]['departure_time'],
+            'arrival_time': self.legs[-1]['arrival_time'],
+            'span_hours': round(self.span_hours(), 2),
+            'aircraft_types': sorted(self.aircraft_types),
+            'closed': self.closed
+        }
+
+
+class ConnectionGraph:
+    """Flight-to-flight connections, indexed by departure airport and departure time
+
+    Flight i connects to flight j when j leaves from i's destination between
+    `min_connection` and `max_connection` hours after i lands. Departures of every
+    airport are kept sorted, so each flight's successors are one searchsorted range.
+    """
+
+    def __init__(self, flights, min_connection=0.5, max_connection=4.0):
+        self.flights = flights.drop_duplicates('flight_id').reset_index(drop=True)
+        self.records = self.flights.to_dict('records')
+        departure = pd.to_datetime(self.flights['departure_time']).astype('datetime64[s]').astype('int64').to_numpy() // 60
+        arrival = pd.to_datetime(self.flights['arrival_time']).astype('datetime64[s]').astype('int64').to_numpy() // 60
+        self.departure, self.arrival = departure, arrival
+
+        self.by_airport = {}
+        for airport, rows in self.flights.groupby(self.flights['origin'].astype(str), sort=False).indices.items():
+            rows = rows[np.argsort(departure[rows], kind='stable')]
+            self.by_airport[airport] = (departure[rows], rows)
+
+        low, high = int(min_connection * 60), int(max_connection * 60)
+        self.successors = []
+        for index, record in enumerate(self.records):
+            times, rows = self.by_airport.get(str(record['destination']), (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)))
+            start = np.searchsorted(times, arrival[index] + low, side='left')
+            end = np.searchsorted(times, arrival[index] + high, side='right')
+            self.successors.append(rows[start:end].tolist())
+
+    def departures_from(self, airport):
+        """Row indices of flights leaving an airport, in departure order"""
+        return self.by_airport.get(airport, (None, np.zeros(0, dtype=np.int64)))[1].tolist()
+
+    def connection_count(self):
+        return sum(len(successors) for successors in self.successors)
+
+
+class PairingGenerator:
+    """Enumerate feasible crew pairings over the flight connection graph
+
+    Starting from every flight that leaves a crew base, a depth-first search
+    extends the trip along connections while its duty (first departure to last
+    arrival plus the report buffer) stays within `max_duty_hours` and it has at
+    most `max_legs` legs. Trips that land back at their base are closed pairings;
+    flights no closed pairing covers get a one-leg open pairing, so every flight
+    stays assignable.
+    """
+
+    def __init__(self, flights, bases, max_duty_hours=10.0, max_legs=4, min_connection=0.5, max_connection=4.0):
+        self.graph = ConnectionGraph(flights, min_connection, max_connection)
+        self.bases = sorted(set(bases))
+        self.max_duty_minutes = max_duty_hours * 60
+        self.max_legs = max(1, max_legs)
+        self.pairings = []
+        self.by_flight = {}
+
+    def generate(self):
+        """Build and index all pairings; returns them closed multi-leg first"""
+        graph = self.graph
+        buffer_minutes = PILOT_DUTY_BUFFER * 60
+        paths = []
+
+        def extend(base, path):
+            last = path[-1]
+            if len(path) > 1 and graph.records[last]['destination'] == base:
+                paths.append((base, list(path), True))
+                return
+            if len(path) >= self.max_legs:
+                return
+            start = graph.departure[path[0]]
+            for successor in graph.successors[last]:
+                # Successors arrive roughly in departure order; skip any that break the duty limit
+                if graph.arrival[successor] - start + buffer_minutes > self.max_duty_minutes:
+                    continue
+                if successor in path:
+                    continue
+                path.append(successor)
+                extend(base, path)
+                path.pop()
+
+        for base in self.bases:
+            for first in graph.departures_from(base):
+                if graph.arrival[first] - graph.departure[first] + buffer_minutes <= self.max_duty_minutes:
+                    extend(base, [first])
+
+        covered = {row for _, path, _ in paths for row in path}
+        for row, record in enumerate(graph.records):
+            if row not in covered:
+                paths.append((str(record['origin']), [row], False))
+
+        paths.sort(key=lambda item: (not item[2], -len(item[1]), graph.departure[item[1][0]]))
+        self.pairings = [self._build(index, base, path, closed) for index, (base, path, closed) in enumerate(paths)]
+        self.by_flight = {}
+        for pairing in self.pairings:
+            for flight_id in pairing.flight_ids:
+                self.by_flight.setdefault(flight_id, []).append(pairing)
+        return self.pairings
+
+    def _build(self, index, base, path, closed):
+        graph = self.graph
+        legs = [graph.records[row] for row in path]
+        sit_hours = [0.0] + [
+            (graph.departure[row] - graph.arrival[previous]) / 60.0 for previous, row in zip(path, path[1:])
+        ]
+        aircraft_types = {str(leg['aircraft_type']) for leg in legs}
+        return Pairing(f"P{index + 1:04d}", base, legs, sit_hours, aircraft_types, closed)
+
+    def multi_leg(self):
+        """Closed pairings of two or more legs"""
+        return [pairing for pairing in self.pairings if pairing.closed and len(pairing.legs) > 1]
+
+    def summary(self):
+        closed = [pairing for pairing in self.pairings if pairing.closed]
+        covered = {flight_id for pairing in closed for flight_id in pairing.flight_ids}
+        return {
+            'connections': self.graph.connection_count(),
+            'pairings': len(self.pairings),
+            'closed_pairings': len(closed),
+            'open_pairings': len(self.pairings) - len(closed),
+            'flights_in_closed_pairings': len(covered),
+            'total_flights': len(self.graph.records)
+        }
@@ -0,0 +1,55 @@
+import threading
+import time
+from collections import deque
+
+
+class ProgressBus:
+    """Fan-out of optimizer progress events through bounded, lossy subscriber queues
+
+    Publishing never blocks: each subscriber owns a deque with a fixed maxlen, so a
+    slow reader silently loses its oldest events instead of stalling the optimizer.
+    """
+
+    def __init__(self, maxsize=200):
+        self.maxsize = maxsize
+        self.last_event = None
+        self.dropped_events = 0
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def publish(self, phase, **fields):
+        """Publish a progress event to every subscriber"""
+        event = {'phase': phase, 'timestamp': time.time()}
+        event.update(fields)
+        self.last_event = event
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for events in subscribers:
+            if len(events) == events.maxlen:
+                self.dropped_events += 1
+            events.append(event)
+
+    def subscribe(self):
+        """Register a new subscriber queue, primed with the latest event"""
+        events = deque(maxlen=self.maxsize)
+        if self.last_event is not None:
+            events.append(self.last_event)
+        with self._lock:
+            self._subscribers.append(events)
+        return events
+
+    def unsubscribe(self, events):
+        """Remove a subscriber queue"""
+        with self._lock:
+            self._subscribers = [queue for queue in self._subscribers if queue is not events]
+
+    def drain(self, events):
+        """Pop all pending events from a subscriber queue"""
+        drained = []
+        while True:
+            try:
+                drained.append(events.popleft())
+            except IndexError:
+                return drained
@@ -0,0 +1,66 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupTracker:
+    """Progress of the background warm-up, for liveness and readiness probes
+
+    The server starts accepting connections before the warm-up runs. Each
+    stage records its status and duration. The process is ready once every
+    stage is done, and failed if a stage raised.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.state = 'starting'     # starting -> ready | failed
+        self.current = None
+        self.stages = []
+        self.error = None
+        self.ready_seconds = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """Time one warm-up stage; an exception marks it and the warm-up failed"""
+        record = {'stage': name, 'status': 'running', 'seconds': None}
+        with self._lock:
+            self.stages.append(record)
+            self.current = name
+        start_time = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            record['status'] = 'failed'
+            self.fail(e)
+            raise
+        else:
+            record['status'] = 'done'
+        finally:
+            record['seconds'] = time.perf_counter() - start_time
+
+    def mark_ready(self):
+        with self._lock:
+            self.state = 'ready'
+            self.current = None
+            self.ready_seconds = time.time() - self.started_at
+
+    def fail(self, error):
+        with self._lock:
+            self.state = 'failed'
+            self.error = str(error)
+
+    @property
+    def ready(self):
+        return self.state == 'ready'
+
+    def report(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'stage': self.current,
+                'uptime_seconds': time.time() - self.started_at,
+                'ready_after_seconds': self.ready_seconds,
+                'error': self.error,
+                'stages': [dict(record) for record in self.stages]
+            }
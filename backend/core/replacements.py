@@ -0,0 +1,218 @@
+import bisect
+import heapq
+from collections import defaultdict
+
+import pandas as pd
+
+MINUTES_PER_DAY = 1440
+PILOT_ROLES = ('Captain', 'First Officer')
+CABIN_GROUP = 'cabin'
+
+
+def _minutes(times):
+    """Epoch minutes of a datetime-like column"""
+    return (pd.to_datetime(times).astype('datetime64[s]').astype('int64') // 60).to_numpy()
+
+
+def role_group(role):
+    """Pilots are only replaced by the same rank; any cabin role can replace another"""
+    return role if role in PILOT_ROLES else CABIN_GROUP
+
+
+class ReplacementIndex:
+    """Ranked shortlists of legal substitutes for every seat, kept in step with a roster
+
+    Candidates are first narrowed statically per (flight, role group): active,
+    right role, type-rated for the aircraft (pilots) and based at or next to the
+    departure airport. Each candidate is then checked against their current roster
+    timeline: no overlapping duty, minimum rest on both sides and daily / 7-day
+    duty limits, using the RuleEngine grace margins. The legal ones are ranked by
+    base proximity, preference conflicts and duty already flown.
+
+    When the roster changes only crew whose assignments moved are re-checked, and
+    only the shortlists they enter or leave are re-ranked, so a lookup is a dict
+    access and a refresh costs in proportion to the change.
+    """
+
+    def __init__(self, data_loader, rules, allowed_base_pairs, shortlist_size=5):
+        self.data = data_loader
+        self.rules = rules
+        self.shortlist_size = shortlist_size
+        self.version = None
+        self.built = False
+        self.assignments = {}      # crew_id -> frozenset of (flight_id, hours, departure, arrival) duties
+        self.timelines = {}        # crew_id -> ([departures], [arrivals]) sorted by departure
+        self.day_hours = {}        # crew_id -> {day: duty hours}
+        self.total_hours = {}      # crew_id -> duty hours in the roster
+        self.candidates = defaultdict(dict)  # (flight_id, group) -> {crew_id: rank key}
+        self.shortlists = {}       # (flight_id, group) -> [crew_id, ...] best first
+
+        flights = data_loader.flights.drop_duplicates('flight_id')
+        self.flights = {}
+        for flight, departure, arrival in zip(flights.to_dict('records'), _minutes(flights['departure_time']),
+                                              _minutes(flights['arrival_time'])):
+            flight['departure_minute'], flight['arrival_minute'] = int(departure), int(arrival)
+            self.flights[flight['flight_id']] = flight
+        self.scheduled = {flight_id: (flight['departure_minute'], flight['arrival_minute'])
+                          for flight_id, flight in self.flights.items()}
+
+        crew = data_loader.crew.drop_duplicates('crew_id')
+        self.crew = dict(zip(crew['crew_id'], crew.to_dict('records')))
+
+        # Static eligibility: which crew may ever be considered for a (flight, group), and the reverse
+        self.eligible = defaultdict(list)          # (flight_id, group) -> [crew_id]
+        self.eligible_flights = defaultdict(list)  # crew_id -> [(flight_id, group)]
+        for crew_id, member in self.crew.items():
+            if member['status'] != 'ACTIVE':
+                continue
+            group = role_group(member['role'])
+            qualifications = set(str(member['qualifications']).split('|'))
+            nearby = {member['base'], *allowed_base_pairs.get(member['base'], [])}
+            for flight_id, flight in self.flights.items():
+                if flight['origin'] not in nearby:
+                    continue
+                if group != CABIN_GROUP and flight['aircraft_type'] not in qualifications:
+                    continue
+                self.eligible[(flight_id, group)].append(crew_id)
+                self.eligible_flights[crew_id].append((flight_id, group))
+
+    def update(self, roster, version=None):
+        """Bring the index in line with a roster; returns the number of crew re-checked
+
+        Duty intervals come from the roster's own times, so retimed (delayed) flights
+        are picked up: their shortlists are re-ranked against the new times.
+        """
+        duties = {}
+        times = {}
+        if roster is not None and not roster.empty:
+            departures = _minutes(roster['departure_time'])
+            arrivals = _minutes(roster['arrival_time'])
+            rows = zip(roster['crew_id'], roster['flight_id'], roster['duty_hours'].astype(float), departures, arrivals)
+            for crew_id, flight_id, hours, departure, arrival in rows:
+                duties.setdefault(crew_id, []).append((flight_id, hours, int(departure), int(arrival)))
+                times.setdefault(flight_id, (int(departure), int(arrival)))
+
+        # Flights take their roster times; uncrewed ones fall back to the schedule
+        retimed = set()
+        for flight_id, flight in self.flights.items():
+            current = times.get(flight_id, self.scheduled[flight_id])
+            if (flight['departure_minute'], flight['arrival_minute']) != current:
+                flight['departure_minute'], flight['arrival_minute'] = current
+                retimed.add(flight_id)
+        assignments = {crew_id: frozenset(rows) for crew_id, rows in duties.items()}
+
+        if not self.built:
+            changed = set(self.crew)
+        else:
+            changed = {crew_id for crew_id in assignments.keys() | self.assignments.keys()
+                       if assignments.get(crew_id) != self.assignments.get(crew_id)}
+        self.assignments = assignments
+
+        checks = set()
+        for crew_id in changed:
+            self._rebuild_timeline(crew_id, duties.get(crew_id, []))
+            checks.update((key, crew_id) for key in self.eligible_flights.get(crew_id, ()))
+        for flight_id in retimed:
+            for group in (*PILOT_ROLES, CABIN_GROUP):
+                checks.update(((flight_id, group), crew_id) for crew_id in self.eligible.get((flight_id, group), ()))
+
+        dirty = set()
+        for key, crew_id in checks:
+            ranks = self.candidates[key]
+            rank = self._rank(crew_id, self.flights[key[0]])
+            if rank is None:
+                if ranks.pop(crew_id, None) is not None:
+                    dirty.add(key)
+            elif ranks.get(crew_id) != rank:
+                ranks[crew_id] = rank
+                dirty.add(key)
+
+        for key in dirty:
+            ranks = self.candidates[key]
+            self.shortlists[key] = [crew_id for _, crew_id in heapq.nsmallest(
+                self.shortlist_size + 1, ((rank, crew_id) for crew_id, rank in ranks.items())
+            )]
+        self.version = version
+        self.built = True
+        return len(changed)
+
+    def is_assigned(self, crew_id, flight_id):
+        return any(duty[0] == flight_id for duty in self.assignments.get(crew_id, ()))
+
+    def legal_substitutes(self, flight, group, excluded=()):
+        """All legal candidates for a flight given as a dict (possibly retimed), best first"""
+        ranked = []
+        for crew_id in self.eligible.get((flight['flight_id'], group), ()):
+            if crew_id in excluded:
+                continue
+            rank = self._rank(crew_id, flight)
+            if rank is not None:
+                ranked.append((rank, crew_id))
+        return [crew_id for _, crew_id in sorted(ranked)]
+
+    def lookup(self, flight_id, crew_id):
+        """Ranked substitutes for the seat `crew_id` holds on `flight_id`"""
+        member = self.crew.get(crew_id)
+        if member is None or flight_id not in self.flights:
+            raise KeyError(f"Unknown seat {crew_id} on {flight_id}")
+        shortlist = self.shortlists.get((flight_id, role_group(member['role'])), [])
+        return [candidate for candidate in shortlist if candidate != crew_id][:self.shortlist_size]
+
+    def describe(self, flight_id, candidates):
+        """Display rows for a shortlist"""
+        flight = self.flights[flight_id]
+        rows = []
+        for rank, crew_id in enumerate(candidates, start=1):
+            member = self.crew[crew_id]
+            rows.append({
+                'rank': rank,
+                'crew_id': crew_id,
+                'role': member['role'],
+                'base': member['base'],
+                'same_base': member['base'] == flight['origin'],
+                'duty_hours': round(self.total_hours.get(crew_id, 0.0), 2),
+                'rest_before_hours': self._rest_before(crew_id, flight)
+            })
+        return rows
+
+    def _rebuild_timeline(self, crew_id, duties):
+        """Sorted duty intervals and per-day duty hours of one crew member"""
+        legs = sorted({(departure, arrival) for _, _, departure, arrival in duties})
+        self.timelines[crew_id] = ([leg[0] for leg in legs], [leg[1] for leg in legs])
+
+        day_hours = defaultdict(float)
+        for _, hours, departure, _ in duties:
+            day_hours[departure // MINUTES_PER_DAY] += hours
+        self.day_hours[crew_id] = day_hours
+        self.total_hours[crew_id] = sum(day_hours.values(), 0.0)
+
+    def _rank(self, crew_id, flight):
+        """Rank key of a legal candidate, or None if they cannot take the flight"""
+        departures, arrivals = self.timelines.get(crew_id, ([], []))
+        min_rest = (self.rules['min_rest'] - 0.5) * 60
+        position = bisect.bisect_left(departures, flight['departure_minute'])
+        if position > 0 and arrivals[position - 1] + min_rest > flight['departure_minute']:
+            return None
+        if position < len(departures) and flight['arrival_minute'] + min_rest > departures[position]:
+            return None
+
+        member = self.crew[crew_id]
+        duty = float(flight['flight_duration_hours']) + (0.5 if member['role'] in PILOT_ROLES else 0.3)
+        day = flight['departure_minute'] // MINUTES_PER_DAY
+        day_hours = self.day_hours.get(crew_id, {})
+        if day_hours.get(day, 0.0) + duty > self.rules['daily_limit'] + 0.5:
+            return None
+        for start in range(day - 6, day + 1):
+            if sum(day_hours.get(d, 0.0) for d in range(start, start + 7)) + duty > self.rules['weekly_limit'] + 2:
+                return None
+
+        prefs = self.data.crew_preferences.get(crew_id)
+        conflict = prefs is not None and prefs.conflicts(flight.get('day_index', 0), flight.get('is_red_eye', False))
+        return (member['base'] != flight['origin'], conflict, round(self.total_hours.get(crew_id, 0.0), 2))
+
+    def _rest_before(self, crew_id, flight):
+        departures, arrivals = self.timelines.get(crew_id, ([], []))
+        position = bisect.bisect_left(departures, flight['departure_minute'])
+        if position == 0:
+            return None
+        return round((flight['departure_minute'] - arrivals[position - 1]) / 60.0, 2)
@@ -0,0 +1,242 @@
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+MINUTES_PER_DAY = 1440
+GROUPS = ('Captain', 'First Officer', 'cabin')
+PILOT_BUFFER = 0.5
+CABIN_BUFFER = 0.3
+
+
+def _minutes(times):
+    return (pd.to_datetime(times).astype('datetime64[s]').astype('int64') // 60).to_numpy()
+
+
+class RosterModel:
+    """Dense arrays describing one roster, shipped to worker processes to simulate scenarios
+
+    Seats are keyed by (flight, role group): key = flight * 3 + group.
+    `spare[key, crew]` marks legal substitutes in the nominal plan, `held[crew, key]`
+    counts the seats a crew member holds, `pairs` are consecutive duties of the same
+    crew member and `segments` are (crew, day) duty totals.
+    """
+
+    def __init__(self, flight_count, spare, held, pairs, segments, rules, min_connection):
+        self.flight_count = flight_count
+        self.spare = spare
+        self.held = held
+        self.pair_from, self.pair_to, self.pair_gap, self.pair_key = pairs
+        self.segment_incidence, self.segment_hours, self.segment_key = segments
+        self.rules = rules
+        self.min_connection = min_connection
+
+    def evaluate(self, sick, delays):
+        """Per-scenario outcome counts for boolean sick[s, crew] and delay minutes[s, flight]"""
+        available = (~sick).astype(np.float32) @ self.spare.T.astype(np.float32)
+        needed = sick.astype(np.float32) @ self.held
+        shortage = np.maximum(needed - available, 0)
+        uncovered = (shortage.reshape(len(sick), self.flight_count, len(GROUPS)).sum(axis=2) > 0).sum(axis=1)
+        spare_left = available - needed
+
+        # Delays shrink the gap between consecutive duties by (earlier delay - later delay)
+        min_rest = (self.rules['min_rest'] - 0.5) * 60
+        gap = self.pair_gap + delays[:, self.pair_to] - delays[:, self.pair_from]
+        induced = (gap < min_rest) & (self.pair_gap >= min_rest)
+        repairable = spare_left[:, self.pair_key] > 0
+        rest_violations = (induced & ~repairable).sum(axis=1)
+        missed_connections = ((gap < self.min_connection) & (self.pair_gap >= self.min_connection) & ~repairable).sum(axis=1)
+
+        # Waiting time on delayed flights is duty time
+        limit = self.rules['daily_limit'] + 0.5
+        day_hours = self.segment_hours + delays @ self.segment_incidence / 60.0
+        overrun = (day_hours > limit) & (self.segment_hours <= limit)
+        duty_overruns = (overrun & ~(spare_left[:, self.segment_key] > 0)).sum(axis=1)
+
+        return {
+            'uncovered_flights': uncovered,
+            'rest_violations': rest_violations,
+            'duty_overruns': duty_overruns,
+            'missed_connections': missed_connections,
+            'sick_crew': (sick & (self.held.sum(axis=1) > 0)).sum(axis=1),
+            'delayed_flights': (delays > 0).sum(axis=1)
+        }
+
+
+def _simulate_chunk(model, scenarios, seed, sick_rate, delay_probability, delay_samples):
+    """Sample and evaluate one batch of scenarios; runs in a worker process"""
+    rng = np.random.default_rng(seed)
+    crew_count = model.held.shape[0]
+    sick = rng.random((scenarios, crew_count)) < sick_rate
+    delayed = rng.random((scenarios, model.flight_count)) < delay_probability
+    if len(delay_samples):
+        delays = np.where(delayed, rng.choice(delay_samples, size=delayed.shape), 0.0).astype(np.float32)
+    else:
+        delays = np.zeros(delayed.shape, dtype=np.float32)
+    return model.evaluate(sick, delays)
+
+
+class RobustnessSimulator:
+    """Monte Carlo robustness of a roster under random sick calls and delays
+
+    Each scenario calls in sick every crew member with probability `sick_rate`
+    and delays every flight with the historical probability, by a delay drawn
+    from historical duty overruns. Recovery is judged against the roster's spare
+    capacity: a lost seat is recoverable if a legal substitute (right role group,
+    rated, nearby base, rested, within the daily limit and not sick) is left over,
+    and a delay-induced rest, connection or duty conflict is repairable when the
+    affected seat still has a spare substitute. Scenarios are evaluated as
+    matrix batches, split across a process pool.
+    """
+
+    def __init__(self, data_loader, rules, allowed_base_pairs, sick_rate=0.02, delay_threshold=15,
+                 min_connection_hours=0.5):
+        self.data = data_loader
+        self.rules = rules
+        self.sick_rate = sick_rate
+        self.min_connection = int(min_connection_hours * 60)
+
+        flights = data_loader.flights.drop_duplicates('flight_id')
+        crew = data_loader.crew.drop_duplicates('crew_id')
+        self.flight_ids = pd.Index(flights['flight_id'].astype(str))
+        self.crew_ids = pd.Index(crew['crew_id'].astype(str))
+        self.flight_departure = _minutes(flights['departure_time'])
+        self.flight_arrival = _minutes(flights['arrival_time'])
+        roles = crew['role'].astype(str).to_numpy()
+        self.crew_buffer = np.where(np.isin(roles, GROUPS[:2]), PILOT_BUFFER, CABIN_BUFFER)
+        self.flight_duration = flights['flight_duration_hours'].astype(float).to_numpy()
+
+        # Static eligibility per (flight, group) key, independent of any roster
+        groups = np.where(np.isin(roles, GROUPS[:2]), roles, 'cabin')
+        bases = crew['base'].astype(str).to_numpy()
+        qualifications = [set(quals.split('|')) for quals in crew['qualifications'].astype(str)]
+        active = (crew['status'].astype(str) == 'ACTIVE').to_numpy()
+        self.eligible = np.zeros((len(flights) * len(GROUPS), len(crew)), dtype=bool)
+        for f, (origin, aircraft) in enumerate(zip(flights['origin'].astype(str), flights['aircraft_type'].astype(str))):
+            nearby = np.array([origin == base or origin in allowed_base_pairs.get(base, []) for base in bases])
+            for g, group in enumerate(GROUPS):
+                mask = active & nearby & (groups == group)
+                if group != 'cabin':
+                    mask &= np.array([aircraft in quals for quals in qualifications])
+                self.eligible[f * len(GROUPS) + g] = mask
+        self.group_of_crew = np.array([GROUPS.index(group) for group in groups])
+
+        self.delay_probability, self.delay_samples = self._delay_statistics(delay_threshold)
+
+    def _delay_statistics(self, threshold):
+        """Delay probability and delay sizes (minutes) from historical duty beyond the schedule"""
+        history = self.data.historical_rosters
+        if history is None or history.empty:
+            return 0.0, np.zeros(0, dtype=np.float32)
+        flights = self.data.flights.drop_duplicates('flight_id')[['flight_id', 'flight_duration_hours']]
+        merged = history.merge(flights, on='flight_id', how='inner')
+        buffer = np.where(merged['role'].astype(str).isin(GROUPS[:2]), PILOT_BUFFER, CABIN_BUFFER)
+        merged['overrun'] = (merged['duty_hours'] - merged['flight_duration_hours'] - buffer) * 60
+        per_flight = merged.groupby(['date', 'flight_id'], observed=True)['overrun'].max()
+        if per_flight.empty:
+            return 0.0, np.zeros(0, dtype=np.float32)
+        delayed = per_flight[per_flight > threshold]
+        return float(len(delayed) / len(per_flight)), delayed.to_numpy(dtype=np.float32)
+
+    def build_model(self, roster):
+        """Encode a roster's spare capacity and duty structure as dense arrays"""
+        flight_count, crew_count = len(self.flight_ids), len(self.crew_ids)
+        crew = self.crew_ids.get_indexer(roster['crew_id'].astype(str))
+        flight = self.flight_ids.get_indexer(roster['flight_id'].astype(str))
+        known = (crew >= 0) & (flight >= 0)
+        crew, flight = crew[known], flight[known]
+        departure = _minutes(roster['departure_time'])[known]
+        arrival = _minutes(roster['arrival_time'])[known]
+        hours = roster['duty_hours'].to_numpy(dtype=np.float64)[known]
+        key = flight * len(GROUPS) + self.group_of_crew[crew]
+
+        # busy[crew, flight]: a duty of the crew member overlaps the flight or its rest window
+        rest = (self.rules['min_rest'] - 0.5) * 60
+        conflict = ((arrival[:, None] + rest > self.flight_departure[None, :]) &
+                    (self.flight_arrival[None, :] + rest > departure[:, None]))
+        owner = np.zeros((crew_count, len(crew)), dtype=np.float32)
+        owner[crew, np.arange(len(crew))] = 1
+        busy = owner @ conflict.astype(np.float32) > 0
+
+        # Daily capacity: taking the flight must keep the crew member's day within the limit
+        day = departure // MINUTES_PER_DAY
+        first_day = min(day.min(), (self.flight_departure // MINUTES_PER_DAY).min()) if len(day) else 0
+        flight_day = self.flight_departure // MINUTES_PER_DAY - first_day
+        day_hours = np.zeros((crew_count, flight_day.max() + 1 if len(flight_day) else 1))
+        in_range = day - first_day < day_hours.shape[1]
+        np.add.at(day_hours, (crew[in_range], (day - first_day)[in_range]), hours[in_range])
+        capacity = (day_hours[:, flight_day] + self.flight_duration[None, :] + self.crew_buffer[:, None]
+                    <= self.rules['daily_limit'] + 0.5)
+
+        free = np.repeat((~busy & capacity).T, len(GROUPS), axis=0)
+        spare = self.eligible & free
+        held = np.zeros((crew_count, flight_count * len(GROUPS)), dtype=np.float32)
+        np.add.at(held, (crew, key), 1)
+
+        # Consecutive duties per crew member
+        order = np.lexsort((departure, crew))
+        same = crew[order][1:] == crew[order][:-1]
+        first, second = order[:-1][same], order[1:][same]
+        pairs = (flight[first], flight[second], (departure[second] - arrival[first]).astype(np.float32), key[second])
+
+        # (crew, day) duty segments with their flights and the last seat of the day
+        segment_ids, segment_of_row = np.unique(np.stack((crew, day)), axis=1, return_inverse=True)
+        segment_of_row = segment_of_row.ravel()
+        incidence = np.zeros((flight_count, segment_ids.shape[1]), dtype=np.float32)
+        np.add.at(incidence, (flight, segment_of_row), 1)
+        segment_hours = np.bincount(segment_of_row, weights=hours, minlength=segment_ids.shape[1])
+        last = np.full(segment_ids.shape[1], -1)
+        for row in order:
+            last[segment_of_row[row]] = row
+        segments = (incidence, segment_hours, key[last])
+
+        return RosterModel(flight_count, spare, held, pairs, segments, self.rules, self.min_connection)
+
+    def evaluate(self, roster, scenarios=1000, workers=1, seed=None):
+        """Simulate `scenarios` disruption scenarios and summarize recovery outcomes"""
+        model = self.build_model(roster)
+        seed = seed if seed is not None else np.random.SeedSequence().entropy % (2 ** 32)
+        workers = max(1, min(workers, scenarios // 250 or 1))
+        chunks = [len(part) for part in np.array_split(np.arange(scenarios), workers)]
+        arguments = [(model, size, seed + index, self.sick_rate, self.delay_probability, self.delay_samples)
+                     for index, size in enumerate(chunks)]
+
+        if workers == 1:
+            results = [_simulate_chunk(*arguments[0])]
+        else:
+            with ProcessPoolExecutor(workers, mp_context=mp.get_context()) as pool:
+                results = list(pool.map(_simulate_chunk, *zip(*arguments)))
+
+        outcomes = {name: np.concatenate([result[name] for result in results]) for name in results[0]}
+        return self.summarize(outcomes, len(self.flight_ids))
+
+    def summarize(self, outcomes, total_flights):
+        summary = {'scenarios': int(len(outcomes['uncovered_flights'])), 'distributions': {}}
+        for name, values in outcomes.items():
+            summary['distributions'][name] = {
+                'mean': float(values.mean()),
+                'p50': float(np.percentile(values, 50)),
+                'p90': float(np.percentile(values, 90)),
+                'p99': float(np.percentile(values, 99)),
+                'max': int(values.max())
+            }
+        uncovered = outcomes['uncovered_flights']
+        summary['expected_uncovered_flights'] = float(uncovered.mean())
+        summary['probability_fully_recovered'] = float(
+            ((uncovered == 0) & (outcomes['rest_violations'] == 0) & (outcomes['duty_overruns'] == 0)).mean()
+        )
+        summary['uncovered_histogram'] = {int(count): int(n) for count, n in zip(*np.unique(uncovered, return_counts=True))}
+        summary['robustness_score'] = 1.0 - summary['expected_uncovered_flights'] / max(1, total_flights)
+        summary['assumptions'] = {
+            'sick_rate': self.sick_rate,
+            'delay_probability': self.delay_probability,
+            'mean_delay_minutes': float(self.delay_samples.mean()) if len(self.delay_samples) else 0.0
+        }
+        return summary
+
+    def expected_uncovered(self, roster, scenarios=200, seed=0):
+        """Cheap in-process estimate used as an optimizer penalty"""
+        model = self.build_model(roster)
+        outcome = _simulate_chunk(model, scenarios, seed, self.sick_rate, self.delay_probability, self.delay_samples)
+        return float(outcome['uncovered_flights'].mean())
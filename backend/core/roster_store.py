@@ -0,0 +1,266 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+class RosterVersion:
+    """One roster version, stored as the assignments it changed relative to its parent
+
+    `added` maps assignment keys to their new record and `removed` maps keys to the
+    record they replaced, so a changed assignment appears in both. A root version
+    holds the full roster in `added`.
+    """
+    __slots__ = ('version', 'parent', 'added', 'removed', 'size', 'label', 'created_at', 'depth')
+
+    def __init__(self, version, parent, added, removed, size, label, depth):
+        self.version = version
+        self.parent = parent
+        self.added = added
+        self.removed = removed
+        self.size = size
+        self.label = label
+        self.created_at = time.time()
+        self.depth = depth
+
+    def info(self):
+        return {
+            'version': self.version,
+            'parent': self.parent,
+            'label': self.label,
+            'created_at': self.created_at,
+            'assignments': self.size,
+            'changes': len(self.added.keys() | self.removed.keys()) if self.parent is not None else self.size
+        }
+
+
+class RosterStore:
+    """In-memory roster version tree with structural sharing, O(changes) diffs and rollback"""
+
+    def __init__(self, max_versions=200, cache_size=4):
+        self.max_versions = max(2, max_versions)
+        self.cache_size = cache_size
+        self.versions = OrderedDict()
+        self.columns = None
+        self.dtypes = None
+        self.head = None
+        self._next_version = 1
+        self._head_state = {}
+        self._frames = OrderedDict()
+        self._lock = threading.RLock()
+
+    def commit(self, roster_df, label='', version=None):
+        """Store a roster as a child of the current head and make it the new head
+
+        `version` lets a caller supply an id allocated elsewhere (e.g. the shared
+        state of a multi-worker deployment); ids must keep increasing.
+        """
+        with self._lock:
+            if self.columns is None:
+                self.columns = tuple(roster_df.columns)
+                self.dtypes = roster_df.dtypes.to_dict()
+            state = self._roster_state(roster_df)
+
+            if self.head is None:
+                added, removed = state, {}
+            else:
+                previous = self._head_state
+                added = {key: record for key, record in state.items() if previous.get(key) != record}
+                removed = {key: previous[key] for key in previous.keys() - state.keys()}
+                removed.update((key, previous[key]) for key in added if key in previous)
+
+            parent = self.head
+            depth = self.versions[parent].depth + 1 if parent is not None else 0
+            if version is None:
+                version = self._next_version
+            version = RosterVersion(version, parent, added, removed, len(state), label, depth)
+            self._next_version = max(self._next_version, version.version) + 1
+
+            self.versions[version.version] = version
+            self.head = version.version
+            self._head_state = state
+            self._cache_frame(version.version, roster_df)
+            self._enforce_retention()
+            return version.version
+
+    def get(self, version):
+        """Materialize a version as a DataFrame"""
+        with self._lock:
+            if version in self._frames:
+                self._frames.move_to_end(version)
+                return self._frames[version]
+            roster_df = self._to_frame(self._materialize(version))
+            self._cache_frame(version, roster_df)
+            return roster_df
+
+    def current(self):
+        """The head roster, or None if nothing was committed"""
+        with self._lock:
+            return self.get(self.head) if self.head is not None else None
+
+    def rollback(self, version):
+        """Move the head back to an earlier version; the next commit branches from it"""
+        with self._lock:
+            self._require(version)
+            self._head_state = self._materialize(version)
+            self.head = version
+            return self.get(version)
+
+    def diff(self, from_version, to_version):
+        """Assignments added, removed and changed between two versions, in O(changes)"""
+        with self._lock:
+            self._require(from_version)
+            self._require(to_version)
+
+            # Walk both versions up to their common ancestor
+            up_path, down_path = [], []
+            a, b = self.versions[from_version], self.versions[to_version]
+            while a.version != b.version:
+                if a.depth >= b.depth:
+                    up_path.append(a)
+                    a = self.versions[a.parent]
+                else:
+                    down_path.append(b)
+                    b = self.versions[b.parent]
+
+            # net[key] = [value at from_version, value at to_version]
+            net = {}
+            for version in up_path:
+                for key in version.added.keys() | version.removed.keys():
+                    if key not in net:
+                        net[key] = [version.added.get(key), None]
+                    net[key][1] = version.removed.get(key)
+            for version in reversed(down_path):
+                for key in version.added.keys() | version.removed.keys():
+                    if key not in net:
+                        net[key] = [version.removed.get(key), None]
+                    net[key][1] = version.added.get(key)
+
+            result = {'from_version': from_version, 'to_version': to_version,
+                      'added': [], 'removed': [], 'changed': []}
+            for before, after in net.values():
+                if before == after:
+                    continue
+                if before is None:
+                    result['added'].append(self._record_dict(after))
+                elif after is None:
+                    result['removed'].append(self._record_dict(before))
+                else:
+                    result['changed'].append({'before': self._record_dict(before),
+                                              'after': self._record_dict(after)})
+            return result
+
+    def list_versions(self):
+        """Summaries of all retained versions, oldest first"""
+        with self._lock:
+            return [version.info() for version in self.versions.values()]
+
+    def memory_bytes(self):
+        """Approximate memory held by the version deltas and cached frames"""
+        with self._lock:
+            records = sum(len(v.added) + len(v.removed) for v in self.versions.values())
+            record_bytes = 0
+            for version in self.versions.values():
+                for key, record in version.added.items():
+                    # Every stored record has the same shape, so one sample prices them all
+                    record_bytes = (sys.getsizeof(key) + sys.getsizeof(record) +
+                                    sum(sys.getsizeof(value) for value in key + record))
+                    break
+                if record_bytes:
+                    break
+            frame_bytes = sum(int(frame.memory_usage(deep=True).sum()) for frame in self._frames.values())
+            return records * record_bytes + frame_bytes
+
+    def __getstate__(self):
+        # Materialized frames are a cache and the lock can't be pickled
+        state = self.__dict__.copy()
+        state['_frames'] = OrderedDict()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def _require(self, version):
+        if version not in self.versions:
+            raise KeyError(f"Roster version {version} not found")
+
+    def _roster_state(self, roster_df):
+        """Map (flight_id, crew_id, occurrence) keys to immutable row records"""
+        roster_df = roster_df.reindex(columns=list(self.columns))
+        occurrence = roster_df.groupby(['flight_id', 'crew_id'], sort=False).cumcount()
+        keys = zip(roster_df['flight_id'], roster_df['crew_id'], occurrence)
+        return dict(zip(keys, roster_df.itertuples(index=False, name=None)))
+
+    def _materialize(self, version):
+        """Rebuild the full assignment state of a version by replaying deltas from its root"""
+        chain = []
+        node = self.versions[version]
+        while node is not None:
+            chain.append(node)
+            node = self.versions[node.parent] if node.parent is not None else None
+
+        state = {}
+        for node in reversed(chain):
+            for key in node.removed:
+                state.pop(key, None)
+            state.update(node.added)
+        return state
+
+    def _to_frame(self, state):
+        roster_df = pd.DataFrame.from_records(list(state.values()), columns=list(self.columns))
+        return roster_df.astype(self.dtypes)
+
+    def _record_dict(self, record):
+        return {
+            column: value.item() if isinstance(value, np.generic) else value
+            for column, value in zip(self.columns, record)
+        }
+
+    def _cache_frame(self, version, roster_df):
+        self._frames[version] = roster_df
+        self._frames.move_to_end(version)
+        while len(self._frames) > self.cache_size:
+            self._frames.popitem(last=False)
+
+    def _enforce_retention(self):
+        """Drop the oldest versions beyond max_versions, folding their deltas into children"""
+        while len(self.versions) > self.max_versions:
+            oldest = next(v for v in self.versions.values() if v.version != self.head)
+            children = [v for v in self.versions.values() if v.parent == oldest.version]
+
+            for child in children:
+                if oldest.parent is None:
+                    # Child becomes a new root holding its full state
+                    child.added = self._materialize(child.version)
+                    child.removed = {}
+                else:
+                    child.added, child.removed = self._compose(oldest, child)
+                child.parent = oldest.parent
+
+            del self.versions[oldest.version]
+            self._frames.pop(oldest.version, None)
+            self._refresh_depths()
+
+    def _compose(self, first, second):
+        """Combine two consecutive deltas into one delta relative to first's parent"""
+        added, removed = {}, {}
+        for key in first.added.keys() | first.removed.keys() | second.added.keys() | second.removed.keys():
+            before = first.removed.get(key) if key in first.added or key in first.removed else second.removed.get(key)
+            after = second.added.get(key) if key in second.added or key in second.removed else first.added.get(key)
+            if before == after:
+                continue
+            if before is not None:
+                removed[key] = before
+            if after is not None:
+                added[key] = after
+        return added, removed
+
+    def _refresh_depths(self):
+        # Versions are stored oldest first, so parents are always visited before children
+        for version in self.versions.values():
+            version.depth = self.versions[version.parent].depth + 1 if version.parent is not None else 0
@@ -1,6 +1,12 @@
 import pandas as pd
 from datetime import datetime, timedelta
 
+from core.compliance_kernel import PopulationCompliance
+from core.instrumentation import metrics
+
+# Crew may fly out of these airports besides their own base without a major base mismatch
+ALLOWED_BASE_PAIRS = {'DEL': ['BOM', 'BLR'], 'BOM': ['DEL', 'BLR'], 'BLR': ['DEL', 'BOM', 'HYD']}
+
 class RuleEngine:
     def __init__(self, data_loader):
         self.data = data_loader
@@ -10,8 +16,13 @@ class RuleEngine:
             'qualifications': [],
             'rest_periods': [],
             'consecutive_days': [],
-            'status': []
+            'status': [],
+            'duplicates': [],
+            'other': []
         }
+        # (category, crew_id, flight_id, message) for each violation of the last compliance check
+        self.violation_records = []
+        self.refresh_lookups()
         
         # Convert DGCA rules to dictionary for easy access
         self.dgca_rules = {}
@@ -30,13 +41,45 @@ class RuleEngine:
                 'DGCA004': {'value': 6, 'description': 'Max Consecutive Duty Days'}
             }
     
+    def refresh_lookups(self):
+        """Index crew and flight rows by id; call again after the input tables change"""
+        self.crew_lookup = {}
+        self.flight_lookup = {}
+        self.population_kernel = None
+        if getattr(self.data, 'crew', None) is not None:
+            crew = self.data.crew.drop_duplicates('crew_id')
+            self.crew_lookup = dict(zip(crew['crew_id'], crew.to_dict('records')))
+        if getattr(self.data, 'flights', None) is not None:
+            flights = self.data.flights.drop_duplicates('flight_id')
+            self.flight_lookup = dict(zip(flights['flight_id'], flights.to_dict('records')))
+    
+    @metrics.timed('rule_check_seconds', counter='rule_evaluations_total', check='population_compliance')
+    def check_population_compliance(self, population):
+        """Violation counts by category for every roster of a population in one vectorized pass
+
+        Returns {category: int array aligned with population} plus a 'total' array.
+        """
+        if self.population_kernel is None:
+            self.population_kernel = PopulationCompliance(self.data, self.limits(), ALLOWED_BASE_PAIRS)
+        return self.population_kernel.check(population)
+    
+    def limits(self):
+        """Numeric DGCA limits used by the vectorized and indexed checks"""
+        return {
+            'daily_limit': self.dgca_rules.get('DGCA001', {}).get('value', 10),
+            'min_rest': self.dgca_rules.get('DGCA002', {}).get('value', 12),
+            'weekly_limit': self.dgca_rules.get('DGCA003', {}).get('value', 60),
+            'max_streak': 7
+        }
+    
+    @metrics.timed('rule_check_seconds', counter='rule_evaluations_total', check='assignment_validity')
     def check_assignment_validity(self, crew_id, flight_id):
         """Check if a crew member can be assigned to a flight - OPTIMIZED"""
         violations = []
         
         try:
-            crew_member = self.data.crew[self.data.crew['crew_id'] == crew_id].iloc[0]
-            flight = self.data.flights[self.data.flights['flight_id'] == flight_id].iloc[0]
+            crew_member = self.crew_lookup[crew_id]
+            flight = self.flight_lookup[flight_id]
             
             # 1. Check aircraft qualification (only for pilots)
             if crew_member['role'] in ['Captain', 'First Officer']:
@@ -46,8 +89,7 @@ class RuleEngine:
             # 2. Relaxed base compatibility - allow some flexibility
             if crew_member['base'] != flight['origin']:
                 # Only flag if it's a major base mismatch, not minor operational flexibility
-                base_pairs = {'DEL': ['BOM', 'BLR'], 'BOM': ['DEL', 'BLR'], 'BLR': ['DEL', 'BOM', 'HYD']}
-                allowed_bases = base_pairs.get(crew_member['base'], [])
+                allowed_bases = ALLOWED_BASE_PAIRS.get(crew_member['base'], [])
                 if flight['origin'] not in allowed_bases and flight['origin'] != crew_member['base']:
                     violations.append(('base_mismatch', f"Major base mismatch: {crew_member['base']} to {flight['origin']}"))
             
@@ -56,15 +98,17 @@ class RuleEngine:
                 violations.append(('status', f"Crew status is {crew_member['status']}"))
                 
         except (IndexError, KeyError):
+            metrics.increment('swallowed_errors_total', location='check_assignment_validity')
             violations.append(('other', "Invalid crew_id or flight_id"))
         
         return len(violations) == 0, violations
     
+    @metrics.timed('rule_check_seconds', counter='rule_evaluations_total', check='daily_duty_hours')
     def calculate_daily_duty_hours(self, assignments):
         """Calculate actual duty hours per calendar day with buffer"""
         daily_hours = {}
         
-        for _, assignment in assignments.iterrows():
+        for assignment in assignments.to_dict('records'):
             try:
                 departure_time = pd.to_datetime(assignment.get('departure_time', datetime.now()))
                 date_key = departure_time.date()
@@ -77,10 +121,12 @@ class RuleEngine:
                 daily_hours[date_key] += duty_hours
                 
             except:
+                metrics.increment('swallowed_errors_total', location='calculate_daily_duty_hours')
                 continue  # Skip invalid date entries
         
         return daily_hours
     
+    @metrics.timed('rule_check_seconds', counter='rule_evaluations_total', check='weekly_duty_hours')
     def calculate_weekly_duty_hours(self, daily_hours):
         """Calculate rolling 7-day duty hours with proper logic"""
         if not daily_hours:
@@ -105,8 +151,10 @@ class RuleEngine:
             return weekly_max
             
         except:
+            metrics.increment('swallowed_errors_total', location='calculate_weekly_duty_hours')
             return 0  # Return 0 if calculation fails
     
+    @metrics.timed('rule_check_seconds', counter='rule_evaluations_total', check='rest_periods')
     def check_rest_periods(self, assignments):
         """Check minimum rest periods with operational flexibility"""
         violations = []
@@ -116,12 +164,9 @@ class RuleEngine:
         
         try:
             # Sort assignments by departure time
-            sorted_assignments = assignments.sort_values('departure_time')
+            sorted_assignments = assignments.sort_values('departure_time').to_dict('records')
             
-            for i in range(len(sorted_assignments) - 1):
-                current_assignment = sorted_assignments.iloc[i]
-                next_assignment = sorted_assignments.iloc[i + 1]
-                
+            for current_assignment, next_assignment in zip(sorted_assignments, sorted_assignments[1:]):
                 current_end = pd.to_datetime(current_assignment['arrival_time'])
                 next_start = pd.to_datetime(next_assignment['departure_time'])
                 
@@ -132,10 +177,12 @@ class RuleEngine:
                     violations.append(('rest_periods', f"Short rest: {rest_hours:.1f}h between flights"))
         
         except:
+            metrics.increment('swallowed_errors_total', location='check_rest_periods')
             pass  # Skip if time parsing fails
         
         return violations
     
+    @metrics.timed('rule_check_seconds', counter='rule_evaluations_total', check='consecutive_days')
     def check_consecutive_days(self, daily_hours):
         """Check maximum consecutive duty days with grace"""
         violations = []
@@ -167,10 +214,12 @@ class RuleEngine:
                 violations.append(('consecutive_days', f"Works {max_streak} consecutive days"))
         
         except:
+            metrics.increment('swallowed_errors_total', location='check_consecutive_days')
             pass
         
         return violations
     
+    @metrics.timed('rule_check_seconds', counter='rule_evaluations_total', check='duty_hours_compliance')
     def check_duty_hours_compliance(self, crew_id, assignments):
         """Check DGCA duty hour compliance with realistic tolerances"""
         violations = []
@@ -203,49 +252,67 @@ class RuleEngine:
             violations.extend(consecutive_violations)
                 
         except Exception as e:
+            metrics.increment('swallowed_errors_total', location='check_duty_hours_compliance')
             violations.append(('other', f"Error in duty calculation: {str(e)}"))
         
         return len(violations) == 0, violations
     
+    @metrics.timed('rule_check_seconds', counter='rule_evaluations_total', check='roster_compliance')
     def check_roster_compliance(self, roster_df):
         """Check full roster for compliance with optimized counting"""
         # Reset violation categories
         self.violation_categories = {key: [] for key in self.violation_categories.keys()}
+        self.violation_records = []
         
         if roster_df is None or roster_df.empty:
             return ["Empty roster provided"]
         
         all_violations = []
-        
+
+        # Crew groups are walked record by record, which is slower on categorical columns;
+        # decoding a compact roster once up front keeps both modes on the same path
+        categorical = [column for column in roster_df.columns
+                       if isinstance(roster_df[column].dtype, pd.CategoricalDtype)]
+        if categorical:
+            roster_df = roster_df.astype({column: object for column in categorical})
+
         try:
             # Group by crew member to check individual constraints
-            for crew_id, assignments in roster_df.groupby('crew_id'):
+            for crew_id, assignments in roster_df.groupby('crew_id', observed=True):
                 # Check duty hours with proper temporal analysis
                 is_valid, violations = self.check_duty_hours_compliance(crew_id, assignments)
                 for category, message in violations:
                     self.violation_categories[category].append(f"{crew_id}: {message}")
+                    self.violation_records.append((category, crew_id, None, message))
                 
                 # Check each assignment for basic validity
-                for _, assignment in assignments.iterrows():
+                for assignment in assignments.to_dict('records'):
                     is_valid, violations = self.check_assignment_validity(
                         assignment['crew_id'], assignment['flight_id']
                     )
                     for category, message in violations:
                         self.violation_categories[category].append(f"{crew_id} on {assignment['flight_id']}: {message}")
+                        self.violation_records.append((category, crew_id, assignment['flight_id'], message))
             
             # Check for duplicates
-            duplicate_violations = self.check_for_duplicates(roster_df)
-            self.violation_categories['other'].extend(duplicate_violations)
+            for crew_id, flight_id, message in self.check_for_duplicates(roster_df):
+                self.violation_categories['duplicates'].append(message)
+                self.violation_records.append(('duplicates', crew_id, flight_id, message))
             
-            # Check crew qualifications
-            qualification_violations = self.check_crew_qualifications(roster_df)
-            self.violation_categories['qualifications'].extend(qualification_violations)
+            # Check crew qualifications by rostered role; pairs already flagged above are not counted twice
+            flagged = {(crew_id, flight_id) for category, crew_id, flight_id, _ in self.violation_records
+                       if category == 'qualifications'}
+            for crew_id, flight_id, message in self.check_crew_qualifications(roster_df):
+                if (crew_id, flight_id) not in flagged:
+                    self.violation_categories['qualifications'].append(message)
+                    self.violation_records.append(('qualifications', crew_id, flight_id, message))
             
             # Flatten all violations for return
             for category_violations in self.violation_categories.values():
                 all_violations.extend(category_violations)
             
         except Exception as e:
+            metrics.increment('swallowed_errors_total', location='check_roster_compliance')
             all_violations.append(f"Error during compliance check: {str(e)}")
         
         return all_violations
@@ -254,46 +321,41 @@ class RuleEngine:
         """Return categorized violation counts"""
         return {category: len(violations) for category, violations in self.violation_categories.items()}
     
+    @metrics.timed('rule_check_seconds', counter='rule_evaluations_total', check='duplicates')
     def check_for_duplicates(self, roster_df):
-        """Check for duplicate crew assignments to same flight"""
+        """(crew_id, flight_id, message) for each repeated assignment of a crew member to the same flight"""
         duplicates = []
 
         if roster_df is None or roster_df.empty:
             return duplicates
             
         try:
-            # Group by flight and crew
-            assignment_groups = roster_df.groupby(['flight_id', 'crew_id'])
-            
-            for (flight_id, crew_id), assignments in assignment_groups:
-                if len(assignments) > 1:
-                    duplicates.append(f"Crew {crew_id} assigned multiple times to flight {flight_id}")
+            repeated = roster_df[roster_df.duplicated(subset=['flight_id', 'crew_id'])]
+            for flight_id, crew_id in zip(repeated['flight_id'], repeated['crew_id']):
+                duplicates.append((crew_id, flight_id, f"Crew {crew_id} assigned multiple times to flight {flight_id}"))
         except Exception:
+            metrics.increment('swallowed_errors_total', location='check_for_duplicates')
             pass
             
         return duplicates
     
     def check_crew_qualifications(self, roster_df):
-        """Enhanced qualification checking - cabin crew are always qualified"""
+        """(crew_id, flight_id, message) for pilot seats held by crew not rated on the aircraft"""
         violations = []
         
         if roster_df is None or roster_df.empty:
             return violations
             
-        try:
-            for _, assignment in roster_df.iterrows():
-                crew_member = self.data.crew[self.data.crew['crew_id'] == assignment['crew_id']].iloc[0]
-                flight = self.data.flights[self.data.flights['flight_id'] == assignment['flight_id']].iloc[0]
-                
-                # Only pilots need specific aircraft qualifications
-                if assignment['role'] in ['Captain', 'First Officer']:
-                    if flight['aircraft_type'] not in crew_member['qualifications'].split('|'):
-                        violations.append(f"Pilot {assignment['crew_id']} not qualified for {flight['aircraft_type']}")
-                
-                # Cabin crew are always considered qualified
-                # No need to check base for cabin crew - already handled in assignment validity
-                
-        except (IndexError, KeyError):
-            violations.append("Error checking crew qualifications")
+        for assignment in roster_df.to_dict('records'):
+            # Only pilots need specific aircraft qualifications; unknown ids are reported as 'other'
+            if assignment['role'] not in ['Captain', 'First Officer']:
+                continue
+            crew_member = self.crew_lookup.get(assignment['crew_id'])
+            flight = self.flight_lookup.get(assignment['flight_id'])
+            if crew_member is None or flight is None:
+                continue
+            if flight['aircraft_type'] not in crew_member['qualifications'].split('|'):
+                violations.append((assignment['crew_id'], assignment['flight_id'],
+                                   f"Pilot {assignment['crew_id']} not qualified for {flight['aircraft_type']}"))
         
         return violations
\ No newline at end of file
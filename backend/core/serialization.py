@@ -0,0 +1,99 @@
+import gzip
+import json
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+from fastapi import Response
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+
+
+class RawJSON:
+    """A pre-encoded JSON fragment spliced verbatim into a response body"""
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+
+def to_native(obj):
+    """Convert NumPy/pandas scalars and arrays into plain Python types"""
+    if isinstance(obj, (np.integer, np.floating, np.bool_)):
+        return obj.item()
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, dict):
+        return {k: to_native(v) for k, v in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return [to_native(item) for item in obj]
+    else:
+        return obj
+
+
+def encode_frame(df, orient='records'):
+    """Encode a DataFrame straight to JSON with pandas' C encoder, without building Python dicts
+
+    `records` yields a list of row objects. `columnar` yields
+    {"columns": [...], "data": [[column values], ...]}, which repeats no keys.
+    """
+    # float32 columns only carry ~7 significant digits; don't print their binary noise
+    precision = 6 if any(dtype == np.float32 for dtype in df.dtypes) else 10
+    if orient == 'columnar':
+        columns = json.dumps([str(column) for column in df.columns])
+        data = ",".join(
+            df[column].to_json(orient='values', date_format='iso', date_unit='s', double_precision=precision)
+            for column in df.columns
+        )
+        return RawJSON(f'{{"columns":{columns},"length":{len(df)},"data":[{data}]}}')
+    return RawJSON(df.to_json(orient='records', date_format='iso', date_unit='s', double_precision=precision))
+
+
+def _default(obj):
+    if isinstance(obj, (np.integer, np.floating, np.bool_)):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (pd.Timestamp, datetime, date)):
+        return obj.isoformat()
+    if pd.isna(obj):
+        return None
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(payload, orient='records'):
+    """Serialize a payload, encoding any DataFrames and RawJSON fragments in place"""
+    if isinstance(payload, RawJSON):
+        return payload.text
+    if isinstance(payload, pd.DataFrame):
+        return encode_frame(payload, orient).text
+    if isinstance(payload, dict):
+        items = ",".join(f"{json.dumps(str(key))}:{dumps(value, orient)}" for key, value in payload.items())
+        return "{" + items + "}"
+    if isinstance(payload, list) and any(isinstance(item, (RawJSON, pd.DataFrame, dict, list)) for item in payload):
+        return "[" + ",".join(dumps(item, orient) for item in payload) + "]"
+    return json.dumps(payload, default=_default, allow_nan=False)
+
+
+def json_response(payload, request=None, orient='records', status_code=200, headers=None):
+    """Build a JSON response, compressing it with brotli or gzip when the client accepts it"""
+    body = dumps(payload, orient).encode('utf-8')
+    headers = dict(headers or {})
+    headers['Vary'] = 'Accept-Encoding'
+
+    accepted = request.headers.get('accept-encoding', '') if request is not None else ''
+    if len(body) >= MIN_COMPRESS_BYTES:
+        if brotli is not None and 'br' in accepted:
+            body = brotli.compress(body, quality=4)
+            headers['Content-Encoding'] = 'br'
+        elif 'gzip' in accepted:
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+
+    return Response(content=body, status_code=status_code, media_type='application/json', headers=headers)
@@ -0,0 +1,296 @@
+import hashlib
+import itertools
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; writes are then serialized per process only
+    fcntl = None
+
+
+# Columns persisted per assignment; duty_date and base are derived for indexed lookups
+ASSIGNMENT_COLUMNS = ('flight_id', 'crew_id', 'role', 'duty_hours', 'departure_time', 'arrival_time',
+                      'duty_date', 'base')
+QUERY_FILTERS = ('crew_id', 'flight_id', 'duty_date', 'base')
+
+
+class SharedState:
+    """Roster state shared by every API worker process through one SQLite file
+
+    Each committed roster is stored as a snapshot keyed by a global version id, and
+    the `head` row in `meta` names the current version. Readers poll the head (a
+    single primary-key lookup) and reload only when it moved. Writers first take an
+    exclusive file lock, so generation and disruption runs from different workers
+    are serialized and always build on the latest head.
+
+    Alongside the snapshot, every version's assignments and violations are kept as
+    rows indexed by crew, flight, duty date and base, so point queries never
+    materialize the whole roster. The file survives restarts, which restores the
+    current roster without re-optimizing.
+
+    Bulk amendments to the input tables are logged in `input_changes` in order.
+    Workers replay the entries they have not applied yet, so every process
+    serves the same tables. The log is cleared together with the rosters when
+    the input files change.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS roster_versions (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            parent INTEGER,
+            label TEXT,
+            created_at REAL,
+            assignments INTEGER,
+            payload BLOB
+        );
+        CREATE TABLE IF NOT EXISTS assignments (
+            version INTEGER NOT NULL,
+            flight_id TEXT,
+            crew_id TEXT,
+            role TEXT,
+            duty_hours REAL,
+            departure_time TEXT,
+            arrival_time TEXT,
+            duty_date TEXT,
+            base TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_assignments_crew ON assignments (version, crew_id);
+        CREATE INDEX IF NOT EXISTS idx_assignments_flight ON assignments (version, flight_id);
+        CREATE INDEX IF NOT EXISTS idx_assignments_date ON assignments (version, duty_date);
+        CREATE INDEX IF NOT EXISTS idx_assignments_base ON assignments (version, base);
+        CREATE TABLE IF NOT EXISTS violations (
+            version INTEGER NOT NULL,
+            category TEXT,
+            crew_id TEXT,
+            flight_id TEXT,
+            message TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_violations_category ON violations (version, category);
+        CREATE INDEX IF NOT EXISTS idx_violations_crew ON violations (version, crew_id);
+        CREATE TABLE IF NOT EXISTS input_changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT,
+            created_at REAL,
+            payload BLOB
+        );
+    """
+
+    def __init__(self, path, max_versions=200, batch_size=500):
+        self.path = path
+        self.lock_path = path + '.lock'
+        self.max_versions = max(2, max_versions)
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._process_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connect().executescript(self.SCHEMA)
+
+    def _connect(self):
+        """One connection per thread; WAL lets readers proceed while a writer commits"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def head(self):
+        """Current shared roster version, or None"""
+        row = self._connect().execute("SELECT value FROM meta WHERE key = 'head'").fetchone()
+        return int(row[0]) if row is not None else None
+
+    def load(self, version):
+        """Roster DataFrame and label stored for a version"""
+        row = self._connect().execute(
+            "SELECT payload, label FROM roster_versions WHERE version = ?", (version,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Roster version {version} not found")
+        return pickle.loads(row[0]), row[1]
+
+    def has_version(self, version):
+        row = self._connect().execute(
+            "SELECT 1 FROM roster_versions WHERE version = ?", (version,)
+        ).fetchone()
+        return row is not None
+
+    def acquire_writer(self):
+        """Block until this caller is the only writer across all worker processes"""
+        self._process_lock.acquire()
+        if fcntl is None:
+            return None
+        lock_file = open(self.lock_path, 'a')
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    def release_writer(self, lease):
+        if lease is not None:
+            fcntl.flock(lease, fcntl.LOCK_UN)
+            lease.close()
+        self._process_lock.release()
+
+    def publish(self, roster_df, label='', crew_bases=None):
+        """Store a roster as the new head and return its global version id (caller holds the writer lease)
+
+        `crew_bases` maps crew_id to home base for the indexed `base` column.
+        """
+        payload = pickle.dumps(roster_df, protocol=pickle.HIGHEST_PROTOCOL)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute(
+                "INSERT INTO roster_versions (parent, label, created_at, assignments, payload) VALUES (?, ?, ?, ?, ?)",
+                (self.head(), label, time.time(), len(roster_df), payload)
+            )
+            version = cursor.lastrowid
+            self._insert_batched(
+                conn, "INSERT INTO assignments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self._assignment_rows(version, roster_df, crew_bases or {})
+            )
+            self._set_meta(conn, 'head', version)
+
+            # Retention: drop the oldest versions together with their rows
+            oldest_kept = conn.execute(
+                "SELECT MIN(version) FROM (SELECT version FROM roster_versions ORDER BY version DESC LIMIT ?)",
+                (self.max_versions,)
+            ).fetchone()[0]
+            for table in ('assignments', 'violations', 'roster_versions'):
+                conn.execute(f"DELETE FROM {table} WHERE version < ?", (oldest_kept,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return version
+
+    def record_violations(self, version, records):
+        """Replace the stored violations of a version with (category, crew_id, flight_id, message) records"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM violations WHERE version = ?", (version,))
+            self._insert_batched(
+                conn, "INSERT INTO violations VALUES (?, ?, ?, ?, ?)",
+                ((version, category, crew_id, flight_id, message)
+                 for category, crew_id, flight_id, message in records)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def query_assignments(self, version, **filters):
+        """Assignments of a version matching equality filters on crew_id, flight_id, duty_date or base"""
+        clauses, params = self._where(version, filters, QUERY_FILTERS)
+        cursor = self._connect().execute(
+            f"SELECT {', '.join(ASSIGNMENT_COLUMNS)} FROM assignments WHERE {clauses} ORDER BY departure_time",
+            params
+        )
+        return [dict(zip(ASSIGNMENT_COLUMNS, row)) for row in cursor]
+
+    def query_violations(self, version, **filters):
+        """Violations of a version matching equality filters on category or crew_id"""
+        clauses, params = self._where(version, filters, ('category', 'crew_id'))
+        cursor = self._connect().execute(
+            f"SELECT category, crew_id, flight_id, message FROM violations WHERE {clauses}", params
+        )
+        return [dict(zip(('category', 'crew_id', 'flight_id', 'message'), row)) for row in cursor]
+
+    def _where(self, version, filters, allowed):
+        clauses, params = ["version = ?"], [version]
+        for column, value in filters.items():
+            if column not in allowed:
+                raise ValueError(f"Cannot filter on {column}")
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return " AND ".join(clauses), params
+
+    def _assignment_rows(self, version, roster_df, crew_bases):
+        departures = pd.to_datetime(roster_df['departure_time'])
+        arrivals = pd.to_datetime(roster_df['arrival_time'])
+        return zip(
+            itertools.repeat(version),
+            roster_df['flight_id'],
+            roster_df['crew_id'],
+            roster_df['role'],
+            roster_df['duty_hours'].astype(float),
+            departures.dt.strftime('%Y-%m-%dT%H:%M:%S'),
+            arrivals.dt.strftime('%Y-%m-%dT%H:%M:%S'),
+            departures.dt.strftime('%Y-%m-%d'),
+            roster_df['crew_id'].map(crew_bases)
+        )
+
+    def _insert_batched(self, conn, statement, rows):
+        rows = iter(rows)
+        while True:
+            batch = list(itertools.islice(rows, self.batch_size))
+            if not batch:
+                return
+            conn.executemany(statement, batch)
+
+    def set_head(self, version):
+        """Point the head at an existing version (caller holds the writer lease)"""
+        if not self.has_version(version):
+            raise KeyError(f"Roster version {version} not found")
+        self._set_meta(self._connect(), 'head', version)
+
+    def record_input_change(self, table, changes):
+        """Log an amendment of an input table and return its id (caller holds the writer lease)"""
+        payload = pickle.dumps(changes, protocol=pickle.HIGHEST_PROTOCOL)
+        cursor = self._connect().execute(
+            "INSERT INTO input_changes (table_name, created_at, payload) VALUES (?, ?, ?)",
+            (table, time.time(), payload)
+        )
+        return cursor.lastrowid
+
+    def input_change_head(self):
+        """Id of the latest logged amendment, or 0"""
+        row = self._connect().execute("SELECT MAX(id) FROM input_changes").fetchone()
+        return row[0] or 0
+
+    def input_changes_since(self, change_id):
+        """[(id, table, changes DataFrame)] logged after `change_id`, oldest first"""
+        cursor = self._connect().execute(
+            "SELECT id, table_name, payload FROM input_changes WHERE id > ? ORDER BY id", (change_id,)
+        )
+        return [(row[0], row[1], pickle.loads(row[2])) for row in cursor]
+
+    def register_inputs(self, paths):
+        """Record a fingerprint of the input tables
+
+        Returns False when the stored rosters were built from different input files;
+        the shared head and the amendment log are then cleared so no worker serves
+        or replays them.
+        """
+        digest = hashlib.sha1()
+        for path in paths:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        signature = digest.hexdigest()
+
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM meta WHERE key = 'inputs'").fetchone()
+        if row is not None and row[0] == signature:
+            return True
+        # New inputs invalidate rosters built from the old ones
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM meta WHERE key = 'head'")
+        conn.execute("DELETE FROM input_changes")
+        self._set_meta(conn, 'inputs', signature)
+        conn.execute("COMMIT")
+        return row is None
+
+    def _set_meta(self, conn, key, value):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
@@ -0,0 +1,159 @@
+import threading
+import uuid
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+SHARED_TABLES = ('flights', 'crew', 'preferences', 'dgca_rules', 'historical_rosters')
+ALIGNMENT = 64
+
+
+def _column_array(column):
+    """A column as a fixed-width numpy array, plus a missing-value mask for text columns"""
+    if isinstance(column.dtype, np.dtype) and column.dtype.kind in 'biufmM':
+        return np.ascontiguousarray(column.to_numpy()), None
+    values = column.to_numpy(dtype=object)
+    missing = pd.isna(values)
+    text = np.array(['' if absent else str(value) for value, absent in zip(values, missing)], dtype=str)
+    if len(text) == 0:
+        text = text.astype('<U1')
+    return text, missing if missing.any() else None
+
+
+class SharedTablesHandle:
+    """Picklable reference to published input tables: a segment name and a per-column layout
+
+    Its size depends on the number of columns only, so handing it to a worker
+    costs the same for any fleet size.
+    """
+
+    def __init__(self, name, layout, compact):
+        self.name = name
+        self.layout = layout      # {table: [(column, dtype, length, offset, missing_offset)]}
+        self.compact = compact
+
+    def attach(self):
+        """Map the segment and return ({table: {column: read-only array}}, segment)
+
+        Arrays are views into the segment, so nothing is copied. Keep the
+        segment object alive for as long as the arrays are used.
+        """
+        segment = shared_memory.SharedMemory(name=self.name)
+        tables = {}
+        for table, columns in self.layout.items():
+            arrays = {}
+            for column, dtype, length, offset, missing_offset in columns:
+                values = np.ndarray((length,), dtype=np.dtype(dtype), buffer=segment.buf, offset=offset)
+                values.flags.writeable = False
+                if missing_offset is not None:
+                    missing = np.ndarray((length,), dtype=bool, buffer=segment.buf, offset=missing_offset)
+                    values = np.where(missing, None, values.astype(object))
+                arrays[column] = values
+            tables[table] = arrays
+        return tables, segment
+
+
+class SharedTables:
+    """Owner of the shared-memory copy of a DataLoader's input tables
+
+    `publish` writes every column of the input tables into one
+    multiprocessing.shared_memory segment and attaches its handle to the
+    loader. Pickling the loader then sends only the handle, and worker
+    processes map the segment instead of unpickling the frames. Numeric and
+    datetime columns are used in place. Text columns are stored as fixed-width
+    unicode. Publishing again, after a reload or an upload, replaces the previous
+    segment. It is unlinked as soon as no `lease` holds it, because workers can
+    only attach while the name exists. `close` does the same at shutdown.
+    """
+
+    def __init__(self):
+        self.segment = None
+        self.handle = None
+        self.leases = {}       # segment name -> runs that may still attach to it
+        self.retired = {}      # replaced segments waiting for their leases to end
+        self.lock = threading.Lock()
+
+    def publish(self, data_loader):
+        """Copy the loader's tables into a new segment; returns the handle"""
+        columns = []
+        size = 0
+        for table in SHARED_TABLES:
+            frame = getattr(data_loader, table)
+            if frame is None:
+                continue
+            for column in frame.columns:
+                values, missing = _column_array(frame[column])
+                offset = size
+                size = -(-(size + values.nbytes) // ALIGNMENT) * ALIGNMENT
+                missing_offset = None
+                if missing is not None:
+                    missing_offset = size
+                    size = -(-(size + missing.nbytes) // ALIGNMENT) * ALIGNMENT
+                columns.append((table, column, values, offset, missing, missing_offset))
+
+        segment = shared_memory.SharedMemory(name=f"roster_{uuid.uuid4().hex[:12]}", create=True, size=max(size, 1))
+        layout = {table: [] for table in SHARED_TABLES if getattr(data_loader, table) is not None}
+        for table, column, values, offset, missing, missing_offset in columns:
+            np.ndarray(values.shape, dtype=values.dtype, buffer=segment.buf, offset=offset)[:] = values
+            if missing is not None:
+                np.ndarray(missing.shape, dtype=bool, buffer=segment.buf, offset=missing_offset)[:] = missing
+            layout[table].append((column, values.dtype.str, len(values), offset, missing_offset))
+
+        with self.lock:
+            self._retire()
+            self.segment = segment
+            self.handle = SharedTablesHandle(segment.name, layout, data_loader.compact)
+            data_loader.shared_handle = self.handle
+            return self.handle
+
+    @contextmanager
+    def lease(self, handle=None):
+        """Keep a segment attachable until the block ends, even if it is replaced meanwhile
+
+        Leases the segment of `handle`, such as a snapshot's `shared_handle`, or
+        the current one. Yields the leased handle, or None when that segment was
+        already unlinked and the tables have to be pickled instead.
+        """
+        with self.lock:
+            if handle is None:
+                handle = self.handle
+            name = handle.name if handle is not None else None
+            if name is not None and not (self.segment is not None and self.segment.name == name) \
+                    and name not in self.retired:
+                handle = name = None
+            if name is not None:
+                self.leases[name] = self.leases.get(name, 0) + 1
+        try:
+            yield handle
+        finally:
+            if name is not None:
+                with self.lock:
+                    self.leases[name] -= 1
+                    if not self.leases[name]:
+                        del self.leases[name]
+                        if name in self.retired:
+                            self._unlink(self.retired.pop(name))
+
+    def memory_bytes(self):
+        return self.segment.size if self.segment is not None else 0
+
+    def close(self):
+        """Unlink the current segment once unleased; workers already attached keep their mapping"""
+        with self.lock:
+            self._retire()
+
+    def _retire(self):
+        if self.segment is None:
+            return
+        if self.leases.get(self.segment.name):
+            self.retired[self.segment.name] = self.segment
+        else:
+            self._unlink(self.segment)
+        self.segment = None
+        self.handle = None
+
+    def _unlink(self, segment):
+        segment.close()
+        segment.unlink()
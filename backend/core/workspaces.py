@@ -0,0 +1,263 @@
+import asyncio
+import os
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from core.roster_store import RosterStore
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; the spill directory is then not locked
+    fcntl = None
+
+WORKSPACE_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class WorkspacesUnavailable(RuntimeError):
+    """Named workspaces can't be used in this process: another one owns them"""
+
+
+class Workspace:
+    """One planner's roster version chain with its per-version metrics cache
+
+    Input tables are not copied: every workspace reads the same DataLoader frames,
+    and only the rosters it commits are its own. When an amendment changes flights
+    or crew the head roster uses, their ids collect in `stale_inputs` until the
+    workspace is refreshed.
+    """
+
+    def __init__(self, name, store, metrics_cache_size=16):
+        self.name = name
+        self.store = store
+        self.metrics_cache = OrderedDict()
+        self.metrics_cache_size = metrics_cache_size
+        self.replacements = None
+        self.pareto_front = []     # [{'objectives': {...}, 'roster': DataFrame}] from the last NSGA-II run
+        self.stale_inputs = {'flights': set(), 'crew': set()}
+        self.inputs_version = None  # Input amendment the running writer started from
+        self.last_used = time.time()
+        self.busy = 0
+        self.lock = asyncio.Lock()
+
+    @property
+    def roster(self):
+        """The head roster, or None if nothing was committed"""
+        return self.store.current()
+
+    def cached_metrics(self, version):
+        """(metrics, violation breakdown) recorded for a version, or None"""
+        if version not in self.metrics_cache:
+            return None
+        self.metrics_cache.move_to_end(version)
+        return self.metrics_cache[version]
+
+    def cache_metrics(self, version, metrics_data, breakdown):
+        self.metrics_cache[version] = (metrics_data, breakdown)
+        while len(self.metrics_cache) > self.metrics_cache_size:
+            self.metrics_cache.popitem(last=False)
+
+    @property
+    def stale(self):
+        return any(self.stale_inputs.values())
+
+    def mark_stale(self, stale_inputs):
+        for table, ids in stale_inputs.items():
+            self.stale_inputs[table] |= ids
+
+    def memory_bytes(self):
+        front = sum(int(member['roster'].memory_usage(deep=True).sum()) for member in self.pareto_front)
+        return self.store.memory_bytes() + front
+
+    def info(self, resident=True):
+        return {
+            'name': self.name,
+            'resident': resident,
+            'head': self.store.head,
+            'versions': len(self.store.versions),
+            'memory_bytes': self.memory_bytes() if resident else None,
+            'last_used': self.last_used,
+            'stale_inputs': {table: len(ids) for table, ids in self.stale_inputs.items()}
+        }
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        # The replacement index is rebuilt from the roster on first use after reloading
+        state['replacements'] = None
+        state['inputs_version'] = None
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault('stale_inputs', {'flights': set(), 'crew': set()})
+        state.setdefault('inputs_version', None)
+        self.__dict__.update(state)
+        self.busy = 0
+        self.lock = asyncio.Lock()
+
+
+class WorkspaceManager:
+    """Named workspaces kept in memory under an LRU + memory budget, spilled to disk when idle
+
+    A workspace with a writer running or waiting (`busy`) is never spilled, so a
+    running generation keeps its workspace resident until it commits. Stale input
+    ids for a spilled workspace are held in `pending_stale` and merged when it is
+    reloaded, so marking never reads spills back from disk.
+
+    Workspaces live in the memory of one process. Uvicorn workers don't share
+    it, so named workspaces are refused when `worker_processes` > 1. The first
+    process to use the spill directory also takes an exclusive lock on it, so
+    two server processes never load, diverge and overwrite the same spills.
+    """
+
+    def __init__(self, spill_dir, max_resident=8, memory_budget=256 * 1024 * 1024,
+                 version_limit=200, cache_size=4, metrics_cache_size=16, worker_processes=1):
+        self.spill_dir = spill_dir
+        self.worker_processes = worker_processes
+        self.max_resident = max(1, max_resident)
+        self.memory_budget = memory_budget
+        self.version_limit = version_limit
+        self.cache_size = cache_size
+        self.metrics_cache_size = metrics_cache_size
+        self.resident = OrderedDict()
+        self.spills = 0
+        self.pending_stale = {}    # spilled workspace name -> {'flights': ids, 'crew': ids}
+        self._lock = threading.RLock()
+        self._owner = None
+
+        os.makedirs(spill_dir, exist_ok=True)
+
+    def claim(self):
+        """Make this process the owner of the spill directory, or raise WorkspacesUnavailable"""
+        if self.worker_processes > 1:
+            raise WorkspacesUnavailable(
+                f"Named workspaces live in one worker process; run with WEB_WORKERS = 1 "
+                f"(currently {self.worker_processes}) to use them"
+            )
+        with self._lock:
+            if self._owner is not None or fcntl is None:
+                return
+            owner = open(os.path.join(self.spill_dir, '.owner.lock'), 'a')
+            try:
+                fcntl.flock(owner, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                owner.close()
+                raise WorkspacesUnavailable(f"Workspaces in {self.spill_dir} are owned by another server process")
+            self._owner = owner
+
+    def get(self, name, create=False):
+        """Return a workspace, reloading it from disk if it was spilled"""
+        self._validate(name)
+        self.claim()
+        with self._lock:
+            workspace = self.resident.get(name)
+            if workspace is None:
+                if os.path.exists(self._spill_path(name)):
+                    workspace = self._load(name)
+                    if name in self.pending_stale:
+                        workspace.mark_stale(self.pending_stale.pop(name))
+                elif create:
+                    workspace = Workspace(
+                        name, RosterStore(self.version_limit, self.cache_size), self.metrics_cache_size
+                    )
+                else:
+                    raise KeyError(f"Workspace {name} not found")
+                self.resident[name] = workspace
+
+            self.resident.move_to_end(name)
+            workspace.last_used = time.time()
+            self.enforce_budget(keep=name)
+            return workspace
+
+    def delete(self, name):
+        self._validate(name)
+        self.claim()
+        with self._lock:
+            self.pending_stale.pop(name, None)
+            found = self.resident.pop(name, None) is not None
+            path = self._spill_path(name)
+            if os.path.exists(path):
+                os.remove(path)
+                found = True
+            if not found:
+                raise KeyError(f"Workspace {name} not found")
+
+    def list(self):
+        """Resident workspaces (most recently used last) followed by spilled ones"""
+        self.claim()
+        with self._lock:
+            listed = [workspace.info() for workspace in self.resident.values()]
+            for filename in sorted(os.listdir(self.spill_dir)):
+                name, extension = os.path.splitext(filename)
+                if extension == '.pkl' and name not in self.resident:
+                    pending = self.pending_stale.get(name, {})
+                    listed.append({'name': name, 'resident': False,
+                                   'stale_inputs': {table: len(ids) for table, ids in pending.items()}})
+            return listed
+
+    def drop_replacements(self):
+        """Discard resident substitute indexes after the input tables change; they rebuild on next use"""
+        with self._lock:
+            for workspace in self.resident.values():
+                workspace.replacements = None
+
+    def mark_stale(self, table, ids, skip=None):
+        """Record ids of an amended input table in every workspace except `skip`; returns the names marked"""
+        marked = []
+        with self._lock:
+            if self._owner is None and not self.resident:
+                # This process never used workspaces; the spills, if any, are not its own
+                return marked
+            for name, workspace in self.resident.items():
+                if name != skip and workspace.store.head is not None:
+                    workspace.stale_inputs[table] |= ids
+                    marked.append(name)
+            for filename in os.listdir(self.spill_dir):
+                name, extension = os.path.splitext(filename)
+                if extension == '.pkl' and name != skip and name not in self.resident:
+                    pending = self.pending_stale.setdefault(name, {'flights': set(), 'crew': set()})
+                    pending[table] |= ids
+                    marked.append(name)
+        return marked
+
+    def memory_bytes(self):
+        with self._lock:
+            return sum(workspace.memory_bytes() for workspace in self.resident.values())
+
+    def enforce_budget(self, keep=None):
+        """Spill least recently used idle workspaces until count and memory fit the limits"""
+        with self._lock:
+            sizes = {name: workspace.memory_bytes() for name, workspace in self.resident.items()}
+            for name in list(self.resident):
+                if len(self.resident) <= self.max_resident and sum(sizes.values()) <= self.memory_budget:
+                    return
+                workspace = self.resident[name]
+                if name == keep or workspace.busy:
+                    continue
+                self._spill(workspace)
+                del self.resident[name]
+                del sizes[name]
+
+    def _spill(self, workspace):
+        path = self._spill_path(workspace.name)
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(workspace, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+        self.spills += 1
+
+    def _load(self, name):
+        path = self._spill_path(name)
+        with open(path, 'rb') as f:
+            workspace = pickle.load(f)
+        # The resident copy is now authoritative until it is spilled again
+        os.remove(path)
+        return workspace
+
+    def _spill_path(self, name):
+        return os.path.join(self.spill_dir, f"{name}.pkl")
+
+    def _validate(self, name):
+        if not WORKSPACE_NAME_PATTERN.match(name):
+            raise ValueError("Workspace names may only contain letters, digits, '-' and '_' (max 64)")
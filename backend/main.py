@@ -1,17 +1,39 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, File, HTTPException, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+import asyncio
+import copy
+import hmac
+import random
+import uuid
 import pandas as pd
 import json
 from typing import Dict, List, Any
 import os
+import time
 import numpy as np
 
 
 from config import *
-from core.data_loader import DataLoader
-from core.rule_engine import RuleEngine
+from core.data_loader import DataLoader, read_change_chunks
+from core.rule_engine import RuleEngine, ALLOWED_BASE_PAIRS
 from core.optimizer import GeneticOptimizer
+from core.engines import ENGINES, EngineContext, compare_engines, improve_roster, run_engine
+from core.progress import ProgressBus
+from core.input_lock import InputLock
+from core.readiness import StartupTracker
+from core.replacements import ReplacementIndex
+from core.delays import DelayPropagator
+from core.robustness import RobustnessSimulator
+from core.roster_store import RosterStore
+from core.shared_tables import SharedTables
+from core.shared_state import SharedState
+from core.workspaces import Workspace, WorkspaceManager, WorkspacesUnavailable
+from core.instrumentation import metrics, ProfileCapture, ProfilerBusy, call_profiled
+from core.serialization import encode_frame, json_response, to_native
 
 app = FastAPI(title="IndiGo Crew Rostering API", version="1.0.0")
 
@@ -22,198 +44,1273 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Profile-Id"],
 )
 
 # Global variables to store data
 data_loader = None
 rule_engine = None
-optimizer = None
-current_roster = None
+optimizer = None        # Holds the shared pairings; every GA run gets its own instance from new_optimizer()
+robustness = None
+roster_store = RosterStore(ROSTER_VERSION_LIMIT, ROSTER_FRAME_CACHE_SIZE)
+shared_state = SharedState(SHARED_STATE_PATH, ROSTER_VERSION_LIMIT, PERSISTENCE_BATCH_SIZE)
+default_workspace = Workspace(DEFAULT_WORKSPACE, roster_store, ROSTER_METRICS_CACHE_SIZE)
+workspaces = WorkspaceManager(
+    WORKSPACE_SPILL_DIR, WORKSPACE_MAX_RESIDENT, WORKSPACE_MEMORY_BUDGET_MB * 1024 * 1024,
+    ROSTER_VERSION_LIMIT, ROSTER_FRAME_CACHE_SIZE, ROSTER_METRICS_CACHE_SIZE, WEB_WORKERS
+)
+progress_bus = ProgressBus(PROGRESS_QUEUE_SIZE)
+shared_tables = SharedTables()
+input_lock = InputLock()
+catch_up_lock = asyncio.Lock()  # One request at a time builds the amendments other workers logged
+applied_inputs = 0      # Id of the last logged input amendment applied in this worker
+input_change_ids = {}   # Amendment id -> (table, changed ids), for rosters committed on older inputs
+startup = StartupTracker()
+warm_up_task = None
+recent_profiles = OrderedDict()
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize the AI system on startup"""
-    global data_loader, rule_engine, optimizer
+def profiling_allowed(request: Request) -> bool:
+    """Profiles may be requested with the configured token, or from localhost when none is set"""
+    if PROFILING_TOKEN:
+        return hmac.compare_digest(request.headers.get("X-Profile-Token", ""), PROFILING_TOKEN)
+    return request.client is not None and request.client.host in ("127.0.0.1", "::1")
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """Time every request and capture a cProfile report when asked to"""
+    profile_requested = PROFILING_ENABLED and (
+        request.headers.get("X-Profile") == "1" or request.query_params.get("profile") == "1"
+    )
+    if profile_requested and not profiling_allowed(request):
+        return JSONResponse({"detail": "Profiling is restricted to localhost or a PROFILING_TOKEN"}, status_code=403)
+    capture = ProfileCapture(PROFILE_REPORT_LINES) if profile_requested else None
+    
+    start_time = time.perf_counter()
+    if capture is not None:
+        try:
+            with capture:
+                response = await call_next(request)
+        except ProfilerBusy as e:
+            return JSONResponse({"detail": str(e)}, status_code=409)
+    else:
+        response = await call_next(request)
+    
+    route = request.scope.get("route")
+    route_path = route.path if route is not None else "unmatched"
+    metrics.observe('http_request_seconds', time.perf_counter() - start_time,
+                    method=request.method, route=route_path)
+    metrics.increment('http_requests_total', method=request.method, route=route_path,
+                      status=response.status_code)
+    
+    if capture is not None:
+        profile_id = uuid.uuid4().hex[:8]
+        recent_profiles[profile_id] = capture.report
+        while len(recent_profiles) > PROFILE_HISTORY_SIZE:
+            recent_profiles.popitem(last=False)
+        response.headers["X-Profile-Id"] = profile_id
+    
+    return response
+
+@app.middleware("http")
+async def sync_shared_state(request: Request, call_next):
+    """Pick up input amendments and roster versions from other worker processes before serving a request
+
+    Health probes never touch SQLite, and nothing syncs before the warm-up is
+    ready: until initialize() has registered the inputs, the shared head may
+    belong to rosters built from older input files. The shared input lock is
+    held only while the roster head is synced, not for the request: runs keep
+    the input objects they captured, and amendments swap in new ones.
+    """
+    path = request.url.path
+    if startup.ready and path.startswith("/api/") and not path.startswith("/api/health"):
+        if shared_state.input_change_head() > applied_inputs:
+            await catch_up_inputs()
+        async with input_lock.shared():
+            sync_shared_roster()
+    return await call_next(request)
+
+@app.middleware("http")
+async def gate_until_ready(request: Request, call_next):
+    """Answer API calls with 503 while the warm-up runs; health probes, / and /metrics always pass"""
+    path = request.url.path
+    if startup.ready or not path.startswith("/api/") or path.startswith("/api/health"):
+        return await call_next(request)
+    detail = "AI system failed to initialize" if startup.state == "failed" else "AI system is warming up"
+    return JSONResponse(
+        {"detail": detail, "startup": startup.report()}, status_code=503,
+        headers={"Retry-After": str(READINESS_RETRY_AFTER)}
+    )
+
+def sync_shared_roster():
+    """Make the shared head version current in this worker, loading it only when it moved"""
+    head = shared_state.head()
+    if head is None or head == roster_store.head:
+        return
+    if head in roster_store.versions:
+        roster_store.rollback(head)
+    else:
+        roster, label = shared_state.load(head)
+        roster_store.commit(roster, label=label, version=head)
+
+@asynccontextmanager
+async def shared_writer():
+    """Hold the cross-worker writer lease, starting from the latest inputs and shared roster"""
+    lease = await run_in_threadpool(shared_state.acquire_writer)
+    try:
+        # Amendments are logged under the lease, so none can arrive while it is held
+        if shared_state.input_change_head() > applied_inputs:
+            await catch_up_inputs()
+        sync_shared_roster()
+        yield
+    finally:
+        shared_state.release_writer(lease)
+
+def publish_roster(roster: pd.DataFrame, label: str):
+    """Commit a roster to the shared state and this worker's version store; needs the writer lease"""
+    crew_bases = dict(zip(data_loader.crew['crew_id'], data_loader.crew['base']))
+    version = shared_state.publish(roster, label, crew_bases)
+    roster_store.commit(roster, label=label, version=version)
+    if default_workspace.replacements is not None:
+        get_replacements(default_workspace)
+    
+    # Computing metrics runs the compliance check whose violations are persisted with the version
+    get_current_metrics(default_workspace)
+    if rule_engine is not None:
+        shared_state.record_violations(version, rule_engine.violation_records)
+    return version
+
+def get_workspace(name: str = None, create: bool = False) -> Workspace:
+    """Resolve a workspace query parameter; no name means the shared default workspace"""
+    if name is None or name == DEFAULT_WORKSPACE:
+        return default_workspace
+    try:
+        return workspaces.get(name, create)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except WorkspacesUnavailable as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@asynccontextmanager
+async def workspace_writer(workspace: Workspace):
+    """Serialize writers of a workspace; the default workspace is serialized across worker processes
+
+    The writer records the input amendment its run starts from, so commit_roster
+    can tell when the tables were amended before the roster was committed.
+    """
+    if workspace is default_workspace:
+        async with shared_writer():
+            workspace.inputs_version = applied_inputs
+            try:
+                yield
+            finally:
+                workspace.inputs_version = None
+        return
+    
+    # Marked busy before waiting on the lock so the workspace can't be spilled meanwhile
+    workspace.busy += 1
     try:
-        data_loader = DataLoader()
-        data_loader.load_all_data(
-            INPUT_FLIGHTS_PATH,
-            INPUT_CREW_PATH,
-            INPUT_PREFERENCES_PATH,
-            INPUT_DGCA_RULES_PATH,
-            INPUT_HISTORICAL_PATH
+        async with workspace.lock:
+            workspace.inputs_version = applied_inputs
+            try:
+                yield
+            finally:
+                workspace.inputs_version = None
+    finally:
+        workspace.busy -= 1
+
+def commit_roster(workspace: Workspace, roster: pd.DataFrame, label: str):
+    """Commit a roster as the new head of a workspace; needs its writer lock
+
+    A roster built before an input amendment is committed as is, labelled with
+    the amendment it was built on. The workspace is marked stale for the ids
+    changed since, and a refresh re-crews them.
+    """
+    built_on = workspace.inputs_version
+    if built_on is not None and built_on < applied_inputs:
+        label = f"{label}@inputs:{built_on}"
+        for change_id, (table, changed) in input_change_ids.items():
+            if change_id > built_on:
+                workspace.mark_stale({table: changed})
+    if workspace is default_workspace:
+        return publish_roster(roster, label)
+    version = workspace.store.commit(roster, label=label)
+    get_current_metrics(workspace)
+    if workspace.replacements is not None:
+        get_replacements(workspace)
+    workspaces.enforce_budget(keep=workspace.name)
+    return version
+
+def get_replacements(workspace: Workspace) -> ReplacementIndex:
+    """The workspace's substitute index, refreshed incrementally to its head version"""
+    if workspace.replacements is None:
+        workspace.replacements = ReplacementIndex(
+            data_loader, rule_engine.limits(), ALLOWED_BASE_PAIRS, REPLACEMENT_SHORTLIST_SIZE
         )
+    if workspace.replacements.version != workspace.store.head:
+        workspace.replacements.update(workspace.roster, workspace.store.head)
+    return workspace.replacements
+
+def new_optimizer():
+    """A GA instance for one run, so concurrent runs in different workspaces don't share populations"""
+    run_optimizer = GeneticOptimizer(data_loader, rule_engine, COMPLIANCE_WEIGHT)
+    run_optimizer.progress = progress_bus
+    run_optimizer.pairing_generator = optimizer.pairing_generator
+    run_optimizer.robustness, run_optimizer.robustness_weight = robustness, ROBUSTNESS_WEIGHT
+    return run_optimizer
+
+def horizon_cutoff(now: str, lock_hours: float) -> pd.Timestamp:
+    """End of the locked window: assignments departing before it are frozen"""
+    if lock_hours < 0:
+        raise HTTPException(status_code=400, detail="lock_hours must not be negative")
+    try:
+        return pd.Timestamp(now) + pd.Timedelta(hours=lock_hours)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid now timestamp: {e}")
+
+def optimize_horizon(run_optimizer: GeneticOptimizer, roster: pd.DataFrame, cutoff: pd.Timestamp,
+                     reopen=(), time_budget: float = None, patience: int = None):
+    """Re-optimize only the flights after `cutoff` (plus `reopen`), keeping earlier assignments
+
+    Returns (frozen assignments, frozen + re-optimized roster, score, horizon optimizer);
+    runs in a worker thread.
+    """
+    start_time = time.perf_counter()
+    frozen, horizon = run_optimizer.for_horizon(roster, cutoff, reopen)
+    if horizon.data.flights.empty:
+        return frozen, frozen, 0.0, horizon
+    if PAIRING_ROSTER_RATIO:
+        horizon.build_pairings(MIN_CONNECTION_HOURS, MAX_CONNECTION_HOURS, MAX_PAIRING_LEGS)
+    
+    horizon.create_initial_population(POPULATION_SIZE, time_budget, WARM_START_RATIO, PAIRING_ROSTER_RATIO)
+    remaining_budget = None
+    if time_budget is not None:
+        remaining_budget = max(0.0, time_budget - (time.perf_counter() - start_time))
+    best_roster, score = horizon.run_optimization(GENERATIONS // 2, time_budget=remaining_budget, patience=patience)
+    if best_roster is None or best_roster.empty:
+        return frozen, frozen, score, horizon
+    return frozen, pd.concat([frozen, best_roster], ignore_index=True), score, horizon
+
+def build_inputs(table: str, changes: pd.DataFrame):
+    """Apply a bulk amendment to a copy of the input tables and rebuild everything derived from them
+
+    Returns (changed ids, inputs) for install_inputs. Nothing in use is mutated,
+    so runs holding the current loader, rule engine, pairings or simulator
+    finish on a consistent set. Runs in a worker thread.
+    """
+    loader = copy.copy(data_loader)
+    # Preferences are recompiled into derived flight columns, which must not touch the frame in use
+    loader.flights = loader.flights.copy()
+    changed = loader.apply_changes(table, changes)
+    rules = RuleEngine(loader)
+    ga = GeneticOptimizer(loader, rules, COMPLIANCE_WEIGHT)
+    ga.progress = progress_bus
+    ga.build_pairings(MIN_CONNECTION_HOURS, MAX_CONNECTION_HOURS, MAX_PAIRING_LEGS)
+    simulator = RobustnessSimulator(
+        loader, rules.limits(), ALLOWED_BASE_PAIRS, SICK_CALL_RATE, DELAY_THRESHOLD_MINUTES,
+        MIN_CONNECTION_HOURS
+    )
+    ga.robustness, ga.robustness_weight = simulator, ROBUSTNESS_WEIGHT
+    if SHARE_INPUT_TABLES:
+        shared_tables.publish(loader)
+    return changed, (loader, rules, ga, simulator)
+
+def install_inputs(change_id: int, table: str, changed: set, inputs):
+    """Swap in inputs from build_inputs as one step; call on the event loop under the exclusive input lock"""
+    global data_loader, rule_engine, optimizer, robustness, applied_inputs
+    data_loader, rule_engine, optimizer, robustness = inputs
+    default_workspace.replacements = None
+    workspaces.drop_replacements()
+    input_change_ids[change_id] = (table, changed)
+    applied_inputs = change_id
+
+async def amend_inputs(table: str, changes: pd.DataFrame) -> set:
+    """Apply an amendment in this worker and log it for the others; needs the writer lease
+
+    Built aside, so runs and reads in other workspaces carry on meanwhile.
+    Returns the changed ids.
+    """
+    changed, inputs = await run_in_threadpool(build_inputs, table, changes)
+    change_id = shared_state.record_input_change(table, changes)
+    async with input_lock.exclusive():
+        install_inputs(change_id, table, changed, inputs)
+    return changed
+
+async def catch_up_inputs():
+    """Apply amendments logged by other workers since this one last caught up, oldest first
+
+    The default roster was repaired by the uploading worker and arrives with the
+    shared head; named workspaces here are marked stale.
+    """
+    async with catch_up_lock:
+        for change_id, table, changes in shared_state.input_changes_since(applied_inputs):
+            changed, inputs = await run_in_threadpool(build_inputs, table, changes)
+            async with input_lock.exclusive():
+                install_inputs(change_id, table, changed, inputs)
+            workspaces.mark_stale(table, changed)
+            print(f"🔄 Applied input amendment {change_id} ({len(changed)} {table} ids)")
+
+def recrew_flights(roster: pd.DataFrame, flight_ids=(), crew_ids=()):
+    """Re-crew `flight_ids` and the flights crewed by `crew_ids`, keeping every other assignment
+
+    Returns (repaired roster, re-crewed flight ids); runs in a worker thread.
+    """
+    affected = set(flight_ids) | set(roster.loc[roster['crew_id'].isin(crew_ids), 'flight_id'])
+    kept, repair_optimizer = new_optimizer().for_flights(roster, affected)
+    repaired = repair_optimizer.generate_random_roster()
+    return data_loader.compact_roster(pd.concat([kept, repaired], ignore_index=True)), affected
+
+@contextmanager
+def leased_tables(loader):
+    """Keep a loader's shared-memory segment alive for worker processes until the block ends
+
+    An amendment publishes a new segment and may unlink the loader's meanwhile;
+    the loader is then yielded as a copy whose frames are pickled instead.
+    """
+    with shared_tables.lease(loader.shared_handle) as handle:
+        if handle is not loader.shared_handle:
+            loader = copy.copy(loader)
+            loader.shared_handle = handle
+        yield loader
+
+def engine_context(warm_start: bool = False, pairings: bool = False, progress=None, snapshot=None,
+                   improve: bool = False) -> EngineContext:
+    """Engine inputs for one run, from the loaded data (or a snapshot of it) and the config"""
+    settings = {
+        'population_size': POPULATION_SIZE,
+        'generations': GENERATIONS,
+        'crossover_rate': CROSSOVER_RATE,
+        'mutation_rate': MUTATION_RATE,
+        'warm_start_ratio': WARM_START_RATIO,
+        'pairing_ratio': PAIRING_ROSTER_RATIO,
+        'compliance_weight': COMPLIANCE_WEIGHT,
+        'robustness_weight': ROBUSTNESS_WEIGHT,
+        'island_count': ISLAND_COUNT,
+        'migration_interval': MIGRATION_INTERVAL,
+        'migration_size': MIGRATION_SIZE,
+        'nsga_workers': NSGA_WORKERS,
+        'fairness_weight': LOCAL_SEARCH_FAIRNESS_WEIGHT,
+        'tabu_tenure': TABU_TENURE,
+        'initial_temperature': ANNEALING_START_TEMPERATURE,
+        'final_temperature': ANNEALING_END_TEMPERATURE,
+        'improve_time_budget': LOCAL_SEARCH_TIME_BUDGET,
+        'warm_start': warm_start,
+        'pairings': pairings,
+        'improve': improve
+    }
+    data = snapshot if snapshot is not None else data_loader
+    rules = rule_engine if snapshot is None else RuleEngine(snapshot)
+    return EngineContext(data, rules, settings, optimizer.pairing_generator, robustness, progress)
+
+def initialize():
+    """Load the inputs and build the engines, stage by stage; runs in a worker thread after the server binds"""
+    global data_loader, rule_engine, optimizer, robustness
+    with startup.stage("load_data"):
+        loader = DataLoader(COMPACT_DTYPES)
+        if not loader.load_all_data(INPUT_FLIGHTS_PATH, INPUT_CREW_PATH, INPUT_PREFERENCES_PATH,
+                                    INPUT_DGCA_RULES_PATH, INPUT_HISTORICAL_PATH):
+            raise RuntimeError("Input data could not be loaded")
+        data_loader = loader
+    with startup.stage("rule_engine"):
         rule_engine = RuleEngine(data_loader)
-        optimizer = GeneticOptimizer(data_loader, rule_engine)
-        print("✅ AI System initialized successfully")
+    with startup.stage("pairings"):
+        ga = GeneticOptimizer(data_loader, rule_engine, COMPLIANCE_WEIGHT)
+        ga.progress = progress_bus
+        ga.build_pairings(MIN_CONNECTION_HOURS, MAX_CONNECTION_HOURS, MAX_PAIRING_LEGS)
+    with startup.stage("robustness"):
+        robustness = RobustnessSimulator(
+            data_loader, rule_engine.limits(), ALLOWED_BASE_PAIRS, SICK_CALL_RATE, DELAY_THRESHOLD_MINUTES,
+            MIN_CONNECTION_HOURS
+        )
+        ga.robustness, ga.robustness_weight = robustness, ROBUSTNESS_WEIGHT
+        optimizer = ga
+    if SHARE_INPUT_TABLES:
+        with startup.stage("shared_tables"):
+            shared_tables.publish(data_loader)
+    
+    with startup.stage("roster_state"):
+        input_paths = [INPUT_FLIGHTS_PATH, INPUT_CREW_PATH, INPUT_PREFERENCES_PATH,
+                       INPUT_DGCA_RULES_PATH, INPUT_HISTORICAL_PATH]
+        if not shared_state.register_inputs(input_paths):
+            print("⚠️ Input data changed; shared rosters from the previous inputs were discarded")
+        # Amendments uploaded through other workers, so the tables match the shared head
+        for change_id, table, changes in shared_state.input_changes_since(applied_inputs):
+            install_inputs(change_id, table, *build_inputs(table, changes))
+        sync_shared_roster()
+        if roster_store.head is not None:
+            print(f"✅ Restored roster version {roster_store.head} ({len(default_workspace.roster)} assignments)")
+    if roster_store.head is not None:
+        with startup.stage("indexes"):
+            # Metrics and the substitute index for the restored head, so the first reads are cache hits
+            get_current_metrics(default_workspace)
+            get_replacements(default_workspace)
+
+async def warm_up():
+    """Background initialization, then an optional first roster; readiness flips when both are done"""
+    try:
+        await run_in_threadpool(initialize)
+        if WARM_UP_ENGINE and roster_store.head is None:
+            with startup.stage("first_roster"):
+                async with workspace_writer(default_workspace):
+                    roster, _ = await run_in_threadpool(run_engine, WARM_UP_ENGINE, engine_context())
+                    if roster is not None and not roster.empty:
+                        commit_roster(default_workspace, roster, f"warmup:{WARM_UP_ENGINE}")
+                        roster.to_csv(OUTPUT_BASE_ROSTER_PATH, index=False)
+        startup.mark_ready()
+        print(f"✅ AI System initialized successfully in {startup.ready_seconds:.1f}s")
     except Exception as e:
+        startup.fail(e)
         print(f"❌ Failed to initialize AI system: {e}")
 
+@app.on_event("startup")
+async def startup_event():
+    """Start the warm-up in the background so the server binds and answers probes right away"""
+    global warm_up_task
+    warm_up_task = asyncio.create_task(warm_up())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the shared-memory input tables"""
+    shared_tables.close()
+
 @app.get("/")
 async def root():
     return {"message": "IndiGo Crew Rostering API", "status": "active"}
 
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy", "initialized": data_loader is not None}
+    return {"status": "healthy", "initialized": startup.ready, "startup": startup.report()}
+
+@app.get("/api/health/live")
+async def liveness_check():
+    """Liveness: the process is up and serving, whether or not the warm-up has finished"""
+    return {"status": "alive", "uptime_seconds": time.time() - startup.started_at}
+
+@app.get("/api/health/ready")
+async def readiness_check():
+    """Readiness: 200 once the warm-up is done, 503 with the current stage and timings until then"""
+    report = startup.report()
+    if not startup.ready:
+        return JSONResponse(report, status_code=503, headers={"Retry-After": str(READINESS_RETRY_AFTER)})
+    return report
 
 @app.post("/api/generate-roster")
-async def generate_roster():
-    """Generate a new optimized roster"""
-    global current_roster
+async def generate_roster(mode: str = "greedy", engine: str = None, time_budget: float = OPTIMIZATION_TIME_BUDGET,
+                          patience: int = STAGNATION_PATIENCE, warm_start: bool = False, pairings: bool = False,
+                          improve: bool = False, workspace: str = None):
+    """Generate a new optimized roster with a registered engine (`mode` is the older name for `engine`)
+
+    With `improve`, the engine's roster is polished by LOCAL_SEARCH_TIME_BUDGET seconds of local search.
+    """
     try:
         if optimizer is None:
             raise HTTPException(status_code=500, detail="AI system not initialized")
+        engine = engine or mode
+        if engine not in ENGINES:
+            raise HTTPException(status_code=400, detail=f"Unknown engine {engine}; available: {', '.join(ENGINES)}")
         
-        roster = optimizer.generate_random_roster()
-        if roster is None or roster.empty:
-            raise HTTPException(status_code=500, detail="Failed to generate roster")
-        
-        current_roster = roster
-        roster.to_csv(OUTPUT_BASE_ROSTER_PATH, index=False)
+        target = get_workspace(workspace, create=True)
+        async with workspace_writer(target):
+            run_id = uuid.uuid4().hex[:8]
+            progress_bus.publish('started', run_id=run_id, mode=engine)
+            
+            # Run off the event loop so progress streams keep flowing during generation
+            context = engine_context(warm_start, pairings, progress_bus, improve=improve)
+            # Island and NSGA-II workers attach to the segment, which an upload may replace mid-run
+            with leased_tables(context.data) as context.data:
+                roster, details = await run_in_threadpool(
+                    call_profiled, run_engine, engine, context, time_budget=time_budget, patience=patience
+                )
+            if 'pareto_front' in details:
+                # The highest-coverage trade-off becomes the head; planners can select another one
+                target.pareto_front = details['pareto_front']
+            if roster is None or roster.empty:
+                progress_bus.publish('failed', run_id=run_id)
+                raise HTTPException(status_code=500, detail="Failed to generate roster")
+            
+            version = commit_roster(target, roster, f"generate:{engine}")
+            if target is default_workspace:
+                roster.to_csv(OUTPUT_BASE_ROSTER_PATH, index=False)
         
         # Calculate metrics
-        metrics = calculate_roster_metrics(roster)
+        metrics = get_current_metrics(target)
+        progress_bus.publish('complete', run_id=run_id, covered_flights=metrics.get('covered_flights', 0),
+                             total_flights=metrics.get('total_flights', 0))
         
-        return {
+        response = {
             "message": "Roster generated successfully",
+            "workspace": target.name,
+            "version": version,
             "metrics": metrics,
+            "engine": engine,
             "roster_size": len(roster)
         }
+        if 'pareto_front' in details:
+            response["pareto_front"] = pareto_summary(target)
+        if 'local_search' in details:
+            response["local_search"] = to_native(details['local_search'])
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback, sys
         print("❌ Full traceback in generate_roster:")
         traceback.print_exc(file=sys.stdout)
         raise HTTPException(status_code=500, detail=str(e))
     
+@app.get("/api/engines")
+async def list_engines():
+    """Registered rostering engines"""
+    return {"engines": [{"name": name, "description": engine.description} for name, engine in ENGINES.items()]}
+
+@app.post("/api/engines/compare")
+async def compare_roster_engines(engines: str = "greedy,coverage,ga", time_budget: float = COMPARISON_TIME_BUDGET,
+                                 patience: int = STAGNATION_PATIENCE):
+    """Run several engines concurrently on one data snapshot under the same time budget
+
+    Nothing is committed; each engine reports coverage, violations, runtime and peak memory.
+    """
+    if optimizer is None:
+        raise HTTPException(status_code=500, detail="AI system not initialized")
+    names = [name.strip() for name in engines.split(",") if name.strip()]
+    if not names:
+        raise HTTPException(status_code=400, detail="No engines given")
+    
+    # Uploads replace the loaded tables rather than mutating them, so a shallow copy is a stable snapshot;
+    # it reaches the engine processes as the shared-memory handle of its own segment, leased until they finish
+    start_time = time.perf_counter()
+    try:
+        with leased_tables(copy.copy(data_loader)) as snapshot:
+            context = engine_context(snapshot=snapshot)
+            results = await run_in_threadpool(compare_engines, names, context, time_budget, patience)
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=str(e.args[0]))
+    return {
+        "time_budget": time_budget,
+        "total_flights": int(snapshot.flights['flight_id'].nunique()),
+        "elapsed_seconds": time.perf_counter() - start_time,
+        "results": to_native(results)
+    }
+
+@app.post("/api/roster/improve")
+async def improve_current_roster(time_budget: float = LOCAL_SEARCH_TIME_BUDGET, seed: int = None,
+                                 workspace: str = None):
+    """Polish the workspace head with tabu / simulated-annealing local search and commit the result"""
+    if optimizer is None:
+        raise HTTPException(status_code=500, detail="AI system not initialized")
+    target = get_workspace(workspace)
+    async with workspace_writer(target):
+        roster = target.roster
+        if roster is None or roster.empty:
+            raise HTTPException(status_code=404, detail="No roster to improve")
+        improved, stats = await run_in_threadpool(
+            call_profiled, improve_roster, engine_context(), roster, time_budget, seed
+        )
+        improved_found = stats['final_objective'] < stats['initial_objective']
+        version = target.store.head
+        if improved_found:
+            version = commit_roster(target, improved, "improve:local_search")
+            if target is default_workspace:
+                improved.to_csv(OUTPUT_BASE_ROSTER_PATH, index=False)
+    return {
+        "message": "Roster improved" if improved_found else "No improvement found",
+        "workspace": target.name,
+        "version": version,
+        "local_search": to_native(stats),
+        "metrics": get_current_metrics(target)
+    }
+
+def pareto_summary(workspace: Workspace):
+    """Objective vectors of the workspace's last Pareto front, by index"""
+    return [
+        {"index": index, **to_native(member['objectives']), "roster_size": len(member['roster'])}
+        for index, member in enumerate(workspace.pareto_front)
+    ]
+
+@app.get("/api/pareto")
+async def get_pareto_front(workspace: str = None):
+    """Trade-offs found by the last NSGA-II run in a workspace"""
+    target = get_workspace(workspace)
+    return {"workspace": target.name, "pareto_front": pareto_summary(target)}
+
+@app.post("/api/pareto/{index}/select")
+async def select_pareto_roster(index: int, workspace: str = None):
+    """Commit one Pareto-front roster as the workspace head"""
+    target = get_workspace(workspace)
+    async with workspace_writer(target):
+        if not 0 <= index < len(target.pareto_front):
+            raise HTTPException(status_code=404, detail=f"No Pareto front member {index}")
+        member = target.pareto_front[index]
+        version = commit_roster(target, member['roster'], f"pareto:{index}")
+        if target is default_workspace:
+            member['roster'].to_csv(OUTPUT_BASE_ROSTER_PATH, index=False)
+    return {
+        "message": f"Pareto front member {index} selected",
+        "workspace": target.name,
+        "version": version,
+        "objectives": to_native(member['objectives']),
+        "metrics": get_current_metrics(target)
+    }
+
+def roster_etag(workspace: Workspace):
+    """Entity tag identifying the current roster version of a workspace"""
+    if workspace is default_workspace:
+        return f'W/"roster-v{workspace.store.head}"'
+    return f'W/"{workspace.name}-v{workspace.store.head}"'
+
+def not_modified(request: Request, workspace: Workspace):
+    """A 304 response if the client already holds the current roster version, else None"""
+    etag = roster_etag(workspace)
+    client_tags = [tag.strip().removeprefix('W/') for tag in request.headers.get("if-none-match", "").split(",")]
+    if "*" in client_tags or etag.removeprefix('W/') in client_tags:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+def get_current_metrics(workspace: Workspace):
+    """Metrics for the current roster version of a workspace, computed once per version"""
+    version = workspace.store.head
+    cached = workspace.cached_metrics(version)
+    if cached is not None:
+        return cached[0]
+    
+    metrics_data = calculate_roster_metrics(workspace.roster)
+    breakdown = rule_engine.get_violation_breakdown() if rule_engine else {}
+    workspace.cache_metrics(version, metrics_data, breakdown)
+    return metrics_data
+
 @app.get("/api/roster")
-async def get_roster():
-    """Get the current roster data"""
-    if current_roster is None:
+async def get_roster(request: Request, since: int = None, format: str = "records", workspace: str = None):
+    """Get the current roster data, or only the changes since a known version
+
+    format=columnar returns the roster as {"columns", "length", "data"} column arrays
+    instead of one object per assignment.
+    """
+    target = get_workspace(workspace)
+    store = target.store
+    if store.head is None:
         raise HTTPException(status_code=404, detail="No roster available. Generate one first.")
+    if format not in ("records", "columnar"):
+        raise HTTPException(status_code=400, detail="format must be 'records' or 'columnar'")
+    
+    cached = not_modified(request, target)
+    if cached is not None:
+        return cached
     
     try:
-        # Convert roster to JSON format
-        roster_data = current_roster.to_dict(orient='records')
-        metrics = calculate_roster_metrics(current_roster)
+        headers = {"ETag": roster_etag(target)}
+        metrics = get_current_metrics(target)
+        
+        # Incremental read: only the assignments that changed since the client's version
+        if since is not None and since in store.versions:
+            return json_response({
+                "version": store.head,
+                "since": since,
+                "delta": store.diff(since, store.head),
+                "metrics": metrics
+            }, request, headers=headers)
         
-        return {
-            "roster": roster_data,
+        return json_response({
+            "version": store.head,
+            "format": format,
+            "roster": encode_frame(target.roster, format),
             "metrics": metrics
-        }
+        }, request, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/roster/flights")
-async def get_flights():
+async def get_flights(request: Request, workspace: str = None):
     """Get all flights with crew assignments"""
-    if current_roster is None:
+    target = get_workspace(workspace)
+    if target.store.head is None:
         raise HTTPException(status_code=404, detail="No roster available")
     
+    cached = not_modified(request, target)
+    if cached is not None:
+        return cached
+    
     try:
+        flight_info = data_loader.flights.drop_duplicates('flight_id').set_index('flight_id')
         flights_data = []
-        for flight_id, assignments in current_roster.groupby('flight_id'):
-            flight_info = data_loader.flights[data_loader.flights['flight_id'] == flight_id].iloc[0].to_dict()
+        for flight_id, assignments in target.roster.groupby('flight_id', observed=True):
+            flight = flight_info.loc[flight_id]
             flights_data.append({
                 "flight_id": flight_id,
-                "origin": flight_info['origin'],
-                "destination": flight_info['destination'],
-                "aircraft_type": flight_info['aircraft_type'],
-                "departure_time": flight_info['departure_time'],
-                "assignments": assignments.to_dict(orient='records')
+                "origin": flight['origin'],
+                "destination": flight['destination'],
+                "aircraft_type": flight['aircraft_type'],
+                "departure_time": flight['departure_time'],
+                "assignments": encode_frame(assignments)
             })
         
-        return {"flights": flights_data}
+        return json_response({"flights": flights_data}, request, headers={"ETag": roster_etag(target)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/disrupt/{crew_id}/{flight_id}")
-async def simulate_disruption(crew_id: str, flight_id: str):
-    """Simulate a disruption and recover"""
-    global current_roster   # ✅ moved to the top
-    
-    if current_roster is None:
+@app.get("/api/roster/versions")
+async def list_roster_versions(workspace: str = None):
+    """List retained roster versions"""
+    store = get_workspace(workspace).store
+    return {"head": store.head, "versions": store.list_versions()}
+
+@app.get("/api/roster/diff")
+async def diff_roster_versions(from_version: int, to_version: int = None, workspace: str = None):
+    """Get assignments added, removed and changed between two roster versions"""
+    store = get_workspace(workspace).store
+    try:
+        return store.diff(from_version, to_version if to_version is not None else store.head)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.get("/api/roster/robustness")
+async def evaluate_robustness(scenarios: int = ROBUSTNESS_SCENARIOS, seed: int = None, version: int = None,
+                              compare_to: int = None, workspace: str = None):
+    """Monte Carlo robustness of a roster version under random sick calls and delays
+
+    With compare_to, a second version is evaluated on the same scenarios.
+    """
+    if robustness is None:
+        raise HTTPException(status_code=500, detail="System not initialized")
+    if not 1 <= scenarios <= ROBUSTNESS_MAX_SCENARIOS:
+        raise HTTPException(status_code=400, detail=f"scenarios must be between 1 and {ROBUSTNESS_MAX_SCENARIOS}")
+    store = get_workspace(workspace).store
+    version = version if version is not None else store.head
+    if version is None:
         raise HTTPException(status_code=404, detail="No roster available")
     
+    seed = seed if seed is not None else random.randrange(2 ** 31)
     try:
-        # Create disrupted roster
-        disrupted_roster = current_roster[
-            ~((current_roster['flight_id'] == flight_id) & 
-              (current_roster['crew_id'] == crew_id))
-        ].copy()
-        
-        # Re-optimize
-        optimizer.create_initial_population(POPULATION_SIZE)
-        recovered_roster, recovery_score = optimizer.run_optimization(GENERATIONS // 2)
+        rosters = {version: store.get(version)}
+        if compare_to is not None:
+            rosters[compare_to] = store.get(compare_to)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    results = {}
+    for evaluated, roster in rosters.items():
+        results[evaluated] = await run_in_threadpool(
+            robustness.evaluate, roster, scenarios, ROBUSTNESS_WORKERS, seed
+        )
+    
+    response = {"version": version, "seed": seed, "robustness": results[version]}
+    if compare_to is not None:
+        response["compare_to"] = compare_to
+        response["baseline"] = results[compare_to]
+        response["expected_uncovered_delta"] = (
+            results[version]["expected_uncovered_flights"] - results[compare_to]["expected_uncovered_flights"]
+        )
+    return response
 
-        
-        if recovered_roster is not None:
-            current_roster = recovered_roster
-            recovered_roster.to_csv(OUTPUT_RECOVERED_ROSTER_PATH, index=False)
+@app.get("/api/roster/assignments")
+async def query_assignments(request: Request, crew_id: str = None, flight_id: str = None, date: str = None,
+                            base: str = None, version: int = None):
+    """Look up assignments by crew, flight, duty date (YYYY-MM-DD) or crew base through the persisted indexes"""
+    version = version if version is not None else roster_store.head
+    if version is None or not shared_state.has_version(version):
+        raise HTTPException(status_code=404, detail="Roster version not found")
+    
+    assignments = shared_state.query_assignments(
+        version, crew_id=crew_id, flight_id=flight_id, duty_date=date, base=base
+    )
+    return json_response({"version": version, "count": len(assignments), "assignments": assignments}, request)
+
+@app.get("/api/roster/violations")
+async def query_violations(request: Request, category: str = None, crew_id: str = None, version: int = None):
+    """Look up persisted violations of a roster version by category or crew"""
+    version = version if version is not None else roster_store.head
+    if version is None or not shared_state.has_version(version):
+        raise HTTPException(status_code=404, detail="Roster version not found")
+    
+    violations = shared_state.query_violations(version, category=category, crew_id=crew_id)
+    return json_response({"version": version, "count": len(violations), "violations": violations}, request)
+
+@app.post("/api/roster/rollback/{version}")
+async def rollback_roster(version: int, workspace: str = None):
+    """Make an earlier roster version current again"""
+    target = get_workspace(workspace)
+    async with workspace_writer(target):
+        try:
+            if target is default_workspace:
+                shared_state.set_head(version)
+                sync_shared_roster()
+            else:
+                target.store.rollback(version)
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    
+    return {
+        "message": f"Rolled back to version {version}",
+        "workspace": target.name,
+        "version": version,
+        "metrics": get_current_metrics(target)
+    }
+
+@app.get("/api/workspaces")
+async def list_workspaces():
+    """List named workspaces with their residency and approximate memory use"""
+    try:
+        named = workspaces.list()
+    except WorkspacesUnavailable as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {
+        "default": default_workspace.info(),
+        "workspaces": named,
+        "resident_memory_bytes": workspaces.memory_bytes(),
+        "memory_budget_bytes": workspaces.memory_budget,
+        "spills": workspaces.spills
+    }
+
+@app.post("/api/workspaces/{name}")
+async def create_workspace(name: str, fork: bool = True):
+    """Create a named workspace, starting from the default workspace's current roster unless fork=false"""
+    if name == DEFAULT_WORKSPACE:
+        raise HTTPException(status_code=400, detail="The default workspace always exists")
+    try:
+        workspaces.get(name)
+        raise HTTPException(status_code=409, detail=f"Workspace {name} already exists")
+    except KeyError:
+        pass
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except WorkspacesUnavailable as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    target = get_workspace(name, create=True)
+    if fork and roster_store.head is not None:
+        async with workspace_writer(target):
+            commit_roster(target, default_workspace.roster, f"fork:{DEFAULT_WORKSPACE}@{roster_store.head}")
+    return target.info()
+
+@app.delete("/api/workspaces/{name}")
+async def delete_workspace(name: str):
+    """Delete a named workspace and its spilled state"""
+    try:
+        workspaces.delete(name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except WorkspacesUnavailable as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"message": f"Workspace {name} deleted"}
+
+@app.post("/api/workspaces/{name}/refresh")
+async def refresh_workspace(name: str):
+    """Re-crew the flights of a named workspace that input amendments changed since it was last refreshed"""
+    if name == DEFAULT_WORKSPACE:
+        raise HTTPException(status_code=400, detail="The default workspace is repaired by every upload")
+    target = get_workspace(name)
+    async with workspace_writer(target):
+        version, affected = target.store.head, set()
+        if target.stale and version is not None:
+            repaired, affected = await run_in_threadpool(
+                recrew_flights, target.roster, target.stale_inputs['flights'], target.stale_inputs['crew']
+            )
+            version = commit_roster(target, repaired, "refresh:inputs")
+        target.stale_inputs = {'flights': set(), 'crew': set()}
+    return {
+        "workspace": target.name,
+        "version": version,
+        "recrewed_flights": len(affected),
+        "new_metrics": get_current_metrics(target) if affected else None
+    }
+
+@app.post("/api/disrupt/{crew_id}/{flight_id}")
+async def simulate_disruption(crew_id: str, flight_id: str, time_budget: float = OPTIMIZATION_TIME_BUDGET,
+                              patience: int = STAGNATION_PATIENCE, reoptimize: bool = False,
+                              now: str = None, lock_hours: float = ROLLING_LOCK_HOURS, workspace: str = None):
+    """Simulate a disruption and recover
+
+    A single crew drop-out is answered from the replacement index: the best legal
+    substitute takes the seat. The GA re-optimizes only when no substitute exists
+    or reoptimize=true. Given `now`, it re-optimizes only the rolling horizon: the
+    disrupted flight plus everything departing after now + lock_hours.
+    """
+    cutoff = horizon_cutoff(now, lock_hours) if now is not None else None
+    target = get_workspace(workspace)
+    if target.store.head is None:
+        raise HTTPException(status_code=404, detail="No roster available")
+    
+    try:
+        async with workspace_writer(target):
+            current_roster = target.roster
+            start_time = time.perf_counter()
+            index = get_replacements(target)
+            alternatives = []
+            if index.is_assigned(crew_id, flight_id):
+                alternatives = index.describe(flight_id, index.lookup(flight_id, crew_id))
             
-            return {
-                "message": "Disruption handled successfully",
-                "removed_crew": crew_id,
-                "affected_flight": flight_id,
-                "recovery_score": recovery_score,
-                "new_metrics": calculate_roster_metrics(recovered_roster)
-            }
-        else:
-            raise HTTPException(status_code=500, detail="Failed to recover from disruption")
+            if alternatives and not reoptimize:
+                replacement = alternatives[0]
+                recovered_roster = current_roster.copy()
+                seat = (recovered_roster['flight_id'] == flight_id) & (recovered_roster['crew_id'] == crew_id)
+                recovered_roster.loc[seat, 'crew_id'] = replacement['crew_id']
+                recovered_roster.loc[seat, 'role'] = replacement['role']
+                
+                version = commit_roster(
+                    target, recovered_roster, f"disruption:{crew_id}/{flight_id}->{replacement['crew_id']}"
+                )
+                if target is default_workspace:
+                    recovered_roster.to_csv(OUTPUT_RECOVERED_ROSTER_PATH, index=False)
+                return {
+                    "message": f"{crew_id} replaced by {replacement['crew_id']} on {flight_id}",
+                    "workspace": target.name,
+                    "version": version,
+                    "removed_crew": crew_id,
+                    "affected_flight": flight_id,
+                    "strategy": "replacement",
+                    "replacement": replacement,
+                    "alternatives": alternatives,
+                    "elapsed_seconds": time.perf_counter() - start_time,
+                    "new_metrics": get_current_metrics(target)
+                }
             
+            # Create disrupted roster
+            disrupted_roster = current_roster[
+                ~((current_roster['flight_id'] == flight_id) & 
+                  (current_roster['crew_id'] == crew_id))
+            ].copy()
+            
+            # Re-optimize within the requested time budget
+            progress_bus.publish('started', run_id=uuid.uuid4().hex[:8], mode='disruption')
+            run_optimizer = new_optimizer()
+            if cutoff is not None:
+                _, recovered_roster, recovery_score, run_optimizer = await run_in_threadpool(
+                    call_profiled, optimize_horizon, run_optimizer, disrupted_roster, cutoff, [flight_id],
+                    time_budget=time_budget, patience=patience
+                )
+            else:
+                await run_in_threadpool(
+                    call_profiled, run_optimizer.create_initial_population, POPULATION_SIZE, time_budget,
+                    WARM_START_RATIO, PAIRING_ROSTER_RATIO
+                )
+                remaining_budget = None
+                if time_budget is not None:
+                    remaining_budget = max(0.0, time_budget - (time.perf_counter() - start_time))
+                recovered_roster, recovery_score = await run_in_threadpool(
+                    call_profiled, run_optimizer.run_optimization, GENERATIONS // 2, time_budget=remaining_budget, patience=patience
+                )
+            
+            if recovered_roster is not None:
+                version = commit_roster(target, recovered_roster, f"disruption:{crew_id}/{flight_id}")
+                if target is default_workspace:
+                    recovered_roster.to_csv(OUTPUT_RECOVERED_ROSTER_PATH, index=False)
+                progress_bus.publish('complete', covered_flights=int(recovered_roster['flight_id'].nunique()),
+                                     total_flights=len(data_loader.flights))
+                
+                return {
+                    "message": "Disruption handled successfully",
+                    "workspace": target.name,
+                    "version": version,
+                    "removed_crew": crew_id,
+                    "affected_flight": flight_id,
+                    "strategy": "reoptimize" if cutoff is None else "rolling",
+                    "alternatives": alternatives,
+                    "recovery_score": float(recovery_score),
+                    "optimization": {
+                        "generations_run": len(run_optimizer.history),
+                        "stop_reason": run_optimizer.stop_reason,
+                        "elapsed_seconds": time.perf_counter() - start_time,
+                        "history": run_optimizer.history
+                    },
+                    "new_metrics": get_current_metrics(target)
+                }
+            else:
+                raise HTTPException(status_code=500, detail="Failed to recover from disruption")
+                
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/reoptimize")
+async def reoptimize_rolling_horizon(now: str, lock_hours: float = ROLLING_LOCK_HOURS,
+                                     time_budget: float = OPTIMIZATION_TIME_BUDGET,
+                                     patience: int = STAGNATION_PATIENCE, workspace: str = None):
+    """Rolling-horizon re-optimization of the current roster
+
+    Assignments departing before now + lock_hours are frozen; only the flights
+    after that are re-solved, starting from the duty the frozen part already
+    puts on each crew member.
+    """
+    cutoff = horizon_cutoff(now, lock_hours)
+    target = get_workspace(workspace)
+    if target.store.head is None:
+        raise HTTPException(status_code=404, detail="No roster available")
+    
+    async with workspace_writer(target):
+        start_time = time.perf_counter()
+        progress_bus.publish('started', run_id=uuid.uuid4().hex[:8], mode='rolling')
+        frozen, roster, score, horizon = await run_in_threadpool(
+            call_profiled, optimize_horizon, new_optimizer(), target.roster, cutoff,
+            time_budget=time_budget, patience=patience
+        )
+        if roster.empty:
+            raise HTTPException(status_code=500, detail="Failed to re-optimize the open horizon")
+        version = commit_roster(target, roster, f"rolling:{cutoff.isoformat()}")
+        if target is default_workspace:
+            roster.to_csv(OUTPUT_BASE_ROSTER_PATH, index=False)
+        progress_bus.publish('complete', covered_flights=int(roster['flight_id'].nunique()),
+                             total_flights=len(data_loader.flights))
+    
+    return {
+        "message": "Open horizon re-optimized",
+        "workspace": target.name,
+        "version": version,
+        "cutoff": cutoff.isoformat(),
+        "frozen_assignments": len(frozen),
+        "open_flights": int(horizon.data.flights['flight_id'].nunique()),
+        "score": float(score),
+        "optimization": {
+            "generations_run": len(horizon.history),
+            "stop_reason": horizon.stop_reason,
+            "elapsed_seconds": time.perf_counter() - start_time,
+            "history": horizon.history
+        },
+        "new_metrics": get_current_metrics(target)
+    }
+
+@app.post("/api/upload/{table}")
+async def upload_changes(table: str, file: UploadFile = File(...), format: str = None, workspace: str = None):
+    """Bulk flight or crew amendment from a CSV or JSON Lines upload
+
+    Rows upsert by flight_id / crew_id, or delete with action=delete. The default
+    roster, and the target workspace's, keep every assignment not on a changed
+    flight or crewed by changed crew; only those flights are re-crewed. Other
+    named workspaces are marked stale until refreshed. The amendment is logged
+    in the shared state, so the other workers apply it before their next request.
+    """
+    if data_loader is None:
+        raise HTTPException(status_code=500, detail="AI system not initialized")
+    if table not in ("flights", "crew"):
+        raise HTTPException(status_code=404, detail=f"Unknown table {table}")
+    if format is None:
+        format = "jsonl" if (file.filename or "").lower().endswith((".jsonl", ".ndjson")) else "csv"
+    
+    async with shared_writer():
+        start_time = time.perf_counter()
+        target = get_workspace(workspace)
+        try:
+            chunks = await run_in_threadpool(lambda: list(read_change_chunks(file.file, format, UPLOAD_CHUNK_SIZE)))
+            if not chunks:
+                raise ValueError("No rows in upload")
+            changes = pd.concat(chunks, ignore_index=True)
+            changed = await amend_inputs(table, changes)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        stale_ids = (changed, ()) if table == 'flights' else ((), changed)
+        
+        version, affected = None, set()
+        if roster_store.head is not None:
+            repaired, affected = await run_in_threadpool(recrew_flights, default_workspace.roster, *stale_ids)
+            version = publish_roster(repaired, f"upload:{table}:{len(changed)}")
+            repaired.to_csv(OUTPUT_BASE_ROSTER_PATH, index=False)
+        if target is not default_workspace:
+            async with workspace_writer(target):
+                version, affected = None, set()
+                if target.store.head is not None:
+                    repaired, affected = await run_in_threadpool(recrew_flights, target.roster, *stale_ids)
+                    version = commit_roster(target, repaired, f"upload:{table}:{len(changed)}")
+        stale = workspaces.mark_stale(table, changed, skip=target.name)
+    
+    return {
+        "message": f"Applied {len(changes)} {table} rows",
+        "workspace": target.name,
+        "version": version,
+        "rows": len(changes),
+        "changed_ids": len(changed),
+        "recrewed_flights": len(affected),
+        "stale_workspaces": stale,
+        "elapsed_seconds": time.perf_counter() - start_time,
+        "new_metrics": get_current_metrics(target) if version is not None else None
+    }
+
+@app.post("/api/delay/{flight_id}")
+async def simulate_delay(flight_id: str, minutes: int, workspace: str = None):
+    """Delay a flight and repair only the crew timelines the delay cascades into
+
+    The new times of the delayed and knock-on flights are logged as a flights
+    amendment, like an upload, so later runs and the other workers keep the
+    delay. The default roster re-crews those flights when another workspace
+    is delayed, and other named workspaces are marked stale.
+    """
+    if minutes <= 0:
+        raise HTTPException(status_code=400, detail="minutes must be positive")
+    target = get_workspace(workspace)
+    if target.store.head is None:
+        raise HTTPException(status_code=404, detail="No roster available")
+    
+    # The writer lease comes first, as in uploads: it is needed to log the amendment
+    async with shared_writer():
+        async with workspace_writer(target) if target is not default_workspace else nullcontext():
+            if target.stale:
+                # Delays are propagated from the roster's times, which must match the flights table
+                raise HTTPException(status_code=409, detail=f"Workspace {target.name} has stale inputs; refresh it first")
+            start_time = time.perf_counter()
+            propagator = DelayPropagator(get_replacements(target), rule_engine.limits(), MIN_CONNECTION_HOURS,
+                                         MAX_KNOCK_ON_DELAYS)
+            try:
+                delayed_roster, report = propagator.apply(target.roster, flight_id, minutes)
+            except KeyError as e:
+                raise HTTPException(status_code=404, detail=str(e))
+            propagation_seconds = time.perf_counter() - start_time
+            
+            delayed = {entry['flight_id'] for entry in report['delayed_flights']}
+            retimed = delayed_roster.loc[delayed_roster['flight_id'].isin(delayed),
+                                         ['flight_id', 'departure_time', 'arrival_time']]
+            changed = await amend_inputs('flights', retimed.drop_duplicates('flight_id'))
+            if target is not default_workspace:
+                # The delayed roster already matches the amendment it logged
+                target.inputs_version = applied_inputs
+            
+            label = f"delay:{flight_id}+{minutes}m"
+            version = commit_roster(target, delayed_roster, label)
+            if target is default_workspace:
+                delayed_roster.to_csv(OUTPUT_RECOVERED_ROSTER_PATH, index=False)
+        if target is not default_workspace and roster_store.head is not None:
+            repaired, _ = await run_in_threadpool(recrew_flights, default_workspace.roster, changed, ())
+            publish_roster(repaired, label)
+            repaired.to_csv(OUTPUT_BASE_ROSTER_PATH, index=False)
+        workspaces.mark_stale('flights', changed, skip=target.name)
+    
+    return {
+        "message": f"{flight_id} delayed by {minutes} minutes",
+        "workspace": target.name,
+        "version": version,
+        **report,
+        "propagation_seconds": propagation_seconds,
+        "new_metrics": get_current_metrics(target)
+    }
+
+@app.get("/api/replacements/{crew_id}/{flight_id}")
+async def get_replacement_candidates(crew_id: str, flight_id: str, workspace: str = None):
+    """Ranked legal substitutes for the seat a crew member holds on a flight"""
+    target = get_workspace(workspace)
+    if target.store.head is None:
+        raise HTTPException(status_code=404, detail="No roster available")
+    
+    index = get_replacements(target)
+    if not index.is_assigned(crew_id, flight_id):
+        raise HTTPException(status_code=404, detail=f"{crew_id} is not assigned to {flight_id}")
+    
+    start_time = time.perf_counter()
+    candidates = index.lookup(flight_id, crew_id)
+    lookup_seconds = time.perf_counter() - start_time
+    return {
+        "workspace": target.name,
+        "version": index.version,
+        "crew_id": crew_id,
+        "flight_id": flight_id,
+        "alternatives": index.describe(flight_id, candidates),
+        "lookup_microseconds": round(lookup_seconds * 1e6, 1)
+    }
+
+@app.get("/api/progress/stream")
+async def stream_progress(request: Request):
+    """Stream optimizer progress events as Server-Sent Events"""
+    events = progress_bus.subscribe()
+    
+    async def event_stream():
+        idle_polls = 0
+        try:
+            while not await request.is_disconnected():
+                pending = progress_bus.drain(events)
+                for event in pending:
+                    yield f"event: progress\ndata: {json.dumps(event, default=str)}\n\n"
+                
+                # Comment lines keep proxies from closing an idle stream
+                idle_polls = 0 if pending else idle_polls + 1
+                if idle_polls >= PROGRESS_HEARTBEAT_POLLS:
+                    idle_polls = 0
+                    yield ": keep-alive\n\n"
+                await asyncio.sleep(PROGRESS_POLL_INTERVAL)
+        finally:
+            progress_bus.unsubscribe(events)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/metrics")
+async def get_metrics():
+    """Expose timers and counters in the Prometheus text format"""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/profiles")
+async def list_profiles():
+    """List captured request profiles, oldest first"""
+    return {"profiles": list(recent_profiles.keys()), "enabled": PROFILING_ENABLED}
+
+@app.get("/api/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """Get a captured cProfile report"""
+    if profile_id not in recent_profiles:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(recent_profiles[profile_id])
+
 @app.get("/api/stats")
 async def get_system_stats():
-    """Get system statistics and metrics with numpy type conversion"""
+    """Get system statistics and metrics"""
     if data_loader is None:
         raise HTTPException(status_code=500, detail="System not initialized")
     
     try:
-        # Convert numpy types to native Python types
-        def convert_numpy_types(obj):
-            if isinstance(obj, (np.integer, np.floating)):
-                return obj.item()
-            elif isinstance(obj, np.ndarray):
-                return obj.tolist()
-            elif isinstance(obj, dict):
-                return {k: convert_numpy_types(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_numpy_types(item) for item in obj]
-            else:
-                return obj
-        
         stats = {
             "total_flights": int(len(data_loader.flights)),
             "total_crew": int(len(data_loader.crew)),
             "active_crew": int(len(data_loader.crew[data_loader.crew['status'] == 'ACTIVE'])),
-            "crew_by_role": convert_numpy_types(data_loader.crew['role'].value_counts().to_dict()),
-            "flights_by_aircraft": convert_numpy_types(data_loader.flights['aircraft_type'].value_counts().to_dict()),
-            "flights_by_origin": convert_numpy_types(data_loader.flights['origin'].value_counts().to_dict())
+            "crew_by_role": to_native(data_loader.crew['role'].value_counts().to_dict()),
+            "flights_by_aircraft": to_native(data_loader.flights['aircraft_type'].value_counts().to_dict()),
+            "flights_by_origin": to_native(data_loader.flights['origin'].value_counts().to_dict()),
+            "shared_tables_bytes": shared_tables.memory_bytes()
         }
         
-        if current_roster is not None:
-            stats["current_roster"] = calculate_roster_metrics(current_roster)
+        if roster_store.head is not None:
+            stats["current_roster"] = get_current_metrics(default_workspace)
         
         return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
+@app.get("/api/pairings")
+async def get_pairings(request: Request, closed_only: bool = True):
+    """Crew pairings enumerated over the flight connection graph"""
+    if optimizer is None or optimizer.pairing_generator is None:
+        raise HTTPException(status_code=500, detail="System not initialized")
+    
+    generator = optimizer.pairing_generator
+    pairings = generator.multi_leg() if closed_only else generator.pairings
+    return json_response({
+        "summary": generator.summary(),
+        "pairings": [pairing.to_dict() for pairing in pairings]
+    }, request)
+
 @app.get("/api/download-roster")
-async def download_roster():
+async def download_roster(workspace: str = None):
     """Download the current roster as CSV"""
-    if current_roster is None:
+    target = get_workspace(workspace)
+    if target.store.head is None:
         raise HTTPException(status_code=404, detail="No roster available")
     
     try:
         # Merge with flight data to include origin, destination, aircraft_type in the CSV
-        merged_roster = current_roster.merge(
+        merged_roster = target.roster.merge(
             data_loader.flights[['flight_id', 'origin', 'destination', 'aircraft_type']],
             on='flight_id',
             how='left'
         )
         
+        # Named workspaces stream their CSV so they never overwrite the shared output file
+        if target is not default_workspace:
+            return Response(
+                content=merged_roster.to_csv(index=False),
+                media_type='text/csv',
+                headers={"Content-Disposition": f'attachment; filename="indigo_crew_roster_{target.name}.csv"'}
+            )
+        
         merged_roster.to_csv(OUTPUT_BASE_ROSTER_PATH, index=False)
         
         return FileResponse(
@@ -225,47 +1322,45 @@ async def download_roster():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/roster-metrics")
-async def get_roster_metrics():
+async def get_roster_metrics(request: Request, workspace: str = None):
     """Get comprehensive metrics and flight details for the current roster"""
-    if current_roster is None:
+    target = get_workspace(workspace)
+    if target.store.head is None:
         raise HTTPException(status_code=404, detail="No roster available")
     
+    cached = not_modified(request, target)
+    if cached is not None:
+        return cached
+    
     try:
-        metrics = calculate_roster_metrics(current_roster)
-        return metrics
+        metrics = get_current_metrics(target)
+        return json_response(metrics, request, headers={"ETag": roster_etag(target)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/roster/violation-breakdown")
-async def get_violation_breakdown():
+async def get_violation_breakdown(workspace: str = None):
     """Get categorized violation breakdown"""
     if rule_engine is None:
         raise HTTPException(status_code=500, detail="Rule engine not initialized")
     
+    target = get_workspace(workspace)
     try:
+        # Prefer the breakdown recorded for the current roster version
+        cached = target.cached_metrics(target.store.head)
+        if cached is not None:
+            return cached[1]
         breakdown = rule_engine.get_violation_breakdown()
         return breakdown
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
+@metrics.timed('roster_metrics_seconds')
 def calculate_roster_metrics(roster: pd.DataFrame) -> Dict[str, Any]:
-    """Calculate comprehensive roster metrics with flight details and numpy type conversion"""
+    """Calculate comprehensive roster metrics with flight details"""
     if roster is None or roster.empty:
         return {}
     
-    # Convert numpy types to native Python types for JSON serialization
-    def convert_numpy_types(obj):
-        if isinstance(obj, (np.integer, np.floating)):
-            return obj.item()  # Convert numpy numbers to Python numbers
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()  # Convert numpy arrays to lists
-        elif isinstance(obj, dict):
-            return {k: convert_numpy_types(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [convert_numpy_types(item) for item in obj]
-        else:
-            return obj
-    
     # Get flight details for the frontend
     flight_details = []
     if not roster.empty:
@@ -279,7 +1374,8 @@ def calculate_roster_metrics(roster: pd.DataFrame) -> Dict[str, Any]:
         # Get unique flight details for the frontend
         flight_details = merged_data[['flight_id', 'origin', 'destination', 'aircraft_type']].drop_duplicates().to_dict('records')
     
-    crew_hours = roster.groupby('crew_id')['duty_hours'].sum()
+    crew_hours = roster.groupby('crew_id', observed=True)['duty_hours'].sum()
+    preferences = data_loader.evaluate_preferences(roster)
     
     metrics = {
         "total_assignments": len(roster),
@@ -295,6 +1391,9 @@ def calculate_roster_metrics(roster: pd.DataFrame) -> Dict[str, Any]:
         "crew_over_14h": int((crew_hours > 14).sum()),
         "duplicate_assignments": int(roster.duplicated(subset=['flight_id', 'crew_id']).sum()),
         "violations": len(rule_engine.check_roster_compliance(roster)) if rule_engine else 0,
+        "preference_score": float(preferences['score']),
+        "preferences_satisfied": preferences['satisfied'],
+        "preferences_violated": preferences['violated'],
         # New fields for frontend
         "flight_details": flight_details,
         "aircraft_types_covered": list(roster.merge(
@@ -305,8 +1404,8 @@ def calculate_roster_metrics(roster: pd.DataFrame) -> Dict[str, Any]:
     }
     
     # Convert any numpy types in the metrics
-    return convert_numpy_types(metrics)
+    return to_native(metrics)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=WEB_WORKERS)
\ No newline at end of file
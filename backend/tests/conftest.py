@@ -0,0 +1,41 @@
+import contextlib
+import io
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# Input paths in config are relative to backend/
+os.chdir(BACKEND_DIR)
+
+from config import (INPUT_CREW_PATH, INPUT_DGCA_RULES_PATH, INPUT_FLIGHTS_PATH, INPUT_HISTORICAL_PATH,
+                    INPUT_PREFERENCES_PATH)
+from core.data_loader import DataLoader
+from core.optimizer import GeneticOptimizer
+from core.rule_engine import RuleEngine
+
+
+@pytest.fixture(scope='session')
+def system():
+    """(data_loader, rule_engine) over the bundled input tables"""
+    data_loader = DataLoader()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert data_loader.load_all_data(INPUT_FLIGHTS_PATH, INPUT_CREW_PATH, INPUT_PREFERENCES_PATH,
+                                         INPUT_DGCA_RULES_PATH, INPUT_HISTORICAL_PATH)
+    return data_loader, RuleEngine(data_loader)
+
+
+@pytest.fixture(scope='session')
+def population(system):
+    """A seeded, mutated GA population, so rosters carry a mix of violations"""
+    data_loader, rule_engine = system
+    optimizer = GeneticOptimizer(data_loader, rule_engine)
+    random.seed(7)
+    np.random.seed(7)
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer.create_initial_population(8)
+        return [optimizer.mutate_roster(roster.copy()) for roster in optimizer.population]
@@ -0,0 +1,23 @@
+from core.compliance_kernel import VIOLATION_CATEGORIES
+
+
+def test_population_counts_match_per_roster_checks(system, population):
+    _, rule_engine = system
+    counts = rule_engine.check_population_compliance(population)
+    for index, roster in enumerate(population):
+        rule_engine.check_roster_compliance(roster)
+        breakdown = rule_engine.get_violation_breakdown()
+        for category in VIOLATION_CATEGORIES:
+            assert counts[category][index] == breakdown.get(category, 0), (index, category)
+
+
+def test_total_is_the_sum_of_categories(system, population):
+    _, rule_engine = system
+    counts = rule_engine.check_population_compliance(population)
+    assert list(counts['total']) == [sum(counts[category][index] for category in VIOLATION_CATEGORIES)
+                                     for index in range(len(population))]
+
+
+def test_population_has_violations_to_compare(system, population):
+    _, rule_engine = system
+    assert rule_engine.check_population_compliance(population)['total'].sum() > 0
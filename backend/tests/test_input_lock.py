@@ -0,0 +1,53 @@
+import asyncio
+
+from core.input_lock import InputLock
+
+
+async def hold(lock, mode, name, log, release):
+    async with getattr(lock, mode)():
+        log.append(f"{name}+")
+        await release.wait()
+        log.append(f"{name}-")
+
+
+def test_readers_share_and_a_waiting_writer_goes_before_new_readers():
+    async def scenario():
+        lock, log = InputLock(), []
+        first, writer, late = asyncio.Event(), asyncio.Event(), asyncio.Event()
+        tasks = [asyncio.create_task(hold(lock, 'shared', 'r1', log, first)),
+                 asyncio.create_task(hold(lock, 'shared', 'r2', log, first))]
+        await asyncio.sleep(0)
+        assert lock.readers == 2
+
+        tasks.append(asyncio.create_task(hold(lock, 'exclusive', 'w', log, writer)))
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(hold(lock, 'shared', 'r3', log, late)))
+        await asyncio.sleep(0)
+        # The writer waits for the readers, and the new reader waits for the writer
+        assert lock.writers_waiting == 1 and 'r3+' not in log
+
+        first.set()
+        await asyncio.sleep(0.01)
+        assert lock.writer and 'r3+' not in log
+        writer.set()
+        late.set()
+        await asyncio.gather(*tasks)
+        return log
+
+    log = asyncio.run(scenario())
+    assert log.index('w+') > max(log.index('r1-'), log.index('r2-'))
+    assert log.index('r3+') > log.index('w-')
+
+
+def test_writers_are_exclusive():
+    async def scenario():
+        lock, log = InputLock(), []
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(hold(lock, 'exclusive', name, log, release)) for name in ('a', 'b')]
+        await asyncio.sleep(0.01)
+        assert log == ['a+']
+        release.set()
+        await asyncio.gather(*tasks)
+        return log
+
+    assert asyncio.run(scenario()) == ['a+', 'a-', 'b+', 'b-']
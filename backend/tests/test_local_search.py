@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from core.local_search import MOVE_KINDS, LocalSearch
+from core.rule_engine import ALLOWED_BASE_PAIRS
+
+
+def rescanned(search, roster):
+    """Objective and violations of the search's current assignment, rebuilt from scratch"""
+    fresh = LocalSearch(search.data, search.rules, ALLOWED_BASE_PAIRS, search.fairness_weight)
+    fresh._encode(roster)
+    fresh.seat_crew = list(search.seat_crew)
+    fresh._build_state()
+    return fresh.objective(), fresh.violations
+
+
+@pytest.fixture
+def search(system):
+    data_loader, rule_engine = system
+    return LocalSearch(data_loader, rule_engine.limits(), ALLOWED_BASE_PAIRS, fairness_weight=0.1)
+
+
+def test_move_deltas_match_a_rescan(search, population):
+    roster = population[0]
+    search._encode(roster)
+    search._build_state()
+    random.seed(11)
+    current = search.objective()
+    applied = undone = 0
+    for _ in range(400):
+        proposal = search._propose(random.choice(MOVE_KINDS))
+        if proposal is None:
+            continue
+        delta, undo, _ = proposal
+        if random.random() < 0.5:
+            search._undo(undo)
+            undone += 1
+        else:
+            current += delta
+            applied += 1
+        objective, violations = rescanned(search, roster)
+        assert search.objective() == pytest.approx(objective, abs=1e-6)
+        assert current == pytest.approx(objective, abs=1e-6)
+        assert search.violations == violations
+    assert applied and undone
+
+
+def test_run_reports_the_objective_of_the_returned_roster(search, population):
+    improved, stats = search.run(population[1], time_budget=0.5, seed=3)
+    assert len(improved) == len(population[1])
+    assert stats['final_objective'] <= stats['initial_objective'] + 1e-9
+
+    check = LocalSearch(search.data, search.rules, ALLOWED_BASE_PAIRS, search.fairness_weight)
+    check._encode(improved)
+    check._build_state()
+    assert check.objective() == pytest.approx(stats['final_objective'], abs=1e-6)
@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from core.roster_store import RosterStore
+
+
+def roster(*rows):
+    return pd.DataFrame(list(rows), columns=['flight_id', 'crew_id', 'role', 'duty_hours'])
+
+
+BASE = roster(('F1', 'C1', 'Captain', 2.0), ('F1', 'C2', 'First Officer', 2.0), ('F2', 'C3', 'Cabin Crew', 1.5))
+
+
+def test_head_round_trips_each_commit():
+    store = RosterStore()
+    first = store.commit(BASE, label='base')
+    changed = roster(('F1', 'C1', 'Captain', 2.0), ('F1', 'C4', 'First Officer', 2.0), ('F2', 'C3', 'Cabin Crew', 1.5))
+    second = store.commit(changed, label='swap')
+
+    assert (first, second) == (1, 2)
+    pd.testing.assert_frame_equal(store.current(), changed)
+    pd.testing.assert_frame_equal(store.get(first), BASE)
+    assert [version['label'] for version in store.list_versions()] == ['base', 'swap']
+    assert store.list_versions()[1]['changes'] == 2
+
+
+def test_diff_reports_added_removed_and_changed():
+    store = RosterStore()
+    first = store.commit(BASE)
+    second = store.commit(roster(('F1', 'C1', 'Captain', 3.0), ('F1', 'C4', 'First Officer', 2.0)))
+
+    diff = store.diff(first, second)
+    assert [record['crew_id'] for record in diff['added']] == ['C4']
+    assert sorted(record['crew_id'] for record in diff['removed']) == ['C2', 'C3']
+    assert [(change['before']['duty_hours'], change['after']['duty_hours']) for change in diff['changed']] == [(2.0, 3.0)]
+
+    back = store.diff(second, first)
+    assert len(back['added']) == 2 and len(back['removed']) == 1 and len(back['changed']) == 1
+
+
+def test_rollback_branches_from_the_old_version():
+    store = RosterStore()
+    first = store.commit(BASE)
+    store.commit(roster(('F1', 'C1', 'Captain', 2.0)))
+    pd.testing.assert_frame_equal(store.rollback(first), BASE)
+
+    branch = store.commit(roster(('F2', 'C3', 'Cabin Crew', 1.5), ('F3', 'C5', 'Cabin Crew', 1.0)))
+    assert store.versions[branch].parent == first
+    # Diffs across branches walk up to the common ancestor
+    diff = store.diff(2, branch)
+    assert sorted(record['crew_id'] for record in diff['added']) == ['C3', 'C5']
+    assert [record['crew_id'] for record in diff['removed']] == ['C1']
+
+
+def test_duplicate_assignments_are_kept_apart():
+    store = RosterStore()
+    doubled = roster(('F1', 'C1', 'Captain', 2.0), ('F1', 'C1', 'Captain', 2.0))
+    first = store.commit(doubled)
+    second = store.commit(doubled.iloc[:1])
+    assert len(store.get(first)) == 2
+    assert len(store.diff(first, second)['removed']) == 1
+
+
+def test_unknown_versions_raise():
+    store = RosterStore()
+    store.commit(BASE)
+    with pytest.raises(KeyError):
+        store.rollback(99)
+    with pytest.raises(KeyError):
+        store.diff(1, 99)
+
+
+def test_retention_folds_dropped_versions_into_their_children():
+    store = RosterStore(max_versions=3, cache_size=0)
+    rosters = [BASE.assign(duty_hours=BASE['duty_hours'] + step) for step in range(6)]
+    for step_roster in rosters:
+        store.commit(step_roster)
+
+    assert list(store.versions) == [4, 5, 6]
+    for version, expected in zip((4, 5, 6), rosters[3:]):
+        pd.testing.assert_frame_equal(store.get(version), expected)
+    assert len(store.diff(4, 6)['changed']) == 3
@@ -0,0 +1,46 @@
+import copy
+import pickle
+
+import pytest
+
+from core.shared_tables import SharedTables
+
+
+@pytest.fixture
+def tables():
+    shared = SharedTables()
+    yield shared
+    shared.close()
+
+
+def test_published_loader_pickles_as_a_handle(system, tables):
+    data_loader, _ = system
+    loader = copy.copy(data_loader)
+    tables.publish(loader)
+    restored = pickle.loads(pickle.dumps(loader))
+    assert restored.flights['flight_id'].tolist() == data_loader.flights['flight_id'].tolist()
+    assert restored.crew['crew_id'].tolist() == data_loader.crew['crew_id'].tolist()
+
+
+def test_leased_segment_outlives_a_republish(system, tables):
+    data_loader, _ = system
+    old, new = copy.copy(data_loader), copy.copy(data_loader)
+    first = tables.publish(old)
+    with tables.lease(first) as handle:
+        assert handle is first
+        tables.publish(new)
+        assert first.name in tables.retired
+        # Still attachable while leased
+        _, segment = handle.attach()
+        segment.close()
+    assert first.name not in tables.retired and not tables.leases
+
+
+def test_unlinked_segment_leases_as_none(system, tables):
+    data_loader, _ = system
+    first = tables.publish(copy.copy(data_loader))
+    tables.publish(copy.copy(data_loader))
+    with tables.lease(first) as handle:
+        assert handle is None
+    with tables.lease() as handle:
+        assert handle is tables.handle
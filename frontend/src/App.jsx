@@ -24,6 +24,7 @@ function App() {
   const [error, setError] = useState('');
   const [mobileMenuOpen, setMobileMenuOpen] = useState(false);
   const [activeTab, setActiveTab] = useState('overview');
+  const [progress, setProgress] = useState(null);
 
   const navigation = [
     { id: 'overview', name: 'Overview', icon: ChartBarIcon },
@@ -33,14 +34,21 @@ function App() {
     { id: 'disrupt', name: 'Disruption Sim', icon: ExclamationTriangleIcon },
   ];
 
+  // Rebuild row objects from the compact columnar roster payload
+  const decodeColumnar = ({ columns, length, data }) =>
+    Array.from({ length }, (_, row) =>
+      Object.fromEntries(columns.map((column, index) => [column, data[index][row]]))
+    );
+
   const fetchRoster = async () => {
     setLoading(true);
     setError('');
     try {
-      const response = await fetch(`${API_BASE}/api/roster`);
+      // Revalidate with the roster ETag; an unchanged version comes back as 304 from the browser cache
+      const response = await fetch(`${API_BASE}/api/roster?format=columnar`, { cache: 'no-cache' });
       if (response.ok) {
         const data = await response.json();
-        setRoster(data);
+        setRoster({ ...data, roster: decodeColumnar(data.roster) });
         console.log("roster:  ",data)
       } else {
         setError('No roster available. Generate one first.');
@@ -63,9 +71,28 @@ function App() {
     }
   };
 
+  const describeProgress = (event) => {
+    if (event.phase === 'optimization') {
+      return `Generation ${event.generation} · best ${event.best_score.toFixed(0)} · mean ${event.mean_score.toFixed(0)}`;
+    }
+    if (event.phase === 'population') {
+      return `Building population ${event.population_size}/${event.target_size}`;
+    }
+    if (event.covered_flights !== undefined) {
+      return `${event.phase}: ${event.covered_flights}/${event.total_flights} flights covered`;
+    }
+    return event.phase;
+  };
+
   const generateRoster = async () => {
     setLoading(true);
     setError('');
+    setProgress(null);
+    const progressStream = new EventSource(`${API_BASE}/api/progress/stream`);
+    progressStream.addEventListener('progress', (message) => {
+      const event = JSON.parse(message.data);
+      setProgress({ ...event, label: describeProgress(event) });
+    });
     try {
       const response = await fetch(`${API_BASE}/api/generate-roster`, {
         method: 'POST'
@@ -79,6 +106,8 @@ function App() {
     } catch (err) {
       setError('Failed to generate roster');
     }
+    progressStream.close();
+    setProgress(null);
     setLoading(false);
   };
 
@@ -183,6 +212,15 @@ function App() {
 
       {/* Main Content */}
       <main className="mx-auto max-w-7xl px-4 sm:px-6 lg:px-8 py-8">
+        {loading && progress && (
+          <div className="mb-6 bg-indigo-50 border-l-4 border-indigo-400 p-4 rounded">
+            <div className="flex items-center justify-between text-sm text-indigo-700">
+              <span>{progress.label}</span>
+              {progress.elapsed !== undefined && <span>{progress.elapsed.toFixed(1)}s</span>}
+            </div>
+          </div>
+        )}
+
         {error && (
           <div className="mb-6 bg-red-50 border-l-4 border-red-400 p-4 rounded">
             <div className="flex">
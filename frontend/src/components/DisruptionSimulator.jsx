@@ -112,6 +112,7 @@ const DisruptionSimulator = ({ onDisruption }) => {
     crewId: '',
     flightId: ''
   });
+  const [resolution, setResolution] = useState(null);
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
@@ -183,6 +184,7 @@ const DisruptionSimulator = ({ onDisruption }) => {
       if (response.ok) {
         const data = await response.json();
         console.log("Disruption added successfully:", data);
+        setResolution(data);
         onDisruption();
         setFormData({
           crewId: '',
@@ -324,6 +326,66 @@ const DisruptionSimulator = ({ onDisruption }) => {
         </div>
       </div>
 
+      {/* Resolution of the last disruption with its ranked substitutes */}
+      {resolution && (
+        <div className="mt-6 bg-white rounded-2xl border border-gray-200 p-6 shadow-lg">
+          <div className="flex items-center justify-between mb-4">
+            <div>
+              <h2 className="text-xl font-semibold text-gray-900">Replacement Options</h2>
+              <p className="text-sm text-gray-600 mt-1">{resolution.message}</p>
+            </div>
+            <div className="flex items-center space-x-3">
+              <span className={`text-xs px-3 py-1 rounded-full ${resolution.strategy === 'replacement' ? 'bg-green-100 text-green-700' : 'bg-amber-100 text-amber-700'}`}>
+                {resolution.strategy === 'replacement' ? 'Instant substitute' : 'Re-optimized'}
+              </span>
+              <button
+                onClick={() => setResolution(null)}
+                className="text-gray-500 hover:text-gray-700 transition-colors p-1 rounded-full hover:bg-gray-100"
+              >
+                <XMarkIcon className="w-5 h-5" />
+              </button>
+            </div>
+          </div>
+
+          {resolution.alternatives && resolution.alternatives.length > 0 ? (
+            <table className="w-full text-sm">
+              <thead>
+                <tr className="text-left text-gray-500 border-b border-gray-200">
+                  <th className="py-2 pr-4">#</th>
+                  <th className="py-2 pr-4">Crew ID</th>
+                  <th className="py-2 pr-4">Role</th>
+                  <th className="py-2 pr-4">Base</th>
+                  <th className="py-2 pr-4">Duty (h)</th>
+                  <th className="py-2">Rest before (h)</th>
+                </tr>
+              </thead>
+              <tbody>
+                {resolution.alternatives.map((alternative) => (
+                  <tr
+                    key={alternative.crew_id}
+                    className={`border-b border-gray-100 ${resolution.replacement && resolution.replacement.crew_id === alternative.crew_id ? 'bg-green-50' : ''}`}
+                  >
+                    <td className="py-2 pr-4 text-gray-500">{alternative.rank}</td>
+                    <td className="py-2 pr-4 font-medium text-gray-900">{alternative.crew_id}</td>
+                    <td className="py-2 pr-4">{alternative.role}</td>
+                    <td className="py-2 pr-4">
+                      <span className="inline-flex items-center">
+                        <MapPinIcon className="w-4 h-4 mr-1 text-gray-400" />
+                        {alternative.base}
+                      </span>
+                    </td>
+                    <td className="py-2 pr-4">{alternative.duty_hours}</td>
+                    <td className="py-2">{alternative.rest_before_hours ?? '—'}</td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          ) : (
+            <p className="text-sm text-gray-500">No legal substitute was available; the roster was re-optimized.</p>
+          )}
+        </div>
+      )}
+
       {/* Manual Disruption Form Modal */}
       <ManualDisruptionForm 
         showManualForm={showManualForm}